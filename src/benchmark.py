@@ -0,0 +1,160 @@
+"""
+This module measures how long the Record Management System takes to load and save a large data file.
+
+It writes a flights file of generated records to a temporary directory, then runs:
+- snapshot: times a startup load (reading the file and building the cached records)
+  from the pretty-printed JSON and from each binary snapshot format.
+- compression: times writing and reading the file plain and with each compression
+  codec, and estimates the time to move each file over slow network storage.
+
+    python benchmark.py --records 200000
+    python benchmark.py compression --bandwidth 10
+
+The data files in src/data are not touched.
+"""
+
+import argparse  # Importing argparse to read command-line options
+import os  # Importing os to work with file system paths
+import random  # Importing random to generate flight records
+import sys  # Importing sys to manipulate the Python path
+import tempfile  # Importing tempfile for the directory holding the generated file
+import time  # Importing time to measure the loads
+
+# Add the project root directory to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from record.storage import JsonStorage  # Import the JSON engine and its snapshots
+from record.cache import CachedFile  # Import the cache entry built at startup
+
+# Cities used for the generated flights
+CITIES = ["London", "Paris", "New York", "Tokyo", "Rome", "Berlin", "Madrid", "Chicago"]
+
+
+def generate_flights(count, seed=0):
+    """
+    Generate flight records.
+
+    Args:
+        count (int): The number of flights.
+        seed (int): The seed of the random generator, so runs compare the same data.
+
+    Returns:
+        list: The flights, as dictionaries.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "Flight_ID": flight_id,
+            "Client_ID": rng.randint(1, 10000),
+            "Airline_ID": rng.randint(1, 50),
+            "Date/Time": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "Start City": rng.choice(CITIES),
+            "End City": rng.choice(CITIES),
+        }
+        for flight_id in range(1, count + 1)
+    ]
+
+
+def time_load(storage, path, repeat):
+    """
+    Time a startup load of a data file: reading it, then building the cached records.
+
+    Args:
+        storage (JsonStorage): The engine reading the file.
+        path (str): The path of the data file.
+        repeat (int): The number of loads; the fastest is reported.
+
+    Returns:
+        tuple: The fastest read and the fastest whole load, in seconds.
+    """
+    best_read = best_load = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = storage.read(path)
+        read = time.perf_counter() - start
+        CachedFile(path, None, records)
+        load = time.perf_counter() - start
+        best_read, best_load = min(best_read, read), min(best_load, load)
+    return best_read, best_load
+
+
+def benchmark_snapshots(directory, flights, repeat):
+    """
+    Compare startup loads from the JSON file and from the marshal snapshot.
+
+    Args:
+        directory (str): The directory to write the files to.
+        flights (list): The flights to write.
+        repeat (int): The number of loads of each.
+    """
+    path = os.path.join(directory, "flights.json")
+    JsonStorage(None).write(path, flights)
+    print(f"Startup load, JSON file {os.path.getsize(path) / 1e6:.1f} MB")
+
+    print(f"{'format':<8} {'read':>8} {'startup':>8}")
+    read, load = time_load(JsonStorage(None), path, repeat)
+    baseline = read
+    # "none" is SNAPSHOT_FORMAT = None: the JSON file is parsed at every start
+    print(f"{'none':<8} {read:7.3f}s {load:7.3f}s")
+    storage = JsonStorage("marshal")
+    storage.read(path)  # Parses the JSON once and writes the snapshot
+    read, load = time_load(storage, path, repeat)
+    size = os.path.getsize(JsonStorage.snapshot_path(path)) / 1e6
+    print(f"{'marshal':<8} {read:7.3f}s {load:7.3f}s  reads {baseline / read:.1f}x faster, snapshot {size:.1f} MB")
+
+
+def benchmark_compression(directory, flights, repeat, bandwidth):
+    """
+    Compare writing and reading the flights file plain and with each compression codec.
+
+    The files are on local storage here, so the time to move them over the network is
+    estimated from their size and the given bandwidth, and added to the measured times.
+
+    Args:
+        directory (str): The directory to write the files to.
+        flights (list): The flights to write.
+        repeat (int): The number of writes and reads per codec.
+        bandwidth (float): The bandwidth of the network storage, in MB per second.
+    """
+    print(f"Compressed files, network storage at {bandwidth:g} MB/s")
+    print(f"{'codec':<8} {'size':>9} {'write':>8} {'read':>8} {'transfer':>9} {'total read':>11}")
+    for name in (None, "gzip", "lzma"):
+        # Snapshots are turned off, so every read parses the data file
+        storage = JsonStorage(None, name)
+        path = os.path.join(directory, f"flights-{name or 'plain'}", "flights.json")
+        os.makedirs(os.path.dirname(path))
+        write = read = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            storage.write(path, flights)
+            write = min(write, time.perf_counter() - start)
+            start = time.perf_counter()
+            storage.read(path)
+            read = min(read, time.perf_counter() - start)
+        size = os.path.getsize(storage.stored_path(path)) / 1e6
+        transfer = size / bandwidth
+        print(f"{name or 'plain':<8} {size:6.1f} MB {write:7.3f}s {read:7.3f}s {transfer:8.3f}s {read + transfer:10.3f}s")
+
+
+def main():
+    """
+    Run the benchmarks and print the results.
+    """
+    parser = argparse.ArgumentParser(description="Measure the load and save times of a large flights file.")
+    parser.add_argument("benchmark", nargs="?", choices=["snapshot", "compression", "all"], default="all", help="benchmark to run")
+    parser.add_argument("--records", type=int, default=200000, help="number of generated flights")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per format, the fastest is reported")
+    parser.add_argument("--bandwidth", type=float, default=10.0, help="bandwidth of the network storage in MB/s")
+    args = parser.parse_args()
+
+    flights = generate_flights(args.records)
+    print(f"{args.records} flights")
+    with tempfile.TemporaryDirectory() as directory:
+        if args.benchmark in ("snapshot", "all"):
+            benchmark_snapshots(directory, flights, args.repeat)
+        if args.benchmark in ("compression", "all"):
+            benchmark_compression(directory, flights, args.repeat, args.bandwidth)
+
+
+if __name__ == "__main__":
+    main()
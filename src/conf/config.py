@@ -12,6 +12,16 @@ Attributes:
     CLIENT_FILE (str): Path to the file storing client records.
     AIRLINE_FILE (str): Path to the file storing airline records.
     FLIGHT_FILE (str): Path to the file storing flight records.
+    SQLITE_FILE (str): Path to the SQLite database used by the "sqlite" storage engine.
+    STORAGE_ENGINE (str): The storage engine used for the data files ("json", "log" or "sqlite").
+    LOG_COMPACTION_THRESHOLD (int): Log size in bytes above which the log engine compacts a data file.
+    SNAPSHOT_FORMAT (str): Format of the snapshots loaded at startup ("marshal"), or None.
+    COMPRESSION (str): Codec the JSON data files are written with ("gzip" or "lzma"), or None for plain files.
+    FLIGHT_STORE (str): How flights are stored: "engine" (by STORAGE_ENGINE) or "mmap" (memory-mapped fixed-width file).
+    ID_BLOCK_SIZE (int): Number of IDs a process leases at a time from an ID sequence file.
+    CHECK_FLIGHT_REFERENCES (bool): Whether flights must refer to an existing client and airline.
+    ON_DELETE (str): What deleting a client or airline does to its flights ("none", "restrict" or "cascade").
+    FUZZY_MATCH_THRESHOLD (float): Smallest trigram similarity for a name to count as a fuzzy match.
     WINDOW_TITLE (str): Title of the application window.
     WINDOW_SIZE (str): Size of the application window (width x height).
 """
@@ -33,6 +43,59 @@ AIRLINE_FILE = os.path.join(DATA_DIR, "airlines.json")
 # Define the file path for storing flight records
 FLIGHT_FILE = os.path.join(DATA_DIR, "flights.json")
 
+# Define the file path of the SQLite database used by the "sqlite" storage engine
+SQLITE_FILE = os.path.join(DATA_DIR, "records.db")
+
+# Storage engine for the data files:
+# - "json" rewrites the whole JSON file on every change.
+# - "log" appends each change to "<data file>.log" and compacts it into the JSON file in the background.
+# - "sqlite" stores all records in SQLITE_FILE; run migrate.py once to import the JSON files.
+# Switch from "log" back to "json" only after a compaction, or changes still in a log are ignored.
+STORAGE_ENGINE = "json"
+
+# Size of a change log, in bytes, above which it is compacted into its JSON file
+LOG_COMPACTION_THRESHOLD = 1024 * 1024
+
+# Binary format of the snapshot kept next to each JSON data file ("<data file>.snap"):
+# - "marshal" loads fastest, but is only read by the Python version that wrote it.
+# A JSON snapshot is not offered, since it would load no faster than the JSON file itself.
+# Pickle is not offered, since loading a pickle from a shared data folder could run any code.
+# - None turns snapshots off, so the JSON files are parsed at every start.
+# The JSON files stay the interchange format; a snapshot is only loaded while it matches its JSON file.
+SNAPSHOT_FORMAT = "marshal"
+
+# Compression of the JSON data files, for data folders on slow or network storage:
+# - "gzip" writes "<data file>.gz", several times smaller and quick to write.
+# - "lzma" writes "<data file>.xz", smaller still but slower to write.
+# - None writes plain JSON files.
+# Files are read by the codec their first bytes identify, and the newest of the plain and compressed
+# files is used, so changing this setting keeps the records; the older file is left in place.
+COMPRESSION = None
+
+# How flights are stored:
+# - "engine" stores them like the other records, as chosen by STORAGE_ENGINE.
+# - "mmap" keeps them in a memory-mapped file of fixed-width rows ("<data file>.bin"), so a flight
+#   is read or updated by ID without loading the others. The flights are imported from the
+#   storage engine on first use; afterwards the engine's flight file is no longer written.
+#   Only the six standard flight fields, with positive integer Flight_IDs, can be stored.
+FLIGHT_STORE = "engine"
+
+# Number of new IDs a process leases at a time from "<data file>.seq"; unused IDs are skipped after a restart
+ID_BLOCK_SIZE = 100
+
+# Reject new or updated flights whose Client_ID or Airline_ID does not exist
+CHECK_FLIGHT_REFERENCES = False
+
+# What deleting a client or airline does to the flights referring to it:
+# - "none" leaves the flights in place.
+# - "restrict" refuses to delete a client or airline that still has flights.
+# - "cascade" deletes its flights along with it.
+ON_DELETE = "none"
+
+# Smallest trigram similarity (0 to 1) for a client or airline name to count as a fuzzy match;
+# "Lufthansa" and "Lufthnasa" score about 0.43
+FUZZY_MATCH_THRESHOLD = 0.4
+
 # GUI settings
 # Title of the application window
 WINDOW_TITLE = "Record Management System"
@@ -47,3 +110,4 @@ if __name__ == "__main__":
     print("CLIENT_FILE:", CLIENT_FILE)  # Debug: Print the client file path
     print("AIRLINE_FILE:", AIRLINE_FILE)  # Debug: Print the airline file path
     print("FLIGHT_FILE:", FLIGHT_FILE)  # Debug: Print the flight file path
+    print("SQLITE_FILE:", SQLITE_FILE)  # Debug: Print the SQLite database path
@@ -1,6 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox
-from record.airline import AirlineRecord
+from record.background import AsyncAirlineRecord, AsyncFlightRecord
+from gui.tasks import BusyIndicator, run_in_background
+from gui.browser import open_browser
+from record.models import Airline
+
+# Largest number of flights listed in the result box at once
+MAX_LISTED_FLIGHTS = 200
 
 def manage_airline_gui():
     """
@@ -11,73 +17,111 @@ def manage_airline_gui():
     - Update existing airline records
     - Delete airline records
     - Search for airline records by ID
+    - Browse all airline records a page at a time
+    - Show the flights of an airline
     """
 
     def save_airline():
         """
         Save a new airline record.
 
-        Collects the airline data from the input fields,
-        validates it, and saves it using the backend logic.
+        Collects the airline data from the input fields and saves it
+        in the background, where the backend logic validates it. If airlines with
+        similar names already exist, the user is asked to confirm first.
         """
-        try:
-            airline_data = {
-                "ID": AirlineRecord.generate_id(),
-                "Company Name": company_name_entry.get().strip(),
-            }
-            # Save the airline data
-            AirlineRecord.create(airline_data)
-            messagebox.showinfo("Success", "Airline record created!")
+        airline_data = {
+            "Company Name": company_name_entry.get().strip(),
+        }
+
+        def saved(airline_id):
+            messagebox.showinfo("Success", f"Airline record created (ID {airline_id})!")
             clear_inputs()  # Clear the input fields after saving
-        except Exception as e:
-            # Display error message if an exception occurs
-            messagebox.showerror("Error", str(e))
+
+        def save():
+            # Save the airline data
+            # The new ID is allocated by create, so two windows never get the same ID
+            run_in_background(window, AsyncAirlineRecord.create(airline_data), saved, busy=busy)
+
+        def matched(matches):
+            # Exact duplicates are rejected by create, so only near duplicates are shown here
+            name = airline_data["Company Name"].casefold()
+            similar = [record for _, record in matches if record["Company Name"].casefold() != name]
+            if similar:
+                names = "\n".join(f"{record['Company Name']} (ID {record['ID']})" for record in similar)
+                if not messagebox.askyesno(
+                    "Possible Duplicate",
+                    f"Airlines with similar names already exist:\n\n{names}\n\nSave the new airline anyway?",
+                ):
+                    return
+            save()
+
+        if not airline_data["Company Name"]:
+            # Error when company name is empty
+            messagebox.showerror("Error", "Company Name cannot be empty. Please provide a name.")
+            return
+        run_in_background(window, AsyncAirlineRecord.fuzzy_search(airline_data["Company Name"]), matched, busy=busy)
+
+    def read_airline_id(entry):
+        """
+        Read an airline ID from an input field.
+
+        Args:
+            entry (tk.Entry): The input field holding the ID.
+
+        Returns:
+            int: The airline ID, or None after showing an error if it is not a number.
+        """
+        try:
+            return int(entry.get().strip())
+        except ValueError:
+            # Error when airline ID is not a valid integer
+            messagebox.showerror("Error", "Invalid Airline ID. Please enter a numeric value.")
+            return None
 
     def delete_airline():
         """
         Delete an airline record by ID.
 
         Retrieves the airline ID from the input field
-        and attempts to delete the corresponding record.
+        and deletes the corresponding record in the background.
         """
-        try:
-            airline_id = int(airline_id_entry.get())
-            if AirlineRecord.delete_airline(airline_id):
+        airline_id = read_airline_id(airline_id_entry)
+        if airline_id is None:
+            return
+
+        def deleted(found):
+            if found:
                 messagebox.showinfo("Success", "Airline record deleted successfully!")
             else:
                 messagebox.showwarning("Not Found", "No airline found with the given ID.")
-        except ValueError:
-            # Error when airline ID is not a valid integer
-            messagebox.showerror("Error", "Invalid Airline ID. Please enter a numeric value.")
+
+        # An airline that still has flights while ON_DELETE is "restrict" is reported as an error
+        run_in_background(window, AsyncAirlineRecord.delete_airline(airline_id), deleted, busy=busy)
 
     def update_airline():
         """
         Update an existing airline record by ID.
 
-        Validates the input data and updates the airline record
-        using the provided ID and new company name.
+        Validates the input data and updates the airline record with
+        the provided ID and new company name in the background.
         """
-        try:
-            airline_id = int(airline_id_entry.get().strip())  # Get airline ID
-            new_name = company_name_entry.get().strip()  # Get new company name
-            if not new_name:
-                # Error when company name is empty
-                messagebox.showerror("Error", "Company Name cannot be empty. Please provide a name.")
-                return
-
-            if AirlineRecord.update_airline(airline_id, {"Company Name": new_name}):
+        airline_id = read_airline_id(airline_id_entry)  # Get airline ID
+        if airline_id is None:
+            return
+        new_name = company_name_entry.get().strip()  # Get new company name
+        if not new_name:
+            # Error when company name is empty
+            messagebox.showerror("Error", "Company Name cannot be empty. Please provide a name.")
+            return
+
+        def updated(found):
+            if found:
                 messagebox.showinfo("Success", "Airline record updated successfully!")
             else:
                 messagebox.showwarning("Not Found", "No airline found with the given ID.")
-        except ValueError as ve:
-            # Specific error messages for backend validation issues
-            if "Duplicate airline name detected" in str(ve):
-                messagebox.showerror("Error", str(ve))
-            else:
-                messagebox.showerror("Error", "Invalid Airline ID. Please enter a numeric value.")
-        except Exception as e:
-            # Generic error handling
-            messagebox.showerror("Error", str(e))
+
+        # Errors from the backend, such as a duplicate airline name, are shown as they are
+        run_in_background(window, AsyncAirlineRecord.update_airline(airline_id, {"Company Name": new_name}), updated, busy=busy)
 
     def search_airline():
         """
@@ -86,9 +130,11 @@ def manage_airline_gui():
         Retrieves the airline ID from the input field
         and displays the corresponding record in the result box.
         """
-        try:
-            airline_id = int(search_entry.get().strip())
-            result = AirlineRecord.search(airline_id)
+        airline_id = read_airline_id(search_entry)
+        if airline_id is None:
+            return
+
+        def found(result):
             result_text.delete(1.0, tk.END)  # Clear previous search results
             if result:
                 # Display the found airline record
@@ -98,9 +144,43 @@ def manage_airline_gui():
             else:
                 # No record found
                 messagebox.showwarning("Not Found", "No airline found with the given ID.")
-        except ValueError:
-            # Error when airline ID is not valid
-            messagebox.showerror("Error", "Invalid ID. Please enter a numeric value.")
+
+        run_in_background(window, AsyncAirlineRecord.search(airline_id), found, busy=busy)
+
+    def show_flights():
+        """
+        Show the flights of an airline.
+
+        Retrieves the airline ID from the input field and lists the airline's
+        flights in the result box, using the Airline ID index of the flights.
+        """
+        airline_id = read_airline_id(search_entry)
+        if airline_id is None:
+            return
+
+        def found(flights):
+            result_text.delete(1.0, tk.END)  # Clear previous results
+            if not flights:
+                messagebox.showinfo("Not Found", "No flights found for the given Airline ID.")
+                return
+            result_text.insert(tk.END, f"{len(flights)} flight(s) for Airline {airline_id}:\n")
+            for flight in flights[:MAX_LISTED_FLIGHTS]:
+                result_text.insert(
+                    tk.END,
+                    f"Flight {flight.get('Flight_ID')}: {flight.get('Date/Time')} "
+                    f"{flight.get('Start City', '')} -> {flight.get('End City', '')} "
+                    f"(Client {flight.get('Client_ID')})\n",
+                )
+            if len(flights) > MAX_LISTED_FLIGHTS:
+                result_text.insert(tk.END, f"... and {len(flights) - MAX_LISTED_FLIGHTS} more\n")
+
+        run_in_background(window, AsyncFlightRecord.find_by_airline(airline_id), found, busy=busy)
+
+    def browse_airlines():
+        """
+        Open a window listing all airlines a page at a time, sortable by any column.
+        """
+        open_browser("Airline Records", AsyncAirlineRecord, [field for field, _ in Airline.FIELDS])
 
     def clear_inputs():
         """
@@ -144,6 +224,9 @@ def manage_airline_gui():
     window.geometry("900x750")
     window.configure(bg="#1C1C1C")
 
+    # Shown while a record operation runs in the background
+    busy = BusyIndicator(window)
+
     # Tooltip for additional information
     info_icon = tk.Label(window, text="ⓘ", font=("Helvetica", 14, "bold"), bg="#1C1C1C", fg="#3498DB")
     info_icon.place(x=10, y=10)
@@ -152,7 +235,7 @@ def manage_airline_gui():
 
     tooltip = tk.Label(
         window,
-        text="Enter airline ID number to search or delete.\nWhen recording a new airline at the bottom of this screen,\nplease confirm the airline name does not already exist.",
+        text="Enter airline ID number to search or delete.\nWhen recording a new airline at the bottom of this screen,\nyou will be asked to confirm if similar airline names already exist.",
         font=("Helvetica", 10),
         bg="#333333",
         fg="white",
@@ -171,7 +254,13 @@ def manage_airline_gui():
     search_entry.place(relx=0.6, y=120, anchor="center", width=270)
 
     search_button = tk.Button(window, text="Search", command=search_airline, font=("Helvetica", 12, "bold"), bg="#F39C12", fg="white", activebackground="#D35400", activeforeground="white", width=12)
-    search_button.place(relx=0.5, y=160, anchor="center")
+    search_button.place(relx=0.4, y=160, anchor="center")
+
+    flights_button = tk.Button(window, text="Show Flights", command=show_flights, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=12)
+    flights_button.place(relx=0.6, y=160, anchor="center")
+
+    browse_button = tk.Button(window, text="Browse All", command=browse_airlines, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=12)
+    browse_button.place(relx=0.8, y=160, anchor="center")
 
     result_text = tk.Text(window, height=10, width=70, bg="#2E2E2E", fg="white", font=("Courier", 10))
     result_text.place(relx=0.5, y=260, anchor="center")
@@ -0,0 +1,181 @@
+"""
+This module provides a paged record browser for the Record Management System.
+
+The browser lists records in a table, but only ever holds one page of rows: the table is
+exactly one page high, and its scrollbar is driven by the position of the page within all
+records rather than by the rows in the widget. Each scroll fetches the page now in view
+through the paged query of the record class, in the background, so files with millions
+of records scroll as quickly as small ones. Clicking a column heading sorts by that column
+through a sorted index.
+
+Functions:
+    open_browser: Open a window browsing the records of one record class.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from gui.tasks import BusyIndicator, run_in_background
+
+# Number of rows shown, and fetched, at a time
+PAGE_ROWS = 20
+
+
+def open_browser(title, async_record, fields):
+    """
+    Open a window browsing the records of one record class.
+
+    Args:
+        title (str): The title of the window, such as "Client Records".
+        async_record (type): The asynchronous facade of the record class, such as AsyncClientRecord.
+        fields (list): The fields shown as columns, in order.
+    """
+    state = {
+        "offset": 0,  # Position of the first row shown
+        "total": 0,  # Number of records in the data file
+        "sort_by": None,  # Field the rows are sorted by, or None for file order
+        "descending": False,
+        "loading": False,  # Whether a page is being fetched
+        "wanted": None,  # Offset to fetch once the running fetch finishes, if the user scrolled meanwhile
+    }
+
+    def load(offset):
+        """
+        Fetch and show the page starting at an offset, unless a fetch is already running.
+
+        Args:
+            offset (int): The position of the first row to show.
+        """
+        offset = max(0, min(offset, max(state["total"] - PAGE_ROWS, 0)))
+        if state["loading"]:
+            # Only the latest position matters, so scrolling never queues up fetches
+            state["wanted"] = offset
+            return
+        state["loading"] = True
+        future = async_record.page(offset, PAGE_ROWS, state["sort_by"], state["descending"])
+        run_in_background(window, future, show_page, failed, busy)
+
+    def show_page(page):
+        """
+        Replace the rows of the table with a fetched page.
+
+        Args:
+            page (Page): The fetched page.
+        """
+        state["loading"] = False
+        state["offset"], state["total"] = page.offset, page.total
+        table.delete(*table.get_children())
+        for record in page.records:
+            table.insert("", tk.END, values=[format_value(record.get(field)) for field in fields])
+        if page.total:
+            scrollbar.set(page.offset / page.total, (page.offset + len(page.records)) / page.total)
+            status_label.config(text=f"Records {page.offset + 1}-{page.offset + len(page.records)} of {page.total}")
+        else:
+            scrollbar.set(0, 1)
+            status_label.config(text="No records")
+        wanted, state["wanted"] = state["wanted"], None
+        if wanted is not None:
+            # The user scrolled or sorted while the page was fetched
+            load(wanted)
+
+    def failed(error):
+        """
+        Show an error from a page fetch.
+
+        Args:
+            error (Exception): The error raised by the fetch.
+        """
+        state["loading"] = False
+        state["wanted"] = None
+        status_label.config(text=f"Error: {error}")
+
+    def format_value(value):
+        """
+        Format a field value for a table cell.
+
+        Args:
+            value: The field value, or None if the record does not have it.
+
+        Returns:
+            str: The text of the cell.
+        """
+        return "" if value is None else str(value)
+
+    def scroll(*args):
+        """
+        Move to another page in response to the scrollbar.
+
+        Args:
+            *args: ("moveto", fraction) when the slider is dragged,
+                or ("scroll", count, "units" or "pages") when the arrows or trough are clicked.
+        """
+        if args[0] == "moveto":
+            load(int(float(args[1]) * state["total"]))
+        elif args[0] == "scroll":
+            step = PAGE_ROWS if args[2] == "pages" else 1
+            load(state["offset"] + int(args[1]) * step)
+
+    def scroll_wheel(event):
+        """
+        Move by a few rows in response to the mouse wheel.
+        """
+        if event.num == 4 or event.delta > 0:
+            load(state["offset"] - 3)
+        else:
+            load(state["offset"] + 3)
+        return "break"
+
+    def sort_by(field):
+        """
+        Sort the rows by a column, or reverse the order if they are already sorted by it.
+
+        Args:
+            field (str): The field of the clicked column.
+        """
+        if state["sort_by"] == field:
+            state["descending"] = not state["descending"]
+        else:
+            state["sort_by"], state["descending"] = field, False
+        for column in fields:
+            arrow = ""
+            if column == field:
+                arrow = " ▼" if state["descending"] else " ▲"
+            table.heading(column, text=column + arrow)
+        state["offset"] = 0
+        load(0)
+
+    # Create a new window for browsing records
+    window = tk.Toplevel()
+    window.title(f"Browse {title}")
+    window.geometry("900x560")
+    window.configure(bg="#1C1C1C")
+
+    # Shown while a page is being fetched
+    busy = BusyIndicator(window)
+
+    title_label = tk.Label(window, text=f"Browse {title}", font=("Helvetica", 18, "bold"), bg="#1C1C1C", fg="white")
+    title_label.pack(pady=(15, 10))
+
+    frame = tk.Frame(window, bg="#1C1C1C")
+    frame.pack(fill="both", expand=True, padx=15)
+
+    # The table is exactly one page high, so it never scrolls by itself
+    table = ttk.Treeview(frame, columns=fields, show="headings", height=PAGE_ROWS, selectmode="browse")
+    for field in fields:
+        table.heading(field, text=field, command=lambda field=field: sort_by(field))
+        table.column(field, width=120, stretch=True)
+    table.pack(side="left", fill="both", expand=True)
+
+    scrollbar = ttk.Scrollbar(frame, orient="vertical", command=scroll)
+    scrollbar.pack(side="right", fill="y")
+
+    for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+        table.bind(sequence, scroll_wheel)
+    window.bind("<Prior>", lambda event: load(state["offset"] - PAGE_ROWS))
+    window.bind("<Next>", lambda event: load(state["offset"] + PAGE_ROWS))
+    window.bind("<Home>", lambda event: load(0))
+    window.bind("<End>", lambda event: load(state["total"]))
+
+    status_label = tk.Label(window, text="Loading...", font=("Helvetica", 10), bg="#1C1C1C", fg="white")
+    status_label.pack(pady=10)
+
+    load(0)
@@ -1,6 +1,18 @@
 import tkinter as tk
 from tkinter import messagebox
-from record.client import ClientRecord
+from record.background import AsyncClientRecord, AsyncFlightRecord
+from gui.tasks import BusyIndicator, run_in_background
+from gui.browser import open_browser
+from record.models import Client
+
+# Largest number of flights listed in the result box at once
+MAX_LISTED_FLIGHTS = 200
+
+# Largest number of clients listed while typing a name
+MAX_NAME_MATCHES = 10
+
+# Milliseconds to wait after the last keystroke before searching names
+NAME_SEARCH_DELAY = 150
 
 
 def manage_client_gui():
@@ -12,89 +24,103 @@ def manage_client_gui():
     - Update existing client records
     - Delete client records
     - Search for client records by ID
+    - Find clients by name while typing
+    - Browse all client records a page at a time
+    - Show the flights of a client
     """
 
     def save_client():
         """
         Save a new client record.
 
-        Collects client data from input fields, validates it,
-        and saves it using the backend logic.
+        Collects client data from input fields and saves it in the background,
+        where the backend logic validates it.
         """
-        try:
-            client_data = {
-                "ID": ClientRecord.generate_id(),
-                "Name": name_entry.get(),
-                "Address Line 1": address1_entry.get(),
-                "Address Line 2": address2_entry.get(),
-                "Address Line 3": address3_entry.get(),
-                "City": city_entry.get(),
-                "State": state_entry.get(),
-                "Zip Code": zip_entry.get(),
-                "Country": country_entry.get(),
-                "Phone Number": phone_entry.get(),
-            }
-            # Save the client record
-            ClientRecord.create(client_data)
-            messagebox.showinfo("Success", "Client record created!")
+        client_data = {
+            "Name": name_entry.get(),
+            "Address Line 1": address1_entry.get(),
+            "Address Line 2": address2_entry.get(),
+            "Address Line 3": address3_entry.get(),
+            "City": city_entry.get(),
+            "State": state_entry.get(),
+            "Zip Code": zip_entry.get(),
+            "Country": country_entry.get(),
+            "Phone Number": phone_entry.get(),
+        }
+
+        def saved(client_id):
+            messagebox.showinfo("Success", f"Client record created (ID {client_id})!")
             clear_inputs()  # Clear the input fields after saving
-        except ValueError as ve:
-            # Display specific error messages from the backend
-            messagebox.showerror("Error", str(ve))
-        except Exception as e:
-            # Catch all other exceptions
-            messagebox.showerror("Error", str(e))
+
+        # Save the client record
+        # The new ID is allocated by create, so two windows never get the same ID
+        # Errors from the backend, such as an invalid or duplicate phone number, are shown as they are
+        run_in_background(window, AsyncClientRecord.create(client_data), saved, busy=busy)
+
+    def read_client_id():
+        """
+        Read the client ID from the input field.
+
+        Returns:
+            int: The client ID, or None after showing an error if it is not a number.
+        """
+        try:
+            return int(search_entry.get())
+        except ValueError:
+            # Error when client ID is not valid
+            messagebox.showerror("Invalid Input", "Please enter a valid numeric Client ID.")
+            return None
 
     def delete_client():
         """
         Delete a client record by ID.
 
-        Retrieves the client ID from the input field and attempts
-        to delete the corresponding record.
+        Retrieves the client ID from the input field and deletes
+        the corresponding record in the background.
         """
-        try:
-            client_id = int(search_entry.get())
-            if ClientRecord.delete(client_id):
+        client_id = read_client_id()
+        if client_id is None:
+            return
+
+        def deleted(found):
+            if found:
                 messagebox.showinfo("Success", "Client record deleted!")
             else:
                 messagebox.showinfo("Not Found", "No client found with the given ID.")
-        except ValueError:
-            # Error when client ID is not valid
-            messagebox.showerror("Invalid Input", "Please enter a valid numeric Client ID.")
+
+        # A client that still has flights while ON_DELETE is "restrict" is reported as an error
+        run_in_background(window, AsyncClientRecord.delete(client_id), deleted, busy=busy)
 
     def update_client():
         """
         Update an existing client record.
 
-        Collects the updated data from input fields, validates it,
-        and updates the client record using the provided ID.
+        Collects the updated data from input fields and updates the client
+        record with the provided ID in the background.
         """
-        try:
-            client_id = int(search_entry.get())
-            updated_data = {
-                "Name": name_entry.get(),
-                "Address Line 1": address1_entry.get(),
-                "Address Line 2": address2_entry.get(),
-                "Address Line 3": address3_entry.get(),
-                "City": city_entry.get(),
-                "State": state_entry.get(),
-                "Zip Code": zip_entry.get(),
-                "Country": country_entry.get(),
-                "Phone Number": phone_entry.get(),
-            }
-            if ClientRecord.update(client_id, updated_data):
+        client_id = read_client_id()
+        if client_id is None:
+            return
+        updated_data = {
+            "Name": name_entry.get(),
+            "Address Line 1": address1_entry.get(),
+            "Address Line 2": address2_entry.get(),
+            "Address Line 3": address3_entry.get(),
+            "City": city_entry.get(),
+            "State": state_entry.get(),
+            "Zip Code": zip_entry.get(),
+            "Country": country_entry.get(),
+            "Phone Number": phone_entry.get(),
+        }
+
+        def updated(found):
+            if found:
                 messagebox.showinfo("Success", "Client record updated!")
             else:
                 messagebox.showinfo("Not Found", "No client found with the given ID.")
-        except ValueError as ve:
-            # Display specific error messages from the backend (e.g., invalid phone number)
-            if "Invalid phone number format" in str(ve):
-                messagebox.showerror("Error", str(ve))
-            else:
-                messagebox.showerror("Error", "Please enter a valid numeric Client ID.")
-        except Exception as e:
-            # Handle any other unforeseen exceptions
-            messagebox.showerror("Error", str(e))
+
+        # Errors from the backend, such as an invalid or duplicate phone number, are shown as they are
+        run_in_background(window, AsyncClientRecord.update(client_id, updated_data), updated, busy=busy)
 
     def search_client():
         """
@@ -103,9 +129,11 @@ def manage_client_gui():
         Retrieves the client ID from the input field and displays
         the corresponding record in the result box.
         """
-        try:
-            client_id = int(search_entry.get())
-            record = ClientRecord.search(client_id)
+        client_id = read_client_id()
+        if client_id is None:
+            return
+
+        def found(record):
             result_text.delete(1.0, tk.END)  # Clear previous search results
             if record:
                 # Display the found client record
@@ -115,9 +143,81 @@ def manage_client_gui():
             else:
                 # No record found
                 messagebox.showinfo("Not Found", "No client found with the given ID.")
-        except ValueError:
-            # Error when client ID is not valid
-            messagebox.showerror("Invalid Input", "Please enter a valid numeric Client ID.")
+
+        run_in_background(window, AsyncClientRecord.search(client_id), found, busy=busy)
+
+    def show_flights():
+        """
+        Show the flights of a client.
+
+        Retrieves the client ID from the input field and lists the client's
+        flights in the result box, using the Client ID index of the flights.
+        """
+        client_id = read_client_id()
+        if client_id is None:
+            return
+
+        def found(flights):
+            result_text.delete(1.0, tk.END)  # Clear previous results
+            if not flights:
+                messagebox.showinfo("Not Found", "No flights found for the given Client ID.")
+                return
+            result_text.insert(tk.END, f"{len(flights)} flight(s) for Client {client_id}:\n")
+            for flight in flights[:MAX_LISTED_FLIGHTS]:
+                result_text.insert(
+                    tk.END,
+                    f"Flight {flight.get('Flight_ID')}: {flight.get('Date/Time')} "
+                    f"{flight.get('Start City', '')} -> {flight.get('End City', '')} "
+                    f"(Airline {flight.get('Airline_ID')})\n",
+                )
+            if len(flights) > MAX_LISTED_FLIGHTS:
+                result_text.insert(tk.END, f"... and {len(flights) - MAX_LISTED_FLIGHTS} more\n")
+
+        run_in_background(window, AsyncFlightRecord.find_by_client(client_id), found, busy=busy)
+
+    def schedule_name_search(event=None):
+        """
+        Search client names shortly after the user stops typing.
+
+        Each keystroke restarts the delay, so fast typing only triggers one search.
+        """
+        if name_search["pending"] is not None:
+            window.after_cancel(name_search["pending"])
+        name_search["pending"] = window.after(NAME_SEARCH_DELAY, search_names)
+
+    def search_names():
+        """
+        List the clients whose name, or a word of it, starts with the text typed so far.
+        """
+        name_search["pending"] = None
+        prefix = name_search_entry.get()
+        # Results of an older search that arrive late are dropped, even once the box is emptied
+        name_search["query"] += 1
+        query = name_search["query"]
+        if not prefix.strip():
+            result_text.delete(1.0, tk.END)
+            return
+
+        def found(clients):
+            if query != name_search["query"]:
+                return
+            result_text.delete(1.0, tk.END)
+            if not clients:
+                result_text.insert(tk.END, f"No clients found starting with \"{prefix.strip()}\".\n")
+                return
+            for client in clients:
+                result_text.insert(
+                    tk.END,
+                    f"{client.get('ID')}: {client.get('Name', '')}  {client.get('City', '')}  {client.get('Phone Number', '')}\n",
+                )
+
+        run_in_background(window, AsyncClientRecord.search_name_prefix(prefix, MAX_NAME_MATCHES), found)
+
+    def browse_clients():
+        """
+        Open a window listing all clients a page at a time, sortable by any column.
+        """
+        open_browser("Client Records", AsyncClientRecord, [field for field, _ in Client.FIELDS])
 
     def clear_inputs():
         """
@@ -164,13 +264,16 @@ def manage_client_gui():
     window.geometry("900x900")
     window.configure(bg="#1C1C1C")
 
+    # Shown while a record operation runs in the background
+    busy = BusyIndicator(window)
+
     # Tooltip for additional information
     info_icon = tk.Label(window, text="ⓘ", font=("Helvetica", 14, "bold"), bg="#1C1C1C", fg="#3498DB")
     info_icon.place(x=10, y=10)
     info_icon.bind("<Enter>", show_tooltip)
     info_icon.bind("<Leave>", hide_tooltip)
 
-    tooltip = tk.Label(window, text="Enter client ID number to search or delete.\nWhen recording a new client at the bottom of this screen,\nplease confirm the duplicate client with the same phone number does not already exist.",
+    tooltip = tk.Label(window, text="Enter client ID number to search or delete.\nType in Find by Name to list clients whose name starts with the text.\nWhen recording a new client at the bottom of this screen,\nplease confirm the duplicate client with the same phone number does not already exist.",
                        font=("Helvetica", 10), bg="#333333", fg="white", wraplength=300)
     tooltip.place_forget()
 
@@ -185,11 +288,25 @@ def manage_client_gui():
     search_entry.place(relx=0.6, y=120, anchor="center", width=250)
 
     search_button = tk.Button(window, text="Search", command=search_client, font=("Helvetica", 12, "bold"), bg="#F39C12", fg="white", activebackground="#D35400", activeforeground="white", width=12)
-    search_button.place(relx=0.5, y=160, anchor="center")
+    search_button.place(relx=0.4, y=160, anchor="center")
+
+    flights_button = tk.Button(window, text="Show Flights", command=show_flights, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=12)
+    flights_button.place(relx=0.6, y=160, anchor="center")
+
+    browse_button = tk.Button(window, text="Browse All", command=browse_clients, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=12)
+    browse_button.place(relx=0.8, y=160, anchor="center")
 
     result_text = tk.Text(window, height=10, width=70, bg="#2E2E2E", fg="white", font=("Courier", 10))
     result_text.place(relx=0.5, y=260, anchor="center")
 
+    # Search-as-you-type by name
+    name_search = {"pending": None, "query": 0}  # Scheduled search, and the number of the latest search
+    name_search_label = tk.Label(window, text="Find by Name:", font=("Helvetica", 12), bg="#1C1C1C", fg="white")
+    name_search_label.place(relx=0.35, y=385, anchor="center")
+    name_search_entry = tk.Entry(window, bg="#333333", fg="white", insertbackground="white")
+    name_search_entry.place(relx=0.6, y=385, anchor="center", width=250)
+    name_search_entry.bind("<KeyRelease>", schedule_name_search)
+
     record_button = tk.Button(window, text="Manage Clients", command=reveal_fields, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=20)
     record_button.place(relx=0.5, y=430, anchor="center")
 
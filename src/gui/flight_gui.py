@@ -1,6 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox
-from record.flight import FlightRecord
+from record.background import AsyncFlightRecord
+from gui.tasks import BusyIndicator, run_in_background
+from gui.browser import open_browser
+from record.models import Flight
+
+# Largest number of flights listed in the result box at once
+MAX_LISTED_FLIGHTS = 200
 
 
 def manage_flight_gui():
@@ -12,91 +18,103 @@ def manage_flight_gui():
     - Update existing flight records
     - Delete flight records
     - Search for flight records by ID
+    - Browse all flight records a page at a time
+    - Find the flights departing in a date range
     """
 
-    def save_flight():
+    def read_flight_data():
         """
-        Save a new flight record.
+        Read the flight data from the input fields.
 
-        Collects flight data from input fields, validates it, and saves it using the backend logic.
-        Ensures that duplicate flights with the same Client ID, Airline ID, and Date/Time are not created.
+        Returns:
+            dict: The flight data, or None after showing an error if an ID is not a number.
         """
         try:
-            flight_data = {
-                "Flight_ID": FlightRecord.generate_id(),
+            return {
                 "Client_ID": int(client_id_entry.get()),
                 "Airline_ID": int(airline_id_entry.get()),
                 "Date/Time": date_entry.get(),
                 "Start City": start_city_entry.get(),
                 "End City": end_city_entry.get(),
             }
+        except ValueError:
+            # Error when the client or airline ID is not valid
+            messagebox.showerror("Error", "Please enter valid numeric Client and Airline IDs.")
+            return None
 
-            # Check for duplicate flight records
-            if FlightRecord.is_duplicate_flight(
-                flight_data["Client_ID"], flight_data["Airline_ID"], flight_data["Date/Time"]
-            ):
-                messagebox.showerror("Error", "Duplicate flight record detected.")
-                return
+    def read_flight_id():
+        """
+        Read the flight ID from the input field.
+
+        Returns:
+            int: The flight ID, or None after showing an error if it is not a number.
+        """
+        try:
+            return int(flight_id_entry.get())
+        except ValueError:
+            # Error when flight ID is not valid
+            messagebox.showerror("Invalid Input", "Please enter a valid numeric Flight ID.")
+            return None
 
-            # Save the flight record
-            FlightRecord.create(flight_data)
-            messagebox.showinfo("Success", "Flight record created successfully!")
+    def save_flight():
+        """
+        Save a new flight record.
+
+        Collects flight data from input fields and saves it in the background, where the backend logic validates it.
+        The backend rejects duplicate flights with the same Client ID, Airline ID, and Date/Time.
+        """
+        flight_data = read_flight_data()
+        if flight_data is None:
+            return
+
+        def saved(flight_id):
+            messagebox.showinfo("Success", f"Flight record created successfully (ID {flight_id})!")
             clear_inputs()  # Clear the input fields after saving
-        except ValueError as ve:
-            # Check for specific backend validation errors
-            if "Invalid date and time format" in str(ve):
-                messagebox.showerror("Error", str(ve))  # Display date/time format errors
-            else:
-                messagebox.showerror("Error", "Please enter valid numeric Flight ID.")
-        except Exception as e:
-            # Catch all other exceptions
-            messagebox.showerror("Error", str(e))
+
+        # Save the flight record
+        # The new ID is allocated by create, so two windows never get the same ID
+        # Date/time format, duplicate and reference errors from the backend are shown as they are
+        run_in_background(window, AsyncFlightRecord.create(flight_data), saved, busy=busy)
 
     def delete_flight():
         """
         Delete a flight record by ID.
 
-        Retrieves the flight ID from the input field and attempts to delete the corresponding record.
+        Retrieves the flight ID from the input field and deletes the corresponding record in the background.
         """
-        try:
-            flight_id = int(flight_id_entry.get())
-            if FlightRecord.delete(flight_id):
+        flight_id = read_flight_id()
+        if flight_id is None:
+            return
+
+        def deleted(found):
+            if found:
                 messagebox.showinfo("Success", "Flight record deleted!")
             else:
                 messagebox.showinfo("Not Found", "No flight found with the given ID.")
-        except ValueError:
-            # Error when flight ID is not valid
-            messagebox.showerror("Invalid Input", "Please enter a valid numeric Flight ID.")
+
+        run_in_background(window, AsyncFlightRecord.delete(flight_id), deleted, busy=busy)
 
     def update_flight():
         """
         Update an existing flight record.
 
-        Collects updated flight data from input fields, validates it, and updates the record using the provided ID.
+        Collects updated flight data from input fields and updates the record with the provided ID in the background.
         """
-        try:
-            flight_id = int(flight_id_entry.get())
-            updated_data = {
-                "Client_ID": int(client_id_entry.get()),
-                "Airline_ID": int(airline_id_entry.get()),
-                "Date/Time": date_entry.get(),
-                "Start City": start_city_entry.get(),
-                "End City": end_city_entry.get(),
-            }
-            # Update the flight record
-            if FlightRecord.update(flight_id, updated_data):
+        flight_id = read_flight_id()
+        if flight_id is None:
+            return
+        updated_data = read_flight_data()
+        if updated_data is None:
+            return
+
+        def updated(found):
+            if found:
                 messagebox.showinfo("Success", "Flight record updated!")
             else:
                 messagebox.showinfo("Not Found", "No flight found with the given ID.")
-        except ValueError as ve:
-            # Display specific error messages from the backend
-            if "Invalid date and time format" in str(ve):
-                messagebox.showerror("Error", str(ve))
-            else:
-                messagebox.showerror("Error", "Please enter valid numeric Flight ID.")
-        except Exception as e:
-            # Catch all other exceptions
-            messagebox.showerror("Error", str(e))
+
+        # Date/time format, duplicate and reference errors from the backend are shown as they are
+        run_in_background(window, AsyncFlightRecord.update(flight_id, updated_data), updated, busy=busy)
 
     def search_flight():
         """
@@ -104,9 +122,11 @@ def manage_flight_gui():
 
         Retrieves the flight ID from the input field and displays the corresponding record in the result box.
         """
-        try:
-            flight_id = int(flight_id_entry.get())
-            record = FlightRecord.search(flight_id)
+        flight_id = read_flight_id()
+        if flight_id is None:
+            return
+
+        def found(record):
             result_text.delete(1.0, tk.END)  # Clear previous search results
             if record:
                 # Display the found flight record
@@ -116,9 +136,46 @@ def manage_flight_gui():
             else:
                 # No record found
                 messagebox.showinfo("Not Found", "No flight found with the given ID.")
-        except ValueError:
-            # Error when flight ID is not valid
-            messagebox.showerror("Invalid Input", "Please enter a valid numeric Flight ID.")
+
+        run_in_background(window, AsyncFlightRecord.search(flight_id), found, busy=busy)
+
+    def find_flights_between():
+        """
+        Find the flights departing in a date range and display them in time order.
+
+        Retrieves the range from the From and To fields; either may be left empty
+        for an open range. The flights are found through the sorted Date/Time index.
+        """
+        start = from_entry.get().strip() or None
+        end = to_entry.get().strip() or None
+
+        def found(flights):
+            result_text.delete(1.0, tk.END)  # Clear previous results
+            if not flights:
+                messagebox.showinfo("Not Found", "No flights found in the given date range.")
+                return
+            for flight in flights[:MAX_LISTED_FLIGHTS]:
+                result_text.insert(
+                    tk.END,
+                    f"{flight.get('Date/Time')}  Flight {flight.get('Flight_ID')}: "
+                    f"{flight.get('Start City', '')} -> {flight.get('End City', '')} "
+                    f"(Client {flight.get('Client_ID')}, Airline {flight.get('Airline_ID')})\n",
+                )
+            if len(flights) > MAX_LISTED_FLIGHTS:
+                result_text.insert(tk.END, f"Showing the first {MAX_LISTED_FLIGHTS} flights; narrow the range to see more.\n")
+
+        def failed(error):
+            # Error when a date and time is not in the expected format
+            messagebox.showerror("Invalid Input", str(error))
+
+        # Ask for one more flight than is listed, to know whether there are more
+        run_in_background(window, AsyncFlightRecord.find_between(start, end, limit=MAX_LISTED_FLIGHTS + 1), found, failed, busy=busy)
+
+    def browse_flights():
+        """
+        Open a window listing all flights a page at a time, sortable by any column.
+        """
+        open_browser("Flight Records", AsyncFlightRecord, [field for field, _ in Flight.FIELDS])
 
     def clear_inputs():
         """
@@ -162,13 +219,16 @@ def manage_flight_gui():
     window.geometry("900x750")
     window.configure(bg="#1C1C1C")
 
+    # Shown while a record operation runs in the background
+    busy = BusyIndicator(window)
+
     # Tooltip for additional information
     info_icon = tk.Label(window, text="ⓘ", font=("Helvetica", 14, "bold"), bg="#1C1C1C", fg="#3498DB")
     info_icon.place(x=10, y=10)
     info_icon.bind("<Enter>", show_tooltip)
     info_icon.bind("<Leave>", hide_tooltip)
 
-    tooltip = tk.Label(window, text="Enter flight ID number to search or delete.\nWhen recording a new flight at the bottom of this screen,\nplease confirm the duplicate flight record with the same client ID, airline ID, and date/time does not already exist.",
+    tooltip = tk.Label(window, text="Enter flight ID number to search or delete.\nEnter From and To dates (YYYY-MM-DD HH:MM) to find flights departing in that range.\nWhen recording a new flight at the bottom of this screen,\nplease confirm the duplicate flight record with the same client ID, airline ID, and date/time does not already exist.",
                        font=("Helvetica", 10), bg="#333333", fg="white", wraplength=300)
     tooltip.place_forget()
 
@@ -185,9 +245,26 @@ def manage_flight_gui():
     search_button = tk.Button(window, text="Search", command=search_flight, font=("Helvetica", 12, "bold"), bg="#F39C12", fg="white", activebackground="#D35400", activeforeground="white", width=12)
     search_button.place(relx=0.5, y=160, anchor="center")
 
+    browse_button = tk.Button(window, text="Browse All", command=browse_flights, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=12)
+    browse_button.place(relx=0.7, y=160, anchor="center")
+
     result_text = tk.Text(window, height=10, width=70, bg="#2E2E2E", fg="white", font=("Courier", 10))
     result_text.place(relx=0.5, y=260, anchor="center")
 
+    # Date range search
+    from_label = tk.Label(window, text="From:", font=("Helvetica", 12), bg="#1C1C1C", fg="white")
+    from_label.place(relx=0.1, y=385, anchor="center")
+    from_entry = tk.Entry(window, bg="#333333", fg="white", insertbackground="white")
+    from_entry.place(relx=0.25, y=385, anchor="center", width=170)
+
+    to_label = tk.Label(window, text="To:", font=("Helvetica", 12), bg="#1C1C1C", fg="white")
+    to_label.place(relx=0.42, y=385, anchor="center")
+    to_entry = tk.Entry(window, bg="#333333", fg="white", insertbackground="white")
+    to_entry.place(relx=0.56, y=385, anchor="center", width=170)
+
+    range_button = tk.Button(window, text="Find Flights", command=find_flights_between, font=("Helvetica", 12, "bold"), bg="#F39C12", fg="white", activebackground="#D35400", activeforeground="white", width=12)
+    range_button.place(relx=0.8, y=385, anchor="center")
+
     record_button = tk.Button(window, text="Manage Flights", command=reveal_fields, font=("Helvetica", 12, "bold"), bg="#3498DB", fg="white", activebackground="#2980B9", activeforeground="white", width=20)
     record_button.place(relx=0.5, y=430, anchor="center")
 
@@ -0,0 +1,93 @@
+"""
+This module connects background record calls to the Tk windows of the Record Management System.
+
+Tk widgets may only be used from the thread running the main loop, so the result of a
+background call is not delivered by the worker thread. Instead the window polls the
+future with after() and runs the callback on the Tk thread once the call has finished.
+The window stays responsive in the meantime and shows a busy indicator.
+
+Classes:
+    BusyIndicator: Shows that background work is running in a window.
+
+Functions:
+    run_in_background: Deliver the result of a background call to a callback on the Tk thread.
+"""
+
+import tkinter as tk
+from tkinter import messagebox
+
+# Milliseconds between checks of a running background call
+POLL_INTERVAL = 50
+
+
+class BusyIndicator:
+    """
+    Shows that background work is running in a window: a status label and a busy cursor.
+
+    Calls may overlap, so the indicator is shown until the last running call has finished.
+    """
+
+    def __init__(self, window):
+        """
+        Create a hidden busy indicator in a window.
+
+        Args:
+            window (tk.Toplevel): The window showing the indicator.
+        """
+        self.window = window
+        self.label = tk.Label(window, text="Working...", font=("Helvetica", 10, "italic"), bg="#1C1C1C", fg="#F39C12")
+        self.running = 0  # Number of calls running
+
+    def start(self):
+        """
+        Show the indicator for one more running call.
+        """
+        self.running += 1
+        if self.running == 1:
+            self.label.place(relx=1.0, x=-10, y=10, anchor="ne")
+            self.window.configure(cursor="watch")
+
+    def stop(self):
+        """
+        Hide the indicator once no call is running anymore.
+        """
+        self.running -= 1
+        if self.running == 0:
+            self.label.place_forget()
+            self.window.configure(cursor="")
+
+
+def run_in_background(window, future, on_success, on_error=None, busy=None):
+    """
+    Deliver the result of a background call to a callback on the Tk thread.
+
+    Args:
+        window (tk.Misc): The window waiting for the result.
+        future (concurrent.futures.Future): The background call, such as AsyncClientRecord.create(...).
+        on_success (callable): Called with the result of the call.
+        on_error (callable, optional): Called with the exception raised by the call.
+            If omitted, the error message is shown in an error box.
+        busy (BusyIndicator, optional): The indicator shown while the call runs.
+    """
+    if busy is not None:
+        busy.start()
+
+    def check():
+        if not future.done():
+            try:
+                window.after(POLL_INTERVAL, check)
+            except tk.TclError:
+                # The window was closed; the call still finishes, but nobody is waiting for it
+                pass
+            return
+        if busy is not None:
+            busy.stop()
+        error = future.exception()
+        if error is None:
+            on_success(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            messagebox.showerror("Error", str(error))
+
+    window.after(POLL_INTERVAL, check)
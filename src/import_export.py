@@ -0,0 +1,287 @@
+"""
+This module is a command-line entry point for importing and exporting records without the GUI.
+
+It:
+- Imports client, airline or flight records from CSV or newline-delimited JSON (NDJSON) files.
+- Reads the input in chunks, so memory use does not grow with the size of the input file.
+- Validates and saves each chunk with the bulk create methods of the record classes,
+  which apply the same rules as the GUI (such as ClientRecord.is_valid_phone and
+  FlightRecord.is_valid_date_time).
+- Rejects rows whose ID is already stored or repeated in the input, or with --on-conflict renumber,
+  imports them under new IDs instead.
+- Exports records to CSV or NDJSON one record at a time.
+- Reports the throughput in rows per second and every rejected row.
+
+Usage (from the src/ directory):
+    python import_export.py import flights partner_feed.csv
+    python import_export.py import clients clients.ndjson --chunk-size 5000 --rejects rejected.ndjson
+    python import_export.py import flights partner_feed.csv --on-conflict renumber
+    python import_export.py export flights flights.csv
+"""
+
+import argparse  # Importing argparse to read command-line options
+import csv  # Importing csv to read and write CSV files
+import json  # Importing JSON module to read and write NDJSON files
+import os  # Importing os to work with file system paths
+import sys  # Importing sys to manipulate the Python path and write to stderr
+import time  # Importing time to measure throughput
+from itertools import islice  # Importing islice to read the input in chunks
+
+# Add the project root directory to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from record.client import ClientRecord  # Import the client record logic
+from record.airline import AirlineRecord  # Import the airline record logic
+from record.flight import FlightRecord  # Import the flight record logic
+
+# Record class, standard fields and integer fields of each record type; the first integer field is the ID
+RECORD_TYPES = {
+    "clients": (
+        ClientRecord,
+        ["ID", "Type", "Name", "Address Line 1", "Address Line 2", "Address Line 3",
+         "City", "State", "Zip Code", "Country", "Phone Number"],
+        ["ID"],
+    ),
+    "airlines": (
+        AirlineRecord,
+        ["ID", "Type", "Company Name"],
+        ["ID"],
+    ),
+    "flights": (
+        FlightRecord,
+        ["Flight_ID", "Client_ID", "Airline_ID", "Date/Time", "Start City", "End City"],
+        ["Flight_ID", "Client_ID", "Airline_ID"],
+    ),
+}
+
+
+def detect_format(path, file_format):
+    """
+    Work out the file format from the option or the file extension.
+
+    Args:
+        path (str): The path of the input or output file.
+        file_format (str): The format given on the command line, or None.
+
+    Returns:
+        str: "csv" or "ndjson".
+    """
+    if file_format:
+        return file_format
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def read_rows(f, file_format):
+    """
+    Read raw rows from an input file one at a time.
+
+    Args:
+        f (file): The open input file.
+        file_format (str): "csv" or "ndjson".
+
+    Yields:
+        tuple: The line number of the row and the row as a dictionary, or the error message if the line cannot be parsed.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e}"
+
+
+def to_record(row, integer_fields):
+    """
+    Convert a raw input row to a record dictionary.
+
+    Empty integer fields are left out, so new records get IDs assigned by the record class.
+
+    Args:
+        row (dict): The raw row, or the parse error of a line that could not be read.
+        integer_fields (list): The fields that hold integers.
+
+    Returns:
+        dict: The record.
+
+    Raises:
+        ValueError: If an integer field does not hold an integer.
+    """
+    if isinstance(row, str):
+        # The row could not be parsed, and holds the parse error instead
+        raise ValueError(row)
+    if not isinstance(row, dict):
+        raise ValueError("Each row must be a JSON object.")
+    record = {}
+    for field, value in row.items():
+        if field in integer_fields:
+            if value in ("", None):
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be a whole number.")
+        record[field] = value
+    return record
+
+
+def renumber_conflicts(records, record_class, key, seen):
+    """
+    Drop the IDs of records that collide with a stored record or an earlier input row,
+    so the record class gives them new IDs.
+
+    Args:
+        records (list): The records of a chunk, changed in place.
+        record_class (type): The record class the records are imported into.
+        key (str): The name of the ID field, such as "ID" or "Flight_ID".
+        seen (set): The IDs of earlier input rows, updated with the IDs kept in this chunk.
+
+    Returns:
+        list: (chunk position, original ID) tuples for the renumbered records.
+    """
+    renumbered = []
+    for position, record in enumerate(records):
+        record_id = record.get(key)
+        if record_id is None:
+            continue
+        if record_id in seen or record_class.exists(record_id):
+            del record[key]
+            renumbered.append((position, record_id))
+        else:
+            seen.add(record_id)
+    return renumbered
+
+
+def import_records(record_type, path, file_format=None, chunk_size=10000, rejects_path=None, out=sys.stderr, on_conflict="reject"):
+    """
+    Import records from a CSV or NDJSON file, saving them chunk by chunk.
+
+    A row whose ID is already stored, or was used by an earlier row, is rejected like any
+    other invalid row, so a partner feed cannot overwrite or duplicate stored records.
+    With on_conflict set to "renumber", such rows are imported under new IDs instead.
+
+    Args:
+        record_type (str): "clients", "airlines" or "flights".
+        path (str): The path of the input file.
+        file_format (str, optional): "csv" or "ndjson"; detected from the extension if omitted.
+        chunk_size (int): The number of rows validated and saved together.
+        rejects_path (str, optional): A file to write rejected rows to, as NDJSON.
+        out (file): Where progress and rejected rows are reported.
+        on_conflict (str): "reject" or "renumber", what to do with rows whose ID is already taken.
+
+    Returns:
+        tuple: The number of accepted rows and the number of rejected rows.
+
+    Raises:
+        ValueError: If on_conflict is neither "reject" nor "renumber".
+    """
+    if on_conflict not in ("reject", "renumber"):
+        raise ValueError(f"Unknown conflict handling: {on_conflict}")
+    record_class, _, integer_fields = RECORD_TYPES[record_type]
+    key = integer_fields[0]
+    seen = set()  # IDs of the rows imported so far, when renumbering
+    file_format = detect_format(path, file_format)
+    accepted = rejected = 0
+    started = time.perf_counter()
+    rejects = open(rejects_path, "w") if rejects_path else None
+
+    def reject(line_number, row, message):
+        nonlocal rejected
+        rejected += 1
+        print(f"Line {line_number}: rejected ({message})", file=out)
+        if rejects:
+            rejects.write(json.dumps({"line": line_number, "error": message, "row": row}) + "\n")
+
+    try:
+        with open(path, "r", newline="" if file_format == "csv" else None) as f:
+            rows = read_rows(f, file_format)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                # Convert the chunk, rejecting rows that cannot become records
+                records, line_numbers, raw_rows = [], [], []
+                for line_number, row in chunk:
+                    try:
+                        records.append(to_record(row, integer_fields))
+                    except ValueError as e:
+                        reject(line_number, row, str(e))
+                        continue
+                    line_numbers.append(line_number)
+                    raw_rows.append(row)
+                if on_conflict == "renumber":
+                    for position, record_id in renumber_conflicts(records, record_class, key, seen):
+                        print(f"Line {line_numbers[position]}: {key} {record_id} already taken, importing under a new ID", file=out)
+                # Validate and save the whole chunk with one write
+                result = record_class.create_many(records)
+                for position, message in result.errors:
+                    reject(line_numbers[position], raw_rows[position], message)
+                accepted += len(result.ids)
+                elapsed = time.perf_counter() - started
+                print(f"{accepted + rejected} rows read, {accepted} accepted, {rejected} rejected, "
+                      f"{(accepted + rejected) / elapsed if elapsed else 0:.0f} rows/s", file=out)
+    finally:
+        if rejects:
+            rejects.close()
+    return accepted, rejected
+
+
+def export_records(record_type, path, file_format=None, out=sys.stderr):
+    """
+    Export records to a CSV or NDJSON file, one record at a time.
+
+    CSV files hold the standard fields of the record type; NDJSON files hold every field.
+
+    Args:
+        record_type (str): "clients", "airlines" or "flights".
+        path (str): The path of the output file.
+        file_format (str, optional): "csv" or "ndjson"; detected from the extension if omitted.
+        out (file): Where the summary is reported.
+
+    Returns:
+        int: The number of exported records.
+    """
+    record_class, fields, _ = RECORD_TYPES[record_type]
+    file_format = detect_format(path, file_format)
+    count = 0
+    started = time.perf_counter()
+    with open(path, "w", newline="" if file_format == "csv" else None) as f:
+        if file_format == "csv":
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            write = lambda record: f.write(json.dumps(record) + "\n")
+        # Stream the records, without building a list of the whole store
+        for record in record_class.iter_all():
+            write(record)
+            count += 1
+    elapsed = time.perf_counter() - started
+    print(f"{count} records exported, {count / elapsed if elapsed else 0:.0f} rows/s", file=out)
+    return count
+
+
+if __name__ == "__main__":
+    """
+    If this script is run directly, import or export records as given on the command line.
+    """
+    parser = argparse.ArgumentParser(description="Import or export records without the GUI.")
+    parser.add_argument("action", choices=["import", "export"], help="Whether to import or export records.")
+    parser.add_argument("record_type", choices=sorted(RECORD_TYPES), help="The type of records.")
+    parser.add_argument("path", help="The CSV or NDJSON file to read or write.")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="The file format; detected from the extension if omitted.")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows validated and saved together when importing.")
+    parser.add_argument("--rejects", help="File to write rejected rows to when importing, as NDJSON.")
+    parser.add_argument("--on-conflict", choices=["reject", "renumber"], default="reject",
+                        help="Whether rows whose ID is already taken are rejected or imported under new IDs.")
+    args = parser.parse_args()
+
+    if args.action == "import":
+        _, rejected_rows = import_records(args.record_type, args.path, args.format, args.chunk_size, args.rejects, on_conflict=args.on_conflict)
+        sys.exit(1 if rejected_rows else 0)
+    export_records(args.record_type, args.path, args.format)
@@ -0,0 +1,71 @@
+"""
+This module imports the JSON data files into the SQLite database used by the "sqlite" storage engine.
+
+Run it once before setting STORAGE_ENGINE = "sqlite" in conf/config.py:
+
+    python migrate.py
+
+Records that break a unique constraint (for example two clients with the same phone number)
+are reported. By default nothing is imported when that happens; pass --skip-conflicts to
+import every other record and skip the conflicting ones.
+"""
+
+import argparse  # Importing argparse to read command-line options
+import os  # Importing os to work with file system paths
+import sys  # Importing sys to manipulate the Python path and exit codes
+
+# Add the project root directory to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conf.config import CLIENT_FILE, AIRLINE_FILE, FLIGHT_FILE, SQLITE_FILE  # Import the data file paths
+from record.storage import JsonStorage  # Import the JSON engine to read the existing files
+from record.sqlite_storage import SqliteStorage  # Import the SQLite engine to write the database
+
+
+def migrate(database, skip_conflicts=False):
+    """
+    Import the client, airline and flight JSON files into a SQLite database.
+
+    Args:
+        database (str): The path of the SQLite database.
+        skip_conflicts (bool): Import the remaining records when some break a constraint.
+
+    Returns:
+        bool: True if every record was imported, False otherwise.
+    """
+    source = JsonStorage()
+    target = SqliteStorage(database)
+    complete = True
+    try:
+        for path in (CLIENT_FILE, AIRLINE_FILE, FLIGHT_FILE):
+            records = source.read(path)
+            name = os.path.basename(path)
+            if skip_conflicts:
+                skipped = target.import_records(path, records)
+            else:
+                # Check every record first, so a failed import leaves the table untouched
+                skipped = SqliteStorage(":memory:").import_records(path, records)
+                if not skipped:
+                    target.write(path, records)
+            for record, error in skipped:
+                print(f"{name}: {'skipped' if skip_conflicts else 'conflict in'} {record} ({error})")
+            if skipped:
+                complete = False
+                if not skip_conflicts:
+                    print(f"{name}: not imported; fix the conflicts or rerun with --skip-conflicts.")
+                    continue
+            print(f"{name}: imported {len(records) - len(skipped)} of {len(records)} records.")
+    finally:
+        target.close()
+    return complete
+
+
+if __name__ == "__main__":
+    """
+    If this script is run directly, import the JSON files into the configured database.
+    """
+    parser = argparse.ArgumentParser(description="Import the JSON data files into a SQLite database.")
+    parser.add_argument("--database", default=SQLITE_FILE, help="SQLite database to import into.")
+    parser.add_argument("--skip-conflicts", action="store_true", help="Skip records that break a unique constraint.")
+    args = parser.parse_args()
+    sys.exit(0 if migrate(args.database, args.skip_conflicts) else 1)
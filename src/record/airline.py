@@ -2,41 +2,154 @@
 This module provides the backend logic for managing airline records in the Record Management System.
 
 It allows users to:
-- Load all airline records from a JSON file.
+- Load all airline records from a JSON file, through the shared record cache.
 - Save airline records to the JSON file.
+- Stream airline records one at a time, optionally filtered by a condition.
+- Fetch airline records a page at a time, in file order or sorted by any field through a sorted index.
 - Create new airline records.
-- Search for airline records by ID.
+- Create, update and delete many airline records at once, with a single write.
+- Search for airline records by ID through a hash index.
+- Search for airline records by company name through a case-folded name index.
+- Find airlines with similar, possibly misspelled names through a trigram index.
 - Generate unique IDs for new airline records.
 
 Classes:
     AirlineRecord: A class containing static methods for managing airline records.
 """
 
-import json  # Importing JSON module for reading and writing JSON files
-from conf.config import AIRLINE_FILE  # Import configuration for the airline data file path
+from conf.config import AIRLINE_FILE, ON_DELETE, FUZZY_MATCH_THRESHOLD  # Import configuration for the airline data file path, delete rule and fuzzy matching
+from record.cache import RecordCache  # Import the shared in-memory record cache
+from record.batch import apply_batch, check_new_id, id_floor  # Import the shared bulk operation logic and ID checks
+from record.paging import fetch_page  # Import the shared paged query logic
+from record.sequence import IdSequence  # Import the persisted ID sequence
+from record.index import PrimaryIndex, UniqueIndex, TrigramIndex  # Import the indexes kept alongside the cached records
 
 class AirlineRecord:
     """
     A class to handle operations related to airline records, such as loading, saving, creating, and searching.
     """
 
+    # Sequence handing out new airline IDs, persisted next to the data file
+    sequence = IdSequence(AIRLINE_FILE + ".seq")
+
     @staticmethod
     def load_all():
         """
         Load all airline records from the JSON file.
 
         If the file is missing or contains invalid data, return an empty list.
+        The file is only parsed again when it changed since it was last cached.
 
         Returns:
             list: A list of dictionaries representing all airline records.
         """
-        try:
-            # Open the JSON file in read mode and load the records
-            with open(AIRLINE_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # If the file is missing or invalid, return an empty list
-            return []
+        # Return copies so callers cannot modify the cached records
+        return [dict(record) for record in RecordCache.load(AIRLINE_FILE)]
+
+    @staticmethod
+    def iter_all():
+        """
+        Iterate over all airline records one at a time.
+
+        Unlike load_all(), no list of all records is built, and a scan that stops early
+        does not parse the rest of the file.
+
+        Yields:
+            dict: A copy of each airline record, in file order.
+        """
+        return RecordCache.iter_records(AIRLINE_FILE)
+
+    @staticmethod
+    def iter_where(predicate):
+        """
+        Iterate over the airline records matching a condition.
+
+        Args:
+            predicate (callable): A function taking a airline record and returning True to keep it.
+
+        Yields:
+            dict: A copy of each matching airline record, in file order.
+        """
+        return (record for record in AirlineRecord.iter_all() if predicate(record))
+
+    @staticmethod
+    def page(offset, limit, sort_by=None, descending=False):
+        """
+        Fetch one page of airline records, for browsing large files a page at a time.
+
+        Sorted pages are served from a sorted index on the field, so only the records
+        on the page are copied, however many records the file holds.
+
+        Args:
+            offset (int): The number of records to skip, in the requested order.
+            limit (int): The largest number of records on the page.
+            sort_by (str, optional): The field to sort by, such as "Company Name"; file order if omitted.
+            descending (bool): Whether to sort from the largest value down.
+
+        Returns:
+            Page: Copies of the airline records on the page, and the total number of airline records.
+
+        Raises:
+            ValueError: If the offset or limit is negative, or airline records have no such field.
+        """
+        return fetch_page(RecordCache.open(AIRLINE_FILE), offset, limit, sort_by, descending)
+
+    @staticmethod
+    def _id_index(entry):
+        """
+        Return the index mapping airline IDs to records and positions for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+
+        Returns:
+            PrimaryIndex: The ID index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("ID", lambda: PrimaryIndex("ID"))
+
+    @staticmethod
+    def _name_index(entry):
+        """
+        Return the index mapping case-folded company names to airline records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+
+        Returns:
+            UniqueIndex: The company name index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index(
+            "Company Name",
+            lambda: UniqueIndex(lambda record: AirlineRecord.normalize_name(record.get("Company Name"))),
+        )
+
+    @staticmethod
+    def _trigram_index(entry):
+        """
+        Return the trigram index over airline company names for a cache entry, used for fuzzy searches.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+
+        Returns:
+            TrigramIndex: The trigram index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Trigrams", lambda: TrigramIndex(lambda record: record.get("Company Name")))
+
+    @staticmethod
+    def normalize_name(company_name):
+        """
+        Normalize a company name for case-insensitive comparisons.
+
+        Args:
+            company_name (str): The company name to normalize.
+
+        Returns:
+            str: The case-folded company name, or None if there is no name.
+        """
+        if company_name is None:
+            return None
+        return company_name.casefold()
 
     @staticmethod
     def save_all(records):
@@ -48,25 +161,39 @@ class AirlineRecord:
 
         This method overwrites the existing data in the file with the provided records.
         """
-        # Open the JSON file in write mode and dump the records
-        with open(AIRLINE_FILE, "w") as f:
-            json.dump(records, f, indent=4)
+        RecordCache.save(AIRLINE_FILE, [dict(record) for record in records])
 
     @staticmethod
-    def is_duplicate_airline_name(company_name):
+    def _is_duplicate_airline_name(entry, company_name, airline_id=None):
+        """
+        Check a company name against the name index of a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+            company_name (str): The airline company name to check.
+            airline_id (int, optional): The ID of an airline whose own name should be ignored.
+
+        Returns:
+            bool: True if another airline already has the company name, False otherwise.
+        """
+        holders = AirlineRecord._name_index(entry).get(AirlineRecord.normalize_name(company_name))
+        return any(holder.get("ID") != airline_id for holder in holders)
+
+    @staticmethod
+    def is_duplicate_airline_name(company_name, airline_id=None):
         """
         Check for duplicate airline names.
 
         Args:
             company_name (str): The airline company name to check.
+            airline_id (int, optional): The ID of an airline whose own name should be ignored, used when renaming.
 
         Returns:
             bool: True if a duplicate exists, False otherwise.
 
         This method ensures no two airlines have the same company name, irrespective of case sensitivity.
         """
-        records = AirlineRecord.load_all()
-        return any(record["Company Name"].lower() == company_name.lower() for record in records)
+        return AirlineRecord._is_duplicate_airline_name(RecordCache.open(AIRLINE_FILE), company_name, airline_id)
 
     @staticmethod
     def create(airline_data):
@@ -75,19 +202,72 @@ class AirlineRecord:
 
         Args:
             airline_data (dict): A dictionary containing airline information, including ID and company name.
+                If it has no "ID", a new ID is allocated from the ID sequence.
+
+        Returns:
+            int: The ID of the new airline.
 
         Raises:
-            ValueError: If a duplicate company name is detected.
+            ValueError: If a duplicate company name is detected,
+                or the given ID is not a positive integer or is already taken.
         """
-        if AirlineRecord.is_duplicate_airline_name(airline_data["Company Name"]):
-            raise ValueError("Duplicate airline name detected.")
-        
         # Load existing records
-        records = AirlineRecord.load_all()
-        # Append the new record to the list
-        records.append(airline_data)
-        # Save the updated records list
-        AirlineRecord.save_all(records)
+        entry = RecordCache.open(AIRLINE_FILE)
+        with entry.lock:
+            # Append a copy of the new record to the list
+            airline_id = AirlineRecord._create_in(entry, airline_data)
+            # Save the updated records list
+            RecordCache.commit(entry)
+        return airline_id
+
+    @staticmethod
+    def _create_in(entry, airline_data, floor=0):
+        """
+        Validate a new airline against a cache entry and append a copy of it, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+            airline_data (dict): A dictionary containing airline information.
+                If it has no "ID", a new ID is allocated once the record is valid.
+            floor (int, optional): The smallest acceptable new ID.
+
+        Returns:
+            int: The ID of the new airline.
+
+        Raises:
+            ValueError: If a duplicate company name is detected,
+                or the given ID is not a positive integer or is already taken.
+        """
+        if AirlineRecord._is_duplicate_airline_name(entry, airline_data["Company Name"]):
+            raise ValueError("Duplicate airline name detected.")
+        if "ID" in airline_data:
+            check_new_id(AirlineRecord._id_index(entry), airline_data["ID"])
+        else:
+            airline_data = dict(airline_data, ID=AirlineRecord._allocate_id(entry, floor))
+        entry.insert(dict(airline_data))
+        return airline_data["ID"]
+
+    @staticmethod
+    def create_many(records):
+        """
+        Create many airline records with one validation pass and a single write.
+
+        Args:
+            records (list): Dictionaries containing airline information. Records without an "ID"
+                are given new IDs from the ID sequence.
+
+        Returns:
+            BatchResult: The IDs of the created airlines, and (batch position, error message)
+            tuples for the records that were rejected, such as duplicate company names or IDs.
+        """
+        entry = RecordCache.open(AIRLINE_FILE)
+        # New IDs must also stay above every ID given explicitly in the batch
+        floor = id_floor(records, "ID")
+
+        def create(airline_data):
+            return AirlineRecord._create_in(entry, airline_data, floor)
+
+        return apply_batch(entry, records, create)
 
     @staticmethod
     def search(airline_id):
@@ -100,16 +280,12 @@ class AirlineRecord:
         Returns:
             dict: The airline record if found, otherwise None.
 
-        This method iterates through the list of records to find a matching ID.
+        This method looks the ID up in the ID index instead of scanning the records.
         """
-        # Load existing records
-        records = AirlineRecord.load_all()
-        # Iterate through records to find a match
-        for record in records:
-            if record["ID"] == airline_id:
-                return record
+        # Look the ID up in the index of the cached records
+        record = AirlineRecord._id_index(RecordCache.open(AIRLINE_FILE)).get(airline_id)
         # Return None if no matching record is found
-        return None
+        return dict(record) if record is not None else None
 
     @staticmethod
     def generate_id():
@@ -119,16 +295,45 @@ class AirlineRecord:
         Returns:
             int: A unique ID for the new airline record.
 
-        This method ensures IDs are incremental and unique, starting from 1.
+        IDs come from the persisted ID sequence, so they are increasing and unique across
+        windows, processes and restarts. The ID is reserved even if no record is created with it.
         """
-        # Load existing records
-        records = AirlineRecord.load_all()
-        # If no records exist, start with ID 1
-        if not records:
-            return 1
-        # Return the maximum existing ID plus one
-        return max(record["ID"] for record in records) + 1
-    
+        return AirlineRecord._allocate_id(RecordCache.open(AIRLINE_FILE))
+
+    @staticmethod
+    def _allocate_id(entry, floor=0):
+        """
+        Allocate a new airline ID from the ID sequence.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+            floor (int, optional): The smallest acceptable ID, in addition to staying above every stored ID.
+
+        Returns:
+            int: An ID above every stored ID that no other call or process has been given.
+        """
+        return AirlineRecord.sequence.allocate(max(AirlineRecord._id_index(entry).highest + 1, floor))
+
+    @staticmethod
+    def fuzzy_search(name, limit=10, threshold=FUZZY_MATCH_THRESHOLD):
+        """
+        Find the airlines with a name similar to the given one, such as a misspelling of it.
+
+        Names are compared by the trigrams (three-letter sequences) they share, and only airlines
+        sharing a trigram with the name are considered, through a trigram index, so no name
+        is compared with every other name. For example, "Lufthnasa" finds "Lufthansa".
+
+        Args:
+            name (str): The name to look for.
+            limit (int): The largest number of airlines to return.
+            threshold (float): The smallest similarity, between 0 and 1, of a returned airline.
+
+        Returns:
+            list: (similarity, airline record) tuples, most similar first, with copies of the records.
+        """
+        matches = AirlineRecord._trigram_index(RecordCache.open(AIRLINE_FILE)).search(name, threshold, limit)
+        return [(similarity, dict(record)) for similarity, record in matches]
+
     @staticmethod
     def search_by_name(company_name):
         """
@@ -142,11 +347,8 @@ class AirlineRecord:
 
         This method performs a case-insensitive search for the given company name.
         """
-        records = AirlineRecord.load_all()
-        for record in records:
-            if record["Company Name"].lower() == company_name.lower():
-                return record
-        return None
+        holders = AirlineRecord._name_index(RecordCache.open(AIRLINE_FILE)).get(AirlineRecord.normalize_name(company_name))
+        return dict(holders[0]) if holders else None
 
     @staticmethod
     def update_airline(airline_id, new_data):
@@ -161,18 +363,62 @@ class AirlineRecord:
             bool: True if the record was updated, False if not found.
 
         Raises:
-            ValueError: If the updated company name is a duplicate.
+            ValueError: If the updated company name belongs to another airline.
+
+        Renaming an airline to its own current name, in any letter case, is not treated as a duplicate.
         """
-        if AirlineRecord.is_duplicate_airline_name(new_data["Company Name"]):
+        entry = RecordCache.open(AIRLINE_FILE)
+        with entry.lock:
+            if not AirlineRecord._update_in(entry, airline_id, new_data):
+                return False
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _update_in(entry, airline_id, new_data):
+        """
+        Validate changes to an airline against a cache entry and apply them, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+            airline_id (int): The ID of the airline to update.
+            new_data (dict): A dictionary containing updated airline information.
+
+        Returns:
+            bool: True if the record was updated, False if not found.
+
+        Raises:
+            ValueError: If the updated company name belongs to another airline.
+        """
+        position = AirlineRecord._id_index(entry).position(airline_id)
+        if position is None:
+            return False
+        if AirlineRecord._is_duplicate_airline_name(entry, new_data["Company Name"], airline_id):
             raise ValueError("Duplicate airline name detected.")
-        
-        records = AirlineRecord.load_all()
-        for record in records:
-            if record["ID"] == airline_id:
-                record.update(new_data)
-                AirlineRecord.save_all(records)
-                return True
-        return False
+        entry.update(position, new_data)
+        return True
+
+    @staticmethod
+    def update_many(updates):
+        """
+        Update many airline records with one validation pass and a single write.
+
+        Args:
+            updates (list): (airline ID, updated data) tuples, applied in order.
+
+        Returns:
+            BatchResult: The IDs of the updated airlines, and (batch position, error message)
+            tuples for the updates that were rejected or whose airline was not found.
+        """
+        entry = RecordCache.open(AIRLINE_FILE)
+
+        def update(item):
+            airline_id, new_data = item
+            if not AirlineRecord._update_in(entry, airline_id, new_data):
+                raise ValueError("No airline found with the given ID.")
+            return airline_id
+
+        return apply_batch(entry, updates, update)
 
     @staticmethod
     def delete_airline(airline_id):
@@ -185,11 +431,109 @@ class AirlineRecord:
         Returns:
             bool: True if the record was deleted, False if not found.
 
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the airline still has flights.
+
         This method removes the record with the specified ID from the list and saves the updated list.
         """
-        records = AirlineRecord.load_all()
-        updated_records = [record for record in records if record["ID"] != airline_id]
-        if len(updated_records) < len(records):
-            AirlineRecord.save_all(updated_records)
-            return True
-        return False
\ No newline at end of file
+        entry = RecordCache.open(AIRLINE_FILE)
+        with entry.lock:
+            if airline_id not in AirlineRecord._id_index(entry):
+                return False
+            # Flights are deleted first, so a failure never leaves flights without their airline
+            AirlineRecord._cascade_delete([airline_id])
+            AirlineRecord._delete_in(entry, airline_id)
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _delete_in(entry, airline_id):
+        """
+        Remove an airline from a cache entry, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the airline file.
+            airline_id (int): The ID of the airline to delete.
+
+        Returns:
+            bool: True if the record was removed, False if not found.
+
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the airline still has flights.
+        """
+        index = AirlineRecord._id_index(entry)
+        if airline_id not in index:
+            return False
+        AirlineRecord._check_delete(airline_id)
+        while airline_id in index:
+            entry.delete(index.position(airline_id))
+        return True
+
+    @staticmethod
+    def exists(airline_id):
+        """
+        Check whether an airline with the given ID exists.
+
+        Args:
+            airline_id (int): The ID to check.
+
+        Returns:
+            bool: True if an airline has the ID, False otherwise.
+
+        This method looks the ID up in the ID index, so it takes constant time.
+        """
+        return airline_id in AirlineRecord._id_index(RecordCache.open(AIRLINE_FILE))
+
+    @staticmethod
+    def _check_delete(airline_id):
+        """
+        Refuse to delete an airline that still has flights, if ON_DELETE is "restrict".
+
+        Args:
+            airline_id (int): The ID of the airline about to be deleted.
+
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the airline still has flights.
+        """
+        if ON_DELETE != "restrict":
+            return
+        from record.flight import FlightRecord  # Imported here, since record.flight imports this module
+        if FlightRecord.references("Airline_ID", airline_id):
+            raise ValueError("Cannot delete an airline that still has flights.")
+
+    @staticmethod
+    def _cascade_delete(airline_ids):
+        """
+        Delete the flights of airlines about to be deleted, if ON_DELETE is "cascade".
+
+        Args:
+            airline_ids (list): The IDs of the airlines about to be deleted.
+        """
+        if ON_DELETE != "cascade" or not airline_ids:
+            return
+        from record.flight import FlightRecord  # Imported here, since record.flight imports this module
+        FlightRecord.delete_references("Airline_ID", airline_ids)
+
+    @staticmethod
+    def delete_many(airline_ids):
+        """
+        Delete many airline records by ID with a single write.
+
+        Args:
+            airline_ids (list): The IDs of the airlines to delete.
+
+        Returns:
+            BatchResult: The IDs of the deleted airlines, and (batch position, error message)
+            tuples for the IDs that were not found or, if ON_DELETE is "restrict", still have flights.
+        """
+        entry = RecordCache.open(AIRLINE_FILE)
+        index = AirlineRecord._id_index(entry)
+        # Flights of every airline found are deleted first, with one write
+        AirlineRecord._cascade_delete([airline_id for airline_id in airline_ids if airline_id in index])
+
+        def delete(airline_id):
+            if not AirlineRecord._delete_in(entry, airline_id):
+                raise ValueError("No airline found with the given ID.")
+            return airline_id
+
+        return apply_batch(entry, airline_ids, delete)
@@ -0,0 +1,132 @@
+"""
+This module runs the record classes in the background for the Record Management System.
+
+Saving or searching a large data file can take a while, and a GUI calling the record
+classes directly is frozen until the call returns. The asynchronous facades below offer
+the same methods as the record classes, but run each call on a background worker thread
+and return a concurrent.futures.Future of its result straight away:
+
+    future = AsyncClientRecord.create(client_data)
+
+A Tk window can poll the future with after() (see gui.tasks), and asyncio code can await it:
+
+    client_id = await as_awaitable(AsyncClientRecord.create(client_data))
+
+All calls run on a single worker thread, in the order they were made. The record classes
+change their cached records in place, so running them one at a time keeps the cache
+consistent, and a search made after a save always sees the saved record.
+
+Classes:
+    AsyncRecord: The base class of the asynchronous facades.
+    AsyncClientRecord: Runs the methods of ClientRecord in the background.
+    AsyncAirlineRecord: Runs the methods of AirlineRecord in the background.
+    AsyncFlightRecord: Runs the methods of FlightRecord in the background.
+
+Functions:
+    submit: Run a function on the record worker thread.
+    as_awaitable: Wrap a future so it can be awaited in asyncio code.
+"""
+
+import asyncio  # Importing asyncio so background calls can be awaited
+from concurrent.futures import ThreadPoolExecutor  # Importing the executor running the background calls
+from record.client import ClientRecord  # Import the client records
+from record.airline import AirlineRecord  # Import the airline records
+from record.flight import FlightRecord  # Import the flight records
+
+# The worker thread shared by every facade, so calls run one at a time and in order
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="records")
+
+
+def submit(function, *args, **kwargs):
+    """
+    Run a function on the record worker thread.
+
+    Args:
+        function (callable): The function to run.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        concurrent.futures.Future: The future result of the call. Exceptions raised by the
+        function, such as ValueError for invalid records, are raised again by result().
+    """
+    return _executor.submit(function, *args, **kwargs)
+
+
+def as_awaitable(future):
+    """
+    Wrap a future so it can be awaited in asyncio code.
+
+    Args:
+        future (concurrent.futures.Future): A future returned by a facade method.
+
+    Returns:
+        asyncio.Future: A future of the running event loop completing with the same result.
+    """
+    return asyncio.wrap_future(future)
+
+
+def _in_background(record_class, name):
+    """
+    Create a facade method running a method of a record class in the background.
+
+    The method is looked up when it is called, so it always runs the current implementation.
+
+    Args:
+        record_class (type): The record class.
+        name (str): The name of the method.
+
+    Returns:
+        staticmethod: The facade method, returning a Future.
+    """
+    def method(*args, **kwargs):
+        return submit(getattr(record_class, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"Async{record_class.__name__}.{name}"
+    method.__doc__ = f"Run {record_class.__name__}.{name}() in the background and return a Future of its result."
+    return staticmethod(method)
+
+
+class AsyncRecord:
+    """
+    The base class of the asynchronous facades.
+
+    Subclasses name a record class in record_class, and get a method returning a Future for
+    every public method of that class. Streaming methods such as iter_all() are left out,
+    since their records would still be read on the calling thread.
+    """
+
+    record_class = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in dir(cls.record_class):
+            attribute = getattr(cls.record_class, name)
+            if name.startswith(("_", "iter_")) or not callable(attribute) or isinstance(attribute, type):
+                continue
+            setattr(cls, name, _in_background(cls.record_class, name))
+
+
+class AsyncClientRecord(AsyncRecord):
+    """
+    Runs the methods of ClientRecord in the background, such as create(), update() and search().
+    """
+
+    record_class = ClientRecord
+
+
+class AsyncAirlineRecord(AsyncRecord):
+    """
+    Runs the methods of AirlineRecord in the background, such as create(), update_airline() and search().
+    """
+
+    record_class = AirlineRecord
+
+
+class AsyncFlightRecord(AsyncRecord):
+    """
+    Runs the methods of FlightRecord in the background, such as create(), find_by_client() and find_between().
+    """
+
+    record_class = FlightRecord
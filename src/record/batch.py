@@ -0,0 +1,140 @@
+"""
+This module provides the shared logic behind the bulk create, update and delete methods of the record classes.
+
+Classes:
+    BatchResult: The outcome of a bulk operation.
+
+Functions:
+    apply_batch: Apply an operation to every item of a batch and save the results with one write.
+    run_batch: Apply an operation to every item of a batch, collecting the errors of the rejected items.
+    is_valid_id: Check whether a value can be used as a record ID.
+    check_new_id: Reject an explicit ID given to a new record that is invalid or already taken.
+    id_floor: Return the smallest new ID that stays above the valid explicit IDs of a batch.
+"""
+
+from record.cache import RecordCache  # Import the shared in-memory record cache
+
+
+class BatchResult:
+    """
+    The outcome of a bulk operation.
+
+    Attributes:
+        ids (list): The IDs of the records that were created, updated or deleted, in batch order.
+        errors (list): (batch position, error message) tuples for the items that were rejected.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.errors = []
+
+    def __iter__(self):
+        # Allows "ids, errors = ClientRecord.create_many(...)"
+        return iter((self.ids, self.errors))
+
+    def __repr__(self):
+        return f"BatchResult(ids={self.ids!r}, errors={self.errors!r})"
+
+
+def apply_batch(entry, items, operation):
+    """
+    Apply an operation to every item of a batch and save the results with one write.
+
+    Items are applied in order to the cache entry, so each item is validated against the
+    stored records and the items before it through the entry's indexes. A rejected item
+    does not stop the batch. The entry's lock is held until the batch is committed, so
+    other threads do not change the records between a check and its change.
+
+    Args:
+        entry (CachedFile): The cache entry of the data file.
+        items (iterable): The items to apply.
+        operation (callable): A function applying one item to the entry and returning the
+            ID of the affected record. It raises ValueError (or KeyError for a missing
+            field) before changing the entry to reject the item.
+
+    Returns:
+        BatchResult: The IDs of the applied items and the errors of the rejected ones.
+    """
+    with entry.lock:
+        try:
+            result = run_batch(items, operation)
+        except Exception:
+            # Drop the half-applied batch so the records are read again from the file
+            RecordCache.invalidate(entry.path)
+            raise
+        if entry.changes:
+            # One write for the whole batch
+            RecordCache.commit(entry)
+    return result
+
+
+def run_batch(items, operation):
+    """
+    Apply an operation to every item of a batch, collecting the errors of the rejected items.
+
+    Args:
+        items (iterable): The items to apply.
+        operation (callable): A function applying one item and returning the ID of the
+            affected record. It raises ValueError (or KeyError for a missing field)
+            before changing anything to reject the item.
+
+    Returns:
+        BatchResult: The IDs of the applied items and the errors of the rejected ones.
+    """
+    result = BatchResult()
+    for position, item in enumerate(items):
+        try:
+            result.ids.append(operation(item))
+        except ValueError as e:
+            result.errors.append((position, str(e)))
+        except KeyError as e:
+            result.errors.append((position, f"Missing field: {e}"))
+    return result
+
+
+def is_valid_id(record_id):
+    """
+    Check whether a value can be used as a record ID.
+
+    Args:
+        record_id: The value to check.
+
+    Returns:
+        bool: True if it is a positive integer, False otherwise.
+    """
+    return isinstance(record_id, int) and not isinstance(record_id, bool) and record_id > 0
+
+
+def check_new_id(id_index, record_id):
+    """
+    Reject an explicit ID given to a new record that is invalid or already taken.
+
+    The ID index is kept up to date as records are inserted, so IDs taken by earlier
+    records of the same batch are rejected too.
+
+    Args:
+        id_index (PrimaryIndex | FlightFile): The ID index of the cache entry the record is added to,
+            or the memory-mapped flight file.
+        record_id: The explicit ID of the new record.
+
+    Raises:
+        ValueError: If the ID is not a positive integer or another record already has it.
+    """
+    if not is_valid_id(record_id):
+        raise ValueError(f"Invalid {id_index.key}: IDs must be positive integers.")
+    if record_id in id_index:
+        raise ValueError(f"Duplicate {id_index.key} detected.")
+
+
+def id_floor(records, key):
+    """
+    Return the smallest new ID that stays above the valid explicit IDs of a batch.
+
+    Args:
+        records (list): The records of the batch.
+        key (str): The name of the ID field, such as "ID" or "Flight_ID".
+
+    Returns:
+        int: One more than the highest valid explicit ID, or 0 if there is none.
+    """
+    return max((record[key] + 1 for record in records if is_valid_id(record.get(key))), default=0)
@@ -0,0 +1,397 @@
+"""
+This module provides a process-wide, in-memory cache of parsed record files for the Record Management System.
+
+It allows the record classes to:
+- Parse each JSON data file once and keep the parsed records in memory.
+- Revalidate a cached file cheaply by comparing its mtime, size and inode.
+- Update the cached records in place when they are saved, without re-reading the file.
+- Persist changes through the storage engine selected in the configuration.
+- Stream records one at a time, from memory when the file is cached and from the file otherwise.
+- Keep indexes over the cached records up to date as records are inserted, updated and deleted.
+- Hold the cached records as compact __slots__ records (see record.models) instead of dictionaries.
+- Read data files under a shared lock and write them under an exclusive one (see record.locking),
+  holding the exclusive lock only while the changes are written.
+- Replay changes onto the current records when another process saved the file in the meantime,
+  so concurrent saves do not lose each other's updates, rejecting changes that would break
+  a unique index of the current records.
+- Guard each cache entry with a lock, held by the record classes while they check a change
+  against the indexes, apply it and commit it, so threads cannot both pass the same check.
+
+Classes:
+    CachedFile: The parsed records of one data file, together with their indexes.
+    RecordCache: A class containing static methods for loading and saving cached record files.
+"""
+
+import os  # Importing os to build absolute file paths
+import threading  # Importing threading to guard the shared cache
+from record.storage import get_storage  # Import the storage engine selected in the configuration
+from record.models import record_type  # Import the compact record types of the data files
+from record.locking import file_lock  # Import the shared/exclusive locks of the data files
+from record.index import PrimaryIndex, UniqueIndex  # Import the ID index used to replay changes by key, and the unique indexes checked again
+
+
+class CachedFile:
+    """
+    The parsed records of one data file, together with the indexes built over them.
+
+    Changes made through insert(), update() and delete() are applied in memory and to
+    every index, and recorded in changes; RecordCache.commit() then persists them.
+
+    Records of the client, airline and flight files are held as compact record types;
+    records of other files are kept as the dictionaries they were given as.
+
+    Threads change an entry while holding its lock, from the checks against the indexes
+    to the commit, so a check and the change it allows are not interleaved with another
+    thread's changes to the same records.
+    """
+
+    def __init__(self, path, signature, records):
+        """
+        Create a cache entry for a parsed data file.
+
+        Args:
+            path (str): The absolute path of the data file.
+            signature (tuple): The signature of the file the records were read from.
+            records (list): The parsed records.
+        """
+        self.path = path
+        self.signature = signature
+        self.record_type = record_type(path)
+        if self.record_type is not None:
+            records = [self.record_type.from_dict(record) for record in records]
+        self.records = records
+        self.indexes = {}  # Index name -> Index
+        self.changes = []  # Changes made since the last commit, for incremental storage engines
+        self.lock = threading.RLock()  # Held while records are checked, changed and committed
+
+    def index(self, name, factory):
+        """
+        Return a named index over the records, building it on first use.
+
+        Args:
+            name (str): The name of the index.
+            factory (callable): A function returning a new, empty index.
+
+        Returns:
+            Index: The index, built over the current records.
+        """
+        index = self.indexes.get(name)
+        if index is None:
+            index = factory().build(self.records)
+            self.indexes[name] = index
+        return index
+
+    def insert(self, record):
+        """
+        Append a record and add it to every index.
+
+        Args:
+            record (dict): The record to append.
+        """
+        if self.record_type is not None:
+            record = self.record_type.from_dict(record)
+        position = len(self.records)
+        self.records.append(record)
+        self.changes.append({"op": "insert", "record": record})
+        for index in self.indexes.values():
+            index.add(record, position)
+
+    def update(self, position, new_data):
+        """
+        Update the record at a position in place and re-index it.
+
+        Args:
+            position (int): The position of the record to update.
+            new_data (dict): The fields to update.
+        """
+        record = self.records[position]
+        for index in self.indexes.values():
+            index.remove(record, position)
+        before = dict(record)
+        record.update(new_data)
+        self.changes.append({"op": "update", "position": position, "data": dict(new_data), "before": before, "record": record})
+        for index in self.indexes.values():
+            index.add(record, position)
+
+    def delete(self, position):
+        """
+        Remove the record at a position and drop it from every index.
+
+        The record is found in constant time through the ID index, but removing it is not:
+        the records after it move down by one, so the file keeps its order, and the indexes
+        holding positions are renumbered for them. A delete therefore takes time proportional
+        to the number of records after the removed one. delete_many() pays this once per batch.
+
+        Args:
+            position (int): The position of the record to remove.
+        """
+        record = self.records.pop(position)
+        self.changes.append({"op": "delete", "position": position, "record": record})
+        for index in self.indexes.values():
+            index.remove(record, position)
+            index.compact(self.records, position)
+
+    def delete_many(self, positions):
+        """
+        Remove the records at several positions in one pass and drop them from every index.
+
+        Unlike calling delete() for each position, the remaining records are shifted and
+        re-indexed once, however many records are removed.
+
+        Args:
+            positions (iterable): The positions of the records to remove.
+        """
+        positions = sorted(set(positions), reverse=True)
+        if not positions:
+            return
+        removed = [(position, self.records[position]) for position in positions]
+        # Highest position first, so each logged position is still valid when the log is replayed
+        for position, record in removed:
+            self.changes.append({"op": "delete", "position": position, "record": record})
+        dropped = set(positions)
+        self.records[:] = [record for position, record in enumerate(self.records) if position not in dropped]
+        for index in self.indexes.values():
+            for position, record in removed:
+                index.remove(record, position)
+            index.compact_many(self.records, positions)
+
+
+class RecordCache:
+    """
+    A class to handle a shared cache of parsed record files, keyed by their absolute path.
+
+    Every cache entry stores the parsed records together with the signature of the file
+    they were read from. The file is only parsed again when its signature changes.
+    """
+
+    # Cached entries: absolute path -> CachedFile
+    _entries = {}
+    # Lock guarding the entries when several threads use the record classes
+    _lock = threading.RLock()
+    # Storage engine used to read and write the data files
+    storage = get_storage()
+
+    @staticmethod
+    def file_signature(path):
+        """
+        Compute the signature used to detect changes to a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            tuple: The signature from the storage engine, or None if the file is missing.
+        """
+        return RecordCache.storage.signature(path)
+
+    @staticmethod
+    def open(path):
+        """
+        Return the cache entry of a data file, parsing the file only if it changed since it was cached.
+
+        If the file is missing or contains invalid data, an empty list of records is cached.
+        A file that was changed by another program gets a fresh entry, so its indexes are rebuilt.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            CachedFile: The cache entry holding the records and their indexes.
+        """
+        key = os.path.abspath(path)
+        with RecordCache._lock:
+            entry = RecordCache._entries.get(key)
+        signature = RecordCache.file_signature(key)
+        if entry is not None and signature is not None and entry.signature == signature:
+            return entry
+
+        # Parsing runs under the shared lock only, so files are read in parallel
+        with file_lock(key).shared():
+            signature = RecordCache.file_signature(key)
+            records = RecordCache.storage.read(key)
+        entry = CachedFile(key, signature, records)
+        with RecordCache._lock:
+            current = RecordCache._entries.get(key)
+            if current is not None and current.signature is not None and current.signature == signature:
+                # Another thread cached the same version of the file meanwhile
+                return current
+            RecordCache._entries[key] = entry
+            return entry
+
+    @staticmethod
+    def iter_records(path):
+        """
+        Iterate over the records of a data file without building a list of them.
+
+        A file that is cached and unchanged is read from memory. Otherwise the records are
+        parsed from the file one at a time, without adding the file to the cache, so a scan
+        that stops early does not parse the rest of the file. No lock is held while streaming,
+        since data files are replaced in one step when they are written.
+
+        Args:
+            path (str): The path of the data file.
+
+        Yields:
+            dict: A copy of each record, in file order.
+        """
+        key = os.path.abspath(path)
+        with RecordCache._lock:
+            entry = RecordCache._entries.get(key)
+            if entry is not None and (entry.signature is None or entry.signature != RecordCache.file_signature(key)):
+                entry = None
+        if entry is not None:
+            for record in entry.records:
+                yield dict(record)
+        else:
+            yield from RecordCache.storage.iter_records(key)
+
+    @staticmethod
+    def load(path):
+        """
+        Load the records of a data file, parsing it only if it changed since it was cached.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            list: The cached list of records. Callers must not modify it
+            unless they save it back with RecordCache.save().
+        """
+        return RecordCache.open(path).records
+
+    @staticmethod
+    def save(path, records):
+        """
+        Save records to a data file and keep them as the cached copy of that file.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): A list of dictionaries representing the records to save.
+
+        This method overwrites the existing data in the file with the provided records.
+        """
+        key = os.path.abspath(path)
+        with file_lock(key).exclusive(), RecordCache._lock:
+            try:
+                RecordCache.storage.write(key, records)
+            except Exception:
+                # The file may be partially written, so it must be parsed again next time
+                RecordCache._entries.pop(key, None)
+                raise
+            RecordCache._entries[key] = CachedFile(key, RecordCache.file_signature(key), records)
+
+    @staticmethod
+    def commit(entry):
+        """
+        Write the records of a cache entry to its file after changes made through the entry.
+
+        Unlike save(), the indexes of the entry are kept, since they were updated along with the records.
+        The changes are validated before commit() is called, so the exclusive lock on the file is
+        only held while they are written. If another process saved the file since the entry was
+        read, the changes are replayed onto the records now in the file instead of overwriting them.
+
+        Args:
+            entry (CachedFile): The cache entry to write.
+
+        Returns:
+            CachedFile: The entry now cached for the file; a new one if the changes were replayed.
+
+        Raises:
+            ValueError: If a replayed change conflicts with a record another process saved,
+                such as a phone number or company name saved from another workstation.
+                Nothing is written, and the entry is dropped from the cache.
+        """
+        with entry.lock, file_lock(entry.path).exclusive(), RecordCache._lock:
+            try:
+                if entry.signature != RecordCache.file_signature(entry.path):
+                    changes, entry.changes = entry.changes, []
+                    entry = RecordCache._replay(entry, changes)
+                RecordCache.storage.commit(entry, RecordCache._lock)
+            except Exception:
+                RecordCache._entries.pop(entry.path, None)
+                raise
+            finally:
+                entry.changes = []
+            entry.signature = RecordCache.file_signature(entry.path)
+            RecordCache._entries[entry.path] = entry
+            return entry
+
+    @staticmethod
+    def _replay(outdated, changes):
+        """
+        Apply changes made to an outdated copy of a data file to the records now in the file.
+
+        Records are matched by their key field rather than by position, since records may have
+        been added or removed by the other process. Updates and deletes of records the other
+        process removed are dropped. The checks of the unique indexes built on the outdated
+        entry, such as its phone number or company name index, are run again against the
+        current records, so two processes cannot both save the same unique value.
+
+        Args:
+            outdated (CachedFile): The outdated cache entry the changes were made to.
+            changes (list): The changes recorded by the outdated cache entry.
+
+        Returns:
+            CachedFile: A new cache entry holding the current records with the changes applied.
+
+        Raises:
+            ValueError: If a change conflicts with the current records.
+        """
+        path, record_type = outdated.path, outdated.record_type
+        entry = CachedFile(path, RecordCache.file_signature(path), RecordCache.storage.read(path))
+        key = "ID" if record_type is None else record_type.KEY
+        ids = entry.index(key, lambda: PrimaryIndex(key))
+        unique = {
+            name: entry.index(name, lambda index=index: UniqueIndex(index.key_func))
+            for name, index in outdated.indexes.items() if isinstance(index, UniqueIndex)
+        }
+        for change in changes:
+            if change["op"] == "insert":
+                if change["record"].get(key) in ids:
+                    raise ValueError(f"Another application saved a record with the same {key} meanwhile.")
+                RecordCache._check_unique(unique, dict(change["record"]))
+                entry.insert(change["record"])
+                continue
+            old = change["before"] if change["op"] == "update" else change["record"]
+            position = ids.position(old.get(key))
+            if position is None:
+                continue
+            if change["op"] == "update":
+                current = entry.records[position]
+                RecordCache._check_unique(unique, {**dict(current), **change["data"]}, current)
+                entry.update(position, change["data"])
+            else:
+                entry.delete(position)
+        return entry
+
+    @staticmethod
+    def _check_unique(indexes, record, current=None):
+        """
+        Check that a record about to be inserted or updated keeps every unique index unique.
+
+        Args:
+            indexes (dict): The unique indexes of the current records, by name.
+            record (dict): The record as it will be stored.
+            current (Record, optional): The stored record being updated, which may keep its own key.
+
+        Raises:
+            ValueError: If another record already holds one of the keys of the record.
+        """
+        for name, index in indexes.items():
+            index_key = index.key_func(record)
+            if index_key is not None and any(holder is not current for holder in index.get(index_key)):
+                raise ValueError(f"Another application saved a record with the same {name.lower()} meanwhile.")
+
+    @staticmethod
+    def invalidate(path=None):
+        """
+        Drop cached records so they are parsed again on the next load.
+
+        Args:
+            path (str, optional): The data file to drop. If omitted, the whole cache is cleared.
+        """
+        with RecordCache._lock:
+            if path is None:
+                RecordCache._entries.clear()
+            else:
+                RecordCache._entries.pop(os.path.abspath(path), None)
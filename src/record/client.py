@@ -2,42 +2,173 @@
 This module provides the backend logic for managing client records in the Record Management System.
 
 It allows users to:
-- Load all client records from a JSON file.
+- Load all client records from a JSON file, through the shared record cache.
 - Save client records to the JSON file.
+- Stream client records one at a time, optionally filtered by a condition.
+- Fetch client records a page at a time, in file order or sorted by any field through a sorted index.
 - Create new client records.
-- Search for client records by ID.
+- Create, update and delete many client records at once, with a single write.
+- Search for client records by ID through a hash index.
+- Find clients by the start of their name, or of a word of it, through a sorted prefix index.
+- Find clients by any words of their name and address through a ranked full-text index.
+- Find clients with similar, possibly misspelled names through a trigram index.
+- Reject duplicate phone numbers through a unique index on normalized phone numbers.
 - Generate unique IDs for new client records.
 
 Classes:
     ClientRecord: A class containing static methods for managing client records.
 """
 
-import json  # Importing JSON module for reading and writing JSON files
 import re  # Regular expression for validation
-from conf.config import CLIENT_FILE  # Import configuration for the client data file path
+from conf.config import CLIENT_FILE, ON_DELETE, FUZZY_MATCH_THRESHOLD  # Import configuration for the client data file path, delete rule and fuzzy matching
+from record.cache import RecordCache  # Import the shared in-memory record cache
+from record.batch import apply_batch, check_new_id, id_floor  # Import the shared bulk operation logic and ID checks
+from record.paging import fetch_page  # Import the shared paged query logic
+from record.sequence import IdSequence  # Import the persisted ID sequence
+from record.index import PrimaryIndex, UniqueIndex, PrefixIndex, InvertedIndex, TrigramIndex  # Import the indexes kept alongside the cached records
+
+# Fields searched by full-text searches
+TEXT_FIELDS = ("Name", "Address Line 1", "Address Line 2", "Address Line 3", "City", "State", "Zip Code", "Country")
+# Words and numbers, as split by full-text searches
+TOKEN_PATTERN = re.compile(r"\w+")
 
 class ClientRecord:
     """
     A class to handle operations related to client records, such as loading, saving, creating, and searching.
     """
 
+    # Sequence handing out new client IDs, persisted next to the data file
+    sequence = IdSequence(CLIENT_FILE + ".seq")
+
     @staticmethod
     def load_all():
         """
         Load all client records from the JSON file.
 
         If the file is missing or contains invalid data, return an empty list.
+        The file is only parsed again when it changed since it was last cached.
 
         Returns:
             list: A list of dictionaries representing all client records.
         """
-        try:
-            # Open the JSON file in read mode and load the records
-            with open(CLIENT_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # If the file is missing or invalid, return an empty list
-            return []
+        # Return copies so callers cannot modify the cached records
+        return [dict(record) for record in RecordCache.load(CLIENT_FILE)]
+
+    @staticmethod
+    def iter_all():
+        """
+        Iterate over all client records one at a time.
+
+        Unlike load_all(), no list of all records is built, and a scan that stops early
+        does not parse the rest of the file.
+
+        Yields:
+            dict: A copy of each client record, in file order.
+        """
+        return RecordCache.iter_records(CLIENT_FILE)
+
+    @staticmethod
+    def iter_where(predicate):
+        """
+        Iterate over the client records matching a condition.
+
+        Args:
+            predicate (callable): A function taking a client record and returning True to keep it.
+
+        Yields:
+            dict: A copy of each matching client record, in file order.
+        """
+        return (record for record in ClientRecord.iter_all() if predicate(record))
+
+    @staticmethod
+    def page(offset, limit, sort_by=None, descending=False):
+        """
+        Fetch one page of client records, for browsing large files a page at a time.
+
+        Sorted pages are served from a sorted index on the field, so only the records
+        on the page are copied, however many records the file holds.
+
+        Args:
+            offset (int): The number of records to skip, in the requested order.
+            limit (int): The largest number of records on the page.
+            sort_by (str, optional): The field to sort by, such as "Name"; file order if omitted.
+            descending (bool): Whether to sort from the largest value down.
+
+        Returns:
+            Page: Copies of the client records on the page, and the total number of client records.
+
+        Raises:
+            ValueError: If the offset or limit is negative, or client records have no such field.
+        """
+        return fetch_page(RecordCache.open(CLIENT_FILE), offset, limit, sort_by, descending)
+
+    @staticmethod
+    def _id_index(entry):
+        """
+        Return the index mapping client IDs to records and positions for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+
+        Returns:
+            PrimaryIndex: The ID index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("ID", lambda: PrimaryIndex("ID"))
+
+    @staticmethod
+    def _phone_index(entry):
+        """
+        Return the index mapping normalized phone numbers to client records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+
+        Returns:
+            UniqueIndex: The phone number index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index(
+            "Phone Number",
+            lambda: UniqueIndex(lambda record: ClientRecord.normalize_phone(record.get("Phone Number"))),
+        )
+
+    @staticmethod
+    def _name_index(entry):
+        """
+        Return the index of the words of client names for a cache entry, used for search-as-you-type.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+
+        Returns:
+            PrefixIndex: The name index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Name", lambda: PrefixIndex(ClientRecord._name_terms))
+
+    @staticmethod
+    def _trigram_index(entry):
+        """
+        Return the trigram index over client names for a cache entry, used for fuzzy searches.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+
+        Returns:
+            TrigramIndex: The trigram index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Trigrams", lambda: TrigramIndex(lambda record: record.get("Name")))
+
+    @staticmethod
+    def _text_index(entry):
+        """
+        Return the full-text index over the names and addresses of clients for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+
+        Returns:
+            InvertedIndex: The text index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Text", lambda: InvertedIndex(ClientRecord._text_tokens))
 
     @staticmethod
     def save_all(records):
@@ -49,25 +180,122 @@ class ClientRecord:
 
         This method overwrites the existing data in the file with the provided records.
         """
-        # Open the JSON file in write mode and dump the records
-        with open(CLIENT_FILE, "w") as f:
-            json.dump(records, f, indent=4)
+        RecordCache.save(CLIENT_FILE, [dict(record) for record in records])
+
+    @staticmethod
+    def normalize_phone(phone_number):
+        """
+        Normalize a phone number for duplicate checks.
+
+        Args:
+            phone_number (str): The phone number to normalize.
+
+        Returns:
+            str: The digits of the phone number, or None if there is no phone number.
+
+        Formatting characters are stripped, so 1-773-5435432 and 1 773 543 5432 are treated as the same number.
+        """
+        if not phone_number:
+            return None
+        return re.sub(r"\D", "", phone_number)
+
+    @staticmethod
+    def normalize_name(name):
+        """
+        Normalize a client name, or the start of one, for name searches.
+
+        Args:
+            name (str): The name to normalize.
+
+        Returns:
+            str: The case-folded name with runs of whitespace reduced to one space, or None if there is no name.
+        """
+        if not isinstance(name, str):
+            return None
+        return " ".join(name.casefold().split())
+
+    @staticmethod
+    def _name_terms(record):
+        """
+        List the terms a client is found by in name searches.
+
+        The terms are the normalized name from each of its words on, so "Jane Smith" is found
+        by typing the start of "jane smith" or of "smith".
+
+        Args:
+            record (dict): The client record.
+
+        Returns:
+            list: The terms of the client's name, or an empty list if it has no name.
+        """
+        name = ClientRecord.normalize_name(record.get("Name"))
+        if not name:
+            return []
+        words = name.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
 
     @staticmethod
-    def is_duplicate_phone(phone_number):
+    def tokenize(text):
+        """
+        Split text into the tokens used by full-text searches.
+
+        Args:
+            text (str): The text to split, such as a query or an address line.
+
+        Returns:
+            list: The case-folded words and numbers of the text.
+        """
+        if not isinstance(text, str):
+            return []
+        return TOKEN_PATTERN.findall(text.casefold())
+
+    @staticmethod
+    def _text_tokens(record):
+        """
+        List the tokens a client is found by in full-text searches.
+
+        Args:
+            record (dict): The client record.
+
+        Returns:
+            list: The tokens of the client's name and address fields, repeats included.
+        """
+        tokens = []
+        for field in TEXT_FIELDS:
+            tokens.extend(ClientRecord.tokenize(record.get(field)))
+        return tokens
+
+    @staticmethod
+    def _is_duplicate_phone(entry, phone_number, client_id=None):
+        """
+        Check a phone number against the phone number index of a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+            phone_number (str): The phone number to check.
+            client_id (int, optional): The ID of a client whose own number should be ignored.
+
+        Returns:
+            bool: True if another client already has the phone number, False otherwise.
+        """
+        holders = ClientRecord._phone_index(entry).get(ClientRecord.normalize_phone(phone_number))
+        return any(holder.get("ID") != client_id for holder in holders)
+
+    @staticmethod
+    def is_duplicate_phone(phone_number, client_id=None):
         """
         Check for duplicate phone numbers in client records.
 
         Args:
             phone_number (str): The phone number to check.
+            client_id (int, optional): The ID of a client whose own number should be ignored, used when updating.
 
         Returns:
             bool: True if a duplicate exists, False otherwise.
 
-        This ensures no two clients share the same phone number.
+        This ensures no two clients share the same phone number, ignoring formatting differences.
         """
-        records = ClientRecord.load_all()
-        return any(record["Phone Number"] == phone_number for record in records)
+        return ClientRecord._is_duplicate_phone(RecordCache.open(CLIENT_FILE), phone_number, client_id)
 
     @staticmethod
     def is_valid_phone(phone_number):
@@ -92,21 +320,74 @@ class ClientRecord:
 
         Args:
             client_data (dict): A dictionary containing client information, including ID, name, and address.
+                If it has no "ID", a new ID is allocated from the ID sequence.
+
+        Returns:
+            int: The ID of the new client.
+
+        Raises:
+            ValueError: If the phone number is invalid, a duplicate is detected,
+                or the given ID is not a positive integer or is already taken.
+        """
+        # Load existing records
+        entry = RecordCache.open(CLIENT_FILE)
+        with entry.lock:
+            # Append a copy of the new record to the list
+            client_id = ClientRecord._create_in(entry, client_data)
+            # Save the updated records list
+            RecordCache.commit(entry)
+        return client_id
+
+    @staticmethod
+    def _create_in(entry, client_data, floor=0):
+        """
+        Validate a new client against a cache entry and append a copy of it, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+            client_data (dict): A dictionary containing client information.
+                If it has no "ID", a new ID is allocated once the record is valid.
+            floor (int, optional): The smallest acceptable new ID.
+
+        Returns:
+            int: The ID of the new client.
 
         Raises:
-            ValueError: If the phone number is invalid or a duplicate is detected.
+            ValueError: If the phone number is invalid, a duplicate is detected,
+                or the given ID is not a positive integer or is already taken.
         """
         if not ClientRecord.is_valid_phone(client_data["Phone Number"]):
             raise ValueError("Invalid phone number format. Follow CountryCode-AreaCode-Number (e.g., 1-773-5435432).")
-        if ClientRecord.is_duplicate_phone(client_data["Phone Number"]):
+        if ClientRecord._is_duplicate_phone(entry, client_data["Phone Number"]):
             raise ValueError("Duplicate phone number detected.")
+        if "ID" in client_data:
+            check_new_id(ClientRecord._id_index(entry), client_data["ID"])
+        else:
+            client_data = dict(client_data, ID=ClientRecord._allocate_id(entry, floor))
+        entry.insert(dict(client_data))
+        return client_data["ID"]
 
-        # Load existing records
-        records = ClientRecord.load_all()
-        # Append the new record to the list
-        records.append(client_data)
-        # Save the updated records list
-        ClientRecord.save_all(records)
+    @staticmethod
+    def create_many(records):
+        """
+        Create many client records with one validation pass and a single write.
+
+        Args:
+            records (list): Dictionaries containing client information. Records without an "ID"
+                are given new IDs from the ID sequence.
+
+        Returns:
+            BatchResult: The IDs of the created clients, and (batch position, error message)
+            tuples for the records that were rejected, such as invalid or duplicate phone numbers or IDs.
+        """
+        entry = RecordCache.open(CLIENT_FILE)
+        # New IDs must also stay above every ID given explicitly in the batch
+        floor = id_floor(records, "ID")
+
+        def create(client_data):
+            return ClientRecord._create_in(entry, client_data, floor)
+
+        return apply_batch(entry, records, create)
 
     @staticmethod
     def delete(client_id):
@@ -119,15 +400,113 @@ class ClientRecord:
         Returns:
             bool: True if the record was deleted, False if not found.
 
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the client still has flights.
+
         This method removes the record with the specified ID from the list and saves the updated list.
         """
-        records = ClientRecord.load_all()
-        updated_records = [record for record in records if record["ID"] != client_id]
-        if len(records) == len(updated_records):
-            return False  # No record was deleted
-        ClientRecord.save_all(updated_records)
+        entry = RecordCache.open(CLIENT_FILE)
+        with entry.lock:
+            if client_id not in ClientRecord._id_index(entry):
+                return False
+            # Flights are deleted first, so a failure never leaves flights without their client
+            ClientRecord._cascade_delete([client_id])
+            ClientRecord._delete_in(entry, client_id)
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _delete_in(entry, client_id):
+        """
+        Remove a client from a cache entry, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+            client_id (int): The ID of the client to delete.
+
+        Returns:
+            bool: True if the record was removed, False if not found.
+
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the client still has flights.
+        """
+        index = ClientRecord._id_index(entry)
+        if client_id not in index:
+            return False
+        ClientRecord._check_delete(client_id)
+        while client_id in index:
+            entry.delete(index.position(client_id))
         return True
 
+    @staticmethod
+    def exists(client_id):
+        """
+        Check whether a client with the given ID exists.
+
+        Args:
+            client_id (int): The ID to check.
+
+        Returns:
+            bool: True if a client has the ID, False otherwise.
+
+        This method looks the ID up in the ID index, so it takes constant time.
+        """
+        return client_id in ClientRecord._id_index(RecordCache.open(CLIENT_FILE))
+
+    @staticmethod
+    def _check_delete(client_id):
+        """
+        Refuse to delete a client that still has flights, if ON_DELETE is "restrict".
+
+        Args:
+            client_id (int): The ID of the client about to be deleted.
+
+        Raises:
+            ValueError: If ON_DELETE is "restrict" and the client still has flights.
+        """
+        if ON_DELETE != "restrict":
+            return
+        from record.flight import FlightRecord  # Imported here, since record.flight imports this module
+        if FlightRecord.references("Client_ID", client_id):
+            raise ValueError("Cannot delete a client that still has flights.")
+
+    @staticmethod
+    def _cascade_delete(client_ids):
+        """
+        Delete the flights of clients about to be deleted, if ON_DELETE is "cascade".
+
+        Args:
+            client_ids (list): The IDs of the clients about to be deleted.
+        """
+        if ON_DELETE != "cascade" or not client_ids:
+            return
+        from record.flight import FlightRecord  # Imported here, since record.flight imports this module
+        FlightRecord.delete_references("Client_ID", client_ids)
+
+    @staticmethod
+    def delete_many(client_ids):
+        """
+        Delete many client records by ID with a single write.
+
+        Args:
+            client_ids (list): The IDs of the clients to delete.
+
+        Returns:
+            BatchResult: The IDs of the deleted clients, and (batch position, error message)
+            tuples for the IDs that were not found or, if ON_DELETE is "restrict", still have flights.
+        """
+        entry = RecordCache.open(CLIENT_FILE)
+        index = ClientRecord._id_index(entry)
+        # Flights of every client found are deleted first, with one write
+        ClientRecord._cascade_delete([client_id for client_id in client_ids if client_id in index])
+
+        def delete(client_id):
+            if not ClientRecord._delete_in(entry, client_id):
+                raise ValueError("No client found with the given ID.")
+            return client_id
+
+        return apply_batch(entry, client_ids, delete)
+
     @staticmethod
     def update(client_id, updated_data):
         """
@@ -141,18 +520,62 @@ class ClientRecord:
             bool: True if the record was updated, False if not found.
 
         Raises:
-            ValueError: If the phone number is invalid.
+            ValueError: If the phone number is invalid or belongs to another client.
+        """
+        entry = RecordCache.open(CLIENT_FILE)
+        with entry.lock:
+            if not ClientRecord._update_in(entry, client_id, updated_data):
+                return False
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _update_in(entry, client_id, updated_data):
+        """
+        Validate changes to a client against a cache entry and apply them, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+            client_id (int): The ID of the client to update.
+            updated_data (dict): The updated data for the client.
+
+        Returns:
+            bool: True if the record was updated, False if not found.
+
+        Raises:
+            ValueError: If the phone number is invalid or belongs to another client.
         """
         if not ClientRecord.is_valid_phone(updated_data["Phone Number"]):
             raise ValueError("Invalid phone number format. Follow CountryCode-AreaCode-Number (e.g., 1-773-5435432).")
-        
-        records = ClientRecord.load_all()
-        for record in records:
-            if record["ID"] == client_id:
-                record.update(updated_data)
-                ClientRecord.save_all(records)
-                return True
-        return False
+        position = ClientRecord._id_index(entry).position(client_id)
+        if position is None:
+            return False
+        if ClientRecord._is_duplicate_phone(entry, updated_data["Phone Number"], client_id):
+            raise ValueError("Duplicate phone number detected.")
+        entry.update(position, updated_data)
+        return True
+
+    @staticmethod
+    def update_many(updates):
+        """
+        Update many client records with one validation pass and a single write.
+
+        Args:
+            updates (list): (client ID, updated data) tuples, applied in order.
+
+        Returns:
+            BatchResult: The IDs of the updated clients, and (batch position, error message)
+            tuples for the updates that were rejected or whose client was not found.
+        """
+        entry = RecordCache.open(CLIENT_FILE)
+
+        def update(item):
+            client_id, updated_data = item
+            if not ClientRecord._update_in(entry, client_id, updated_data):
+                raise ValueError("No client found with the given ID.")
+            return client_id
+
+        return apply_batch(entry, updates, update)
 
     @staticmethod
     def search(client_id):
@@ -165,13 +588,72 @@ class ClientRecord:
         Returns:
             dict: The client record if found, otherwise None.
 
-        This method iterates through the list of records to find a matching ID.
+        This method looks the ID up in the ID index instead of scanning the records.
         """
-        records = ClientRecord.load_all()
-        for record in records:
-            if record["ID"] == client_id:
-                return record
-        return None
+        record = ClientRecord._id_index(RecordCache.open(CLIENT_FILE)).get(client_id)
+        return dict(record) if record is not None else None
+
+    @staticmethod
+    def fuzzy_search(name, limit=10, threshold=FUZZY_MATCH_THRESHOLD):
+        """
+        Find the clients with a name similar to the given one, such as a misspelling of it.
+
+        Names are compared by the trigrams (three-letter sequences) they share, and only clients
+        sharing a trigram with the name are considered, through a trigram index, so no name
+        is compared with every other name. For example, "Jane Smyth" finds "Jane Smith".
+
+        Args:
+            name (str): The name to look for.
+            limit (int): The largest number of clients to return.
+            threshold (float): The smallest similarity, between 0 and 1, of a returned client.
+
+        Returns:
+            list: (similarity, client record) tuples, most similar first, with copies of the records.
+        """
+        matches = ClientRecord._trigram_index(RecordCache.open(CLIENT_FILE)).search(name, threshold, limit)
+        return [(similarity, dict(record)) for similarity, record in matches]
+
+    @staticmethod
+    def search_name_prefix(prefix, limit=10):
+        """
+        Find the clients whose name, or a word of it, starts with the given text.
+
+        The clients are found through a sorted index of name words, without scanning the records,
+        so the search is quick enough to run on every keystroke.
+
+        Args:
+            prefix (str): The start of the name, in any case.
+            limit (int): The largest number of clients to return.
+
+        Returns:
+            list: Copies of the matching client records, in name order, or an empty list if the prefix is blank.
+        """
+        prefix = ClientRecord.normalize_name(prefix)
+        if not prefix:
+            return []
+        return [dict(record) for record in ClientRecord._name_index(RecordCache.open(CLIENT_FILE)).prefix(prefix, limit)]
+
+    @staticmethod
+    def search_text(query, limit=20):
+        """
+        Find the clients whose name and address contain every word of a query, best matches first.
+
+        The clients are found through an inverted index over the Name, Address Line 1-3, City,
+        State, Zip Code and Country fields, without scanning the records. Words found in few
+        clients count for more in the ranking, so "elm 60614" ranks clients on Elm Street in
+        that zip code above others.
+
+        Args:
+            query (str): The words to look for, in any case and order.
+            limit (int): The largest number of clients to return.
+
+        Returns:
+            list: Copies of the matching client records, ranked best first, or an empty list if the query has no words.
+        """
+        tokens = ClientRecord.tokenize(query)
+        if not tokens:
+            return []
+        return [dict(record) for record in ClientRecord._text_index(RecordCache.open(CLIENT_FILE)).search(tokens, limit)]
 
     @staticmethod
     def generate_id():
@@ -181,9 +663,21 @@ class ClientRecord:
         Returns:
             int: A unique ID for the new client record.
 
-        This method ensures IDs are incremental and unique, starting from 1.
+        IDs come from the persisted ID sequence, so they are increasing and unique across
+        windows, processes and restarts. The ID is reserved even if no record is created with it.
+        """
+        return ClientRecord._allocate_id(RecordCache.open(CLIENT_FILE))
+
+    @staticmethod
+    def _allocate_id(entry, floor=0):
+        """
+        Allocate a new client ID from the ID sequence.
+
+        Args:
+            entry (CachedFile): The cache entry of the client file.
+            floor (int, optional): The smallest acceptable ID, in addition to staying above every stored ID.
+
+        Returns:
+            int: An ID above every stored ID that no other call or process has been given.
         """
-        records = ClientRecord.load_all()
-        if not records:
-            return 1
-        return max(record["ID"] for record in records) + 1
\ No newline at end of file
+        return ClientRecord.sequence.allocate(max(ClientRecord._id_index(entry).highest + 1, floor))
@@ -0,0 +1,273 @@
+"""
+This module provides a columnar, array-backed index of flight records for the Record Management System.
+
+Each flight field is kept in its own typed array instead of one dictionary per flight:
+- Flight_ID, Client_ID and Airline_ID are 64-bit integer arrays.
+- Date/Time is parsed once into minutes since 1970-01-01 00:00, so it is never re-parsed.
+- Start City and End City are dictionary encoded, storing a small integer code per flight.
+
+Scans, filters and aggregations then run over flat arrays, with the per-row loops done in C
+by map(), itertools.compress() and collections.Counter, instead of reading a field of every
+record. The columns are used in two ways:
+- With the flights kept by the storage engine, as an index over the cached flight file,
+  alongside the records themselves, trading some extra memory for faster queries.
+- With FLIGHT_STORE set to "mmap", as the only in-memory form of the flights: one row per
+  Flight_ID, built from the memory-mapped flight file (see record.flight_file), which uses
+  the same encodings. A flight takes under 50 bytes of columns instead of a record object and its
+  strings, and records are only decoded for the flights a query returns.
+
+Classes:
+    FlightColumns: The flights of a data file indexed as typed columns.
+
+Functions:
+    to_minutes: Parse a "YYYY-MM-DD HH:MM" date and time into minutes since the epoch.
+    from_minutes: Format minutes since the epoch as a "YYYY-MM-DD HH:MM" date and time.
+"""
+
+import operator  # Importing operator for the comparisons applied to whole columns
+import re  # Importing re to check the date and time format
+from array import array  # Importing array for compact typed columns
+from collections import Counter  # Importing Counter to aggregate columns
+from datetime import date, datetime, timedelta  # Importing datetime to convert dates and times
+from itertools import compress, repeat  # Importing itertools to filter columns without Python loops
+from record.index import Index  # Import the index base class, so the columns follow cache changes
+
+# Stored in the integer columns for missing or invalid values
+MISSING = -(2 ** 63)
+# Stored in the city columns for missing cities
+NO_CITY = -1
+# Values of a row without a flight, in column order
+EMPTY_ROW = (MISSING, MISSING, MISSING, MISSING, NO_CITY, NO_CITY)
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DAY = _EPOCH.toordinal()
+_DATE_TIME = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+# Days since the epoch of each "YYYY-MM-DD" date seen so far, since many flights share a date
+_DAYS = {}
+# "YYYY-MM-DD " date of each day since the epoch formatted so far, the reverse of _DAYS
+_DATES = {}
+# "HH:MM" time of each minute of a day
+_TIMES = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(1440)]
+
+
+def to_minutes(date_time):
+    """
+    Parse a "YYYY-MM-DD HH:MM" date and time into minutes since 1970-01-01 00:00.
+
+    Args:
+        date_time (str): The date and time to parse.
+
+    Returns:
+        int: The minutes since the epoch, or None if the value is not a valid date and time.
+    """
+    if not isinstance(date_time, str) or _DATE_TIME.fullmatch(date_time) is None:
+        return None
+    day = _DAYS.get(date_time[:10])
+    if day is None:
+        try:
+            day = date(int(date_time[0:4]), int(date_time[5:7]), int(date_time[8:10])).toordinal() - _EPOCH_DAY
+        except ValueError:
+            return None
+        _DAYS[date_time[:10]] = day
+    hour, minute = int(date_time[11:13]), int(date_time[14:16])
+    if hour > 23 or minute > 59:
+        return None
+    return day * 1440 + hour * 60 + minute
+
+
+def from_minutes(minutes):
+    """
+    Format minutes since 1970-01-01 00:00 as a "YYYY-MM-DD HH:MM" date and time.
+
+    Args:
+        minutes (int): The minutes since the epoch.
+
+    Returns:
+        str: The formatted date and time.
+    """
+    day, minute = divmod(minutes, 1440)
+    text = _DATES.get(day)
+    if text is None:
+        text = _DATES[day] = (_EPOCH + timedelta(days=day)).strftime("%Y-%m-%d ")
+    return text + _TIMES[minute]
+
+
+def _integer(value):
+    """
+    Return an integer field value as stored in a column.
+
+    Args:
+        value: The field value.
+
+    Returns:
+        int: The value, or MISSING if it is not an integer.
+    """
+    return value if type(value) is int else MISSING
+
+
+class FlightColumns(Index):
+    """
+    The flights of a data file indexed as typed columns, one row per flight, in file order.
+
+    As an index over a cache entry, row positions always match the positions of the cached records.
+    Filled through put_row() instead, the columns hold one row per Flight_ID, and rows without
+    a flight hold EMPTY_ROW, which no condition matches.
+    """
+
+    def __init__(self):
+        """
+        Create empty columns.
+        """
+        self.flight_ids = array("q")
+        self.client_ids = array("q")
+        self.airline_ids = array("q")
+        self.minutes = array("q")  # Date/Time as minutes since the epoch
+        self.start_cities = array("l")  # Codes into cities
+        self.end_cities = array("l")
+        self.cities = []  # City code -> city name
+        self.city_codes = {}  # City name -> city code
+
+    def __len__(self):
+        return len(self.flight_ids)
+
+    def _city_code(self, city):
+        """
+        Return the code of a city, adding it to the dictionary on first use.
+
+        Args:
+            city (str): The city name, or None.
+
+        Returns:
+            int: The city code, or NO_CITY if there is no city.
+        """
+        if city is None:
+            return NO_CITY
+        code = self.city_codes.get(city)
+        if code is None:
+            code = len(self.cities)
+            self.cities.append(city)
+            self.city_codes[city] = code
+        return code
+
+    def add(self, record, position):
+        minutes = to_minutes(record.get("Date/Time"))
+        row = (
+            _integer(record.get("Flight_ID")),
+            _integer(record.get("Client_ID")),
+            _integer(record.get("Airline_ID")),
+            MISSING if minutes is None else minutes,
+            self._city_code(record.get("Start City")),
+            self._city_code(record.get("End City")),
+        )
+        if position == len(self.flight_ids):
+            for column, value in zip(self._columns(), row):
+                column.append(value)
+        else:
+            # An updated record is added again at its own position
+            for column, value in zip(self._columns(), row):
+                column[position] = value
+
+    def put_row(self, position, row):
+        """
+        Store the encoded values of a flight at a row, adding empty rows before it if needed.
+
+        Args:
+            position (int): The row.
+            row (tuple): The Flight_ID, Client_ID, Airline_ID, minutes and Start City and End City
+                codes of the flight, or EMPTY_ROW to empty the row.
+        """
+        gap = position - len(self)
+        if gap > 0:
+            for column, value in zip(self._columns(), EMPTY_ROW):
+                column.extend(repeat(value, gap))
+        if position == len(self):
+            for column, value in zip(self._columns(), row):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns(), row):
+                column[position] = value
+
+    def remove(self, record, position):
+        # The row is overwritten by add() on update, or dropped by compact() on delete
+        pass
+
+    def compact(self, records, position):
+        for column in self._columns():
+            del column[position]
+
+    def compact_many(self, records, positions):
+        dropped = set(positions)
+        keep = [position not in dropped for position in range(len(self))]
+        for column in self._columns():
+            column[:] = array(column.typecode, compress(column, keep))
+
+    def _columns(self):
+        """
+        Return every column, in row order.
+
+        Returns:
+            tuple: The arrays holding the columns.
+        """
+        return (self.flight_ids, self.client_ids, self.airline_ids, self.minutes, self.start_cities, self.end_cities)
+
+    def select(self, client_id=None, airline_id=None, start=None, end=None, start_city=None, end_city=None):
+        """
+        Find the rows matching all of the given conditions.
+
+        Args:
+            client_id (int, optional): The Client ID to match.
+            airline_id (int, optional): The Airline ID to match.
+            start (int, optional): The earliest Date/Time to match, in minutes since the epoch.
+            end (int, optional): The latest Date/Time to match, in minutes since the epoch.
+            start_city (str, optional): The Start City to match.
+            end_city (str, optional): The End City to match.
+
+        Returns:
+            list: The positions of the matching rows, in row order.
+        """
+        conditions = []  # (column, comparison, value) tuples, all of which must hold
+        for column, value in ((self.client_ids, client_id), (self.airline_ids, airline_id)):
+            if value is not None:
+                conditions.append((column, operator.eq, value))
+        for column, city in ((self.start_cities, start_city), (self.end_cities, end_city)):
+            if city is not None:
+                if city not in self.city_codes:
+                    return []
+                conditions.append((column, operator.eq, self.city_codes[city]))
+        if start is not None or end is not None:
+            # Rows without a valid date never match a date range
+            conditions.append((self.minutes, operator.ge, MISSING + 1 if start is None else start))
+            if end is not None:
+                conditions.append((self.minutes, operator.le, end))
+
+        if not conditions:
+            return list(range(len(self)))
+        # The first condition scans a whole column; later ones only check the rows still matching
+        column, comparison, value = conditions[0]
+        positions = list(compress(range(len(self)), map(comparison, column, repeat(value))))
+        for column, comparison, value in conditions[1:]:
+            positions = list(compress(positions, map(comparison, map(column.__getitem__, positions), repeat(value))))
+        return positions
+
+    def count_by(self, field):
+        """
+        Count the flights for each value of a field.
+
+        Args:
+            field (str): "Client_ID", "Airline_ID", "Start City" or "End City".
+
+        Returns:
+            dict: The number of flights for each value, leaving out missing values.
+
+        Raises:
+            ValueError: If the field cannot be aggregated.
+        """
+        if field in ("Client_ID", "Airline_ID"):
+            counts = Counter(self.client_ids if field == "Client_ID" else self.airline_ids)
+            counts.pop(MISSING, None)
+            return dict(counts)
+        if field in ("Start City", "End City"):
+            counts = Counter(self.start_cities if field == "Start City" else self.end_cities)
+            counts.pop(NO_CITY, None)
+            return {self.cities[code]: count for code, count in counts.items()}
+        raise ValueError(f"Cannot count flights by {field}.")
@@ -0,0 +1,154 @@
+"""
+This module provides the compression codecs of the data files in the Record Management System.
+
+Pretty-printed JSON is mostly whitespace and repeated field names, so it shrinks several
+times over when compressed, which matters when the data folder is on slow network storage.
+The codec used to write the data files is chosen with COMPRESSION in conf/config.py, and
+a compressed file is named after its codec ("clients.json.gz", "clients.json.xz"). Files
+are always read by the codec their first bytes identify, so a file written with another
+setting, or renamed, is still read correctly.
+
+Files are compressed and decompressed as a stream, so a data file is never held in memory
+in both its compressed and its uncompressed form.
+
+Classes:
+    Codec: A compression format of the data files.
+
+Functions:
+    get_codec: Return the codec of a name from the configuration.
+    detect_codec: Identify the codec of a file from its first bytes.
+    open_text: Open a data file as text, compressing or decompressing it on the fly.
+    variants: List the file names a data file may be stored under.
+"""
+
+import gzip  # Importing gzip for the fast codec
+import lzma  # Importing lzma for the codec writing the smallest files
+
+
+class Codec:
+    """
+    A compression format of the data files.
+
+    Attributes:
+        name (str): The name used in the configuration, such as "gzip".
+        suffix (str): The suffix added to the names of compressed files, such as ".gz".
+        magic (bytes): The bytes every compressed file starts with.
+    """
+
+    def __init__(self, name, suffix, magic, module, write_options):
+        """
+        Create a codec.
+
+        Args:
+            name (str): The name used in the configuration.
+            suffix (str): The suffix added to the names of compressed files.
+            magic (bytes): The bytes every compressed file starts with.
+            module (module): The module compressing the files, providing open() like gzip and lzma.
+            write_options (dict): The keyword arguments of open() when writing, such as the compression level.
+        """
+        self.name = name
+        self.suffix = suffix
+        self.magic = magic
+        self.module = module
+        self.write_options = write_options
+
+    def open(self, path, mode):
+        """
+        Open a compressed file as text.
+
+        Args:
+            path (str): The path of the file.
+            mode (str): "r" to read or "w" to write.
+
+        Returns:
+            file: A text stream compressing or decompressing the file.
+        """
+        options = self.write_options if mode == "w" else {}
+        return self.module.open(path, mode + "t", **options)
+
+
+# Errors raised while decompressing a damaged or truncated file
+DECODE_ERRORS = (gzip.BadGzipFile, lzma.LZMAError, EOFError)
+
+# Codecs by name; level 6 and preset 1 balance the size of the files against the time to write them
+CODECS = {
+    "gzip": Codec("gzip", ".gz", b"\x1f\x8b", gzip, {"compresslevel": 6}),
+    "lzma": Codec("lzma", ".xz", b"\xfd7zXZ\x00", lzma, {"preset": 1}),
+}
+
+
+def get_codec(name):
+    """
+    Return the codec of a name from the configuration.
+
+    Args:
+        name (str): The name of the codec ("gzip" or "lzma"), or None for plain files.
+
+    Returns:
+        Codec: The codec, or None for plain files.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name is None:
+        return None
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown compression codec: {name}")
+    return codec
+
+
+def detect_codec(path):
+    """
+    Identify the codec of a file from its first bytes.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Codec: The codec the file was compressed with, or None if it is a plain file.
+
+    Raises:
+        FileNotFoundError: If the file is missing.
+    """
+    with open(path, "rb") as f:
+        start = f.read(max(len(codec.magic) for codec in CODECS.values()))
+    for codec in CODECS.values():
+        if start.startswith(codec.magic):
+            return codec
+    return None
+
+
+def open_text(path, mode, codec=None):
+    """
+    Open a data file as text, compressing or decompressing it on the fly.
+
+    Args:
+        path (str): The path of the file.
+        mode (str): "r" to read, with the codec detected from the file, or "w" to write.
+        codec (Codec, optional): The codec to write with; None writes a plain file.
+
+    Returns:
+        file: A text stream of the file.
+
+    Raises:
+        FileNotFoundError: If a file to read is missing.
+    """
+    if mode == "r":
+        codec = detect_codec(path)
+    if codec is None:
+        return open(path, mode)
+    return codec.open(path, mode)
+
+
+def variants(path):
+    """
+    List the file names a data file may be stored under: plain, and with the suffix of each codec.
+
+    Args:
+        path (str): The path of the data file, without a compression suffix.
+
+    Returns:
+        list: The possible paths of the stored file.
+    """
+    return [path] + [path + codec.suffix for codec in CODECS.values()]
@@ -2,40 +2,424 @@
 This module provides the backend logic for managing flight records in the Record Management System.
 
 It allows users to:
-- Load all flight records from a JSON file.
+- Load all flight records from a JSON file, through the shared record cache.
 - Save flight records to the JSON file.
+- Stream flight records one at a time, optionally filtered by a condition.
+- Fetch flight records a page at a time, in file order or sorted by any field through a sorted index.
 - Create new flight records.
-- Search for flight records by ID.
+- Create, update and delete many flight records at once, with a single write.
+- Search for flight records by ID through a hash index.
+- Reject duplicate flights through a composite (Client ID, Airline ID, Date/Time) index.
+- Filter and count flights over columnar arrays kept alongside the cached records.
+- Find the flights of a client or an airline through multi-value indexes.
+- Find the flights departing in a date range through a sorted Date/Time index.
+- Optionally reject flights referring to a missing client or airline, and delete the flights
+  of deleted clients and airlines, through the Client ID and Airline ID indexes.
 - Generate unique IDs for new flight records.
+- Optionally keep the flights in a memory-mapped file of fixed-width rows (see record.flight_file),
+  where flights are read, created, updated and deleted by ID without loading the others.
 
 Classes:
     FlightRecord: A class containing static methods for managing flight records.
 """
 
-import json  # Importing JSON module for reading and writing JSON files
+from contextlib import contextmanager  # Import to hold the flight file lock around mapped changes
 from datetime import datetime  # Import for date and time validation
-from conf.config import FLIGHT_FILE  # Import configuration for the flight data file path
+from conf.config import FLIGHT_FILE, CHECK_FLIGHT_REFERENCES, FLIGHT_STORE  # Import configuration for the flight data file path, reference checks and flight store
+from record.cache import RecordCache  # Import the shared in-memory record cache
+from record.batch import apply_batch, run_batch, check_new_id, id_floor  # Import the shared bulk operation logic and ID checks
+from record.locking import file_lock  # Import the data file locks, held while the memory-mapped flights change
+from record.flight_file import check_storable, row_key  # Import the checks of flights kept in the memory-mapped flight file
+from record.paging import fetch_page  # Import the shared paged query logic
+from record.sequence import IdSequence  # Import the persisted ID sequence
+from record.index import PrimaryIndex, UniqueIndex, MultiIndex, SortedIndex  # Import the indexes kept alongside the cached records
+from record.columns import FlightColumns, to_minutes  # Import the columnar flight index
+from record.client import ClientRecord  # Import the client records flights refer to
+from record.airline import AirlineRecord  # Import the airline records flights refer to
 
 class FlightRecord:
     """
     A class to handle operations related to flight records, such as loading, saving, creating, and searching.
     """
 
+    # Sequence handing out new flight IDs, persisted next to the data file
+    sequence = IdSequence(FLIGHT_FILE + ".seq")
+
     @staticmethod
     def load_all():
         """
         Load all flight records from the JSON file.
 
         If the file is missing or contains invalid data, return an empty list.
+        The file is only parsed again when it changed since it was last cached.
 
         Returns:
             list: A list of dictionaries representing all flight records.
         """
-        try:
-            with open(FLIGHT_FILE, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        return [dict(record) for record in RecordCache.load(FLIGHT_FILE)]
+
+    @staticmethod
+    def iter_all():
+        """
+        Iterate over all flight records one at a time.
+
+        Unlike load_all(), no list of all records is built, and a scan that stops early
+        does not parse the rest of the file.
+
+        Yields:
+            dict: A copy of each flight record, in file order.
+        """
+        return RecordCache.iter_records(FLIGHT_FILE)
+
+    @staticmethod
+    def iter_where(predicate):
+        """
+        Iterate over the flight records matching a condition.
+
+        Args:
+            predicate (callable): A function taking a flight record and returning True to keep it.
+
+        Yields:
+            dict: A copy of each matching flight record, in file order.
+        """
+        return (record for record in FlightRecord.iter_all() if predicate(record))
+
+    @staticmethod
+    def page(offset, limit, sort_by=None, descending=False):
+        """
+        Fetch one page of flight records, for browsing large files a page at a time.
+
+        Sorted pages are served from a sorted index on the field, so only the records
+        on the page are copied, however many records the file holds.
+
+        Args:
+            offset (int): The number of records to skip, in the requested order.
+            limit (int): The largest number of records on the page.
+            sort_by (str, optional): The field to sort by, such as "Date/Time"; file order if omitted.
+            descending (bool): Whether to sort from the largest value down.
+
+        Returns:
+            Page: Copies of the flight records on the page, and the total number of flight records.
+
+        Raises:
+            ValueError: If the offset or limit is negative, or flight records have no such field.
+        """
+        return fetch_page(RecordCache.open(FLIGHT_FILE), offset, limit, sort_by, descending)
+
+    @staticmethod
+    def _id_index(entry):
+        """
+        Return the index mapping flight IDs to records and positions for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            PrimaryIndex: The ID index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Flight_ID", lambda: PrimaryIndex("Flight_ID"))
+
+    @staticmethod
+    def _flight_key(record):
+        """
+        Build the composite key identifying duplicate flights.
+
+        Args:
+            record (dict): A flight record.
+
+        Returns:
+            tuple: The (Client ID, Airline ID, Date/Time) of the flight.
+        """
+        return (record.get("Client_ID"), record.get("Airline_ID"), record.get("Date/Time"))
+
+    @staticmethod
+    def _flight_key_index(entry):
+        """
+        Return the index mapping (Client ID, Airline ID, Date/Time) keys to flight records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            UniqueIndex: The composite key index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Flight Key", lambda: UniqueIndex(FlightRecord._flight_key))
+
+    @staticmethod
+    def _is_duplicate_flight(entry, flight_key, flight_id=None):
+        """
+        Check a composite flight key against the composite key index of a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            flight_key (tuple): The (Client ID, Airline ID, Date/Time) key to check.
+            flight_id (int, optional): The ID of a flight that should be ignored, used when updating.
+
+        Returns:
+            bool: True if another flight already has the key, False otherwise.
+        """
+        holders = FlightRecord._flight_key_index(entry).get(flight_key)
+        return any(holder.get("Flight_ID") != flight_id for holder in holders)
+
+    @staticmethod
+    def _client_index(entry):
+        """
+        Return the index mapping Client IDs to flight records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            MultiIndex: The Client ID index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Client_ID", lambda: MultiIndex(lambda record: record.get("Client_ID")))
+
+    @staticmethod
+    def _airline_index(entry):
+        """
+        Return the index mapping Airline IDs to flight records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            MultiIndex: The Airline ID index, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Airline_ID", lambda: MultiIndex(lambda record: record.get("Airline_ID")))
+
+    @staticmethod
+    def find_by_client(client_id):
+        """
+        Find all flights of a client.
+
+        Args:
+            client_id (int): The ID of the client.
+
+        Returns:
+            list: Copies of the client's flight records, or an empty list.
+
+        This method looks the client up in the Client ID index instead of scanning the flights.
+        """
+        return [dict(record) for record in FlightRecord._client_index(RecordCache.open(FLIGHT_FILE)).get(client_id)]
+
+    @staticmethod
+    def find_by_airline(airline_id):
+        """
+        Find all flights on an airline.
+
+        Args:
+            airline_id (int): The ID of the airline.
+
+        Returns:
+            list: Copies of the airline's flight records, or an empty list.
+
+        This method looks the airline up in the Airline ID index instead of scanning the flights.
+        """
+        return [dict(record) for record in FlightRecord._airline_index(RecordCache.open(FLIGHT_FILE)).get(airline_id)]
+
+    @staticmethod
+    def _reference_index(entry, field):
+        """
+        Return the index mapping a referenced ID to flight records for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            field (str): "Client_ID" or "Airline_ID".
+
+        Returns:
+            MultiIndex: The Client ID or Airline ID index.
+
+        Raises:
+            ValueError: If the field does not refer to another record.
+        """
+        if field == "Client_ID":
+            return FlightRecord._client_index(entry)
+        if field == "Airline_ID":
+            return FlightRecord._airline_index(entry)
+        raise ValueError(f"Flights do not refer to other records through {field}.")
+
+    @staticmethod
+    def references(field, record_id):
+        """
+        Count the flights referring to a client or an airline.
+
+        Args:
+            field (str): "Client_ID" or "Airline_ID".
+            record_id (int): The ID of the client or airline.
+
+        Returns:
+            int: The number of flights referring to it.
+        """
+        return FlightRecord._reference_index(RecordCache.open(FLIGHT_FILE), field).count(record_id)
+
+    @staticmethod
+    def delete_references(field, record_ids):
+        """
+        Delete every flight referring to any of the given clients or airlines, with a single write.
+
+        The flights are found through the Client ID or Airline ID index and removed in one pass,
+        so deleting thousands of flights does not scan or rewrite the records once per flight.
+
+        Args:
+            field (str): "Client_ID" or "Airline_ID".
+            record_ids (list): The IDs of the clients or airlines.
+
+        Returns:
+            int: The number of flights deleted.
+        """
+        entry = RecordCache.open(FLIGHT_FILE)
+        with entry.lock:
+            index = FlightRecord._reference_index(entry, field)
+            flights = [flight for record_id in set(record_ids) for flight in index.get(record_id)]
+            if not flights:
+                return 0
+            id_index = FlightRecord._id_index(entry)
+            positions = []
+            for flight in flights:
+                position = id_index.position(flight.get("Flight_ID"))
+                if position is None or entry.records[position] is not flight:
+                    # Another flight shares this Flight_ID, so find this one by identity
+                    position = next(i for i, record in enumerate(entry.records) if record is flight)
+                positions.append(position)
+            entry.delete_many(positions)
+            RecordCache.commit(entry)
+        return len(positions)
+
+    @staticmethod
+    def _check_references(flight_data):
+        """
+        Check that the client and airline a flight refers to exist, if CHECK_FLIGHT_REFERENCES is set.
+
+        Only the fields present in flight_data are checked, so partial updates can be checked too.
+
+        Args:
+            flight_data (dict): The flight information.
+
+        Raises:
+            ValueError: If the Client_ID or Airline_ID does not belong to an existing record.
+        """
+        if not CHECK_FLIGHT_REFERENCES:
+            return
+        if "Client_ID" in flight_data and not ClientRecord.exists(flight_data["Client_ID"]):
+            raise ValueError("No client found with the given Client ID.")
+        if "Airline_ID" in flight_data and not AirlineRecord.exists(flight_data["Airline_ID"]):
+            raise ValueError("No airline found with the given Airline ID.")
+
+    @staticmethod
+    def _date_index(entry):
+        """
+        Return the index ordering flight records by departure time for a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            SortedIndex: The Date/Time index, keyed by minutes since the epoch, built on first use
+            and rebuilt when the file changes externally. Flights without a valid Date/Time are left out.
+        """
+        return entry.index("Date/Time", lambda: SortedIndex(lambda record: to_minutes(record.get("Date/Time"))))
+
+    @staticmethod
+    def _minute_bounds(start, end):
+        """
+        Convert the bounds of a date range to minutes since the epoch.
+
+        Args:
+            start (str): The earliest Date/Time, as YYYY-MM-DD HH:MM, or None.
+            end (str): The latest Date/Time, as YYYY-MM-DD HH:MM, or None.
+
+        Returns:
+            list: The start and end in minutes, each None if it was not given.
+
+        Raises:
+            ValueError: If start or end is not a valid date and time.
+
+        Bounds without leading zeros, such as "2026-1-5 9:05", are accepted like in create() and update().
+        """
+        return [None if date_time is None else to_minutes(FlightRecord.normalize_date_time(date_time)) for date_time in (start, end)]
+
+    @staticmethod
+    def find_between(start, end, limit=None):
+        """
+        Find the flights departing between two dates and times, in time order.
+
+        Args:
+            start (str): The earliest Date/Time to include, as YYYY-MM-DD HH:MM, or None for no lower bound.
+            end (str): The latest Date/Time to include, as YYYY-MM-DD HH:MM, or None for no upper bound.
+            limit (int, optional): The largest number of flights to return.
+
+        Returns:
+            list: Copies of the matching flight records, earliest first.
+
+        Raises:
+            ValueError: If start or end is not a valid date and time.
+
+        This method searches the sorted Date/Time index, so it takes O(log n + k) for k flights.
+        """
+        bounds = FlightRecord._minute_bounds(start, end)
+        records = FlightRecord._date_index(RecordCache.open(FLIGHT_FILE)).range(bounds[0], bounds[1], limit)
+        return [dict(record) for record in records]
+
+    @staticmethod
+    def _columns(entry):
+        """
+        Return the columnar copy of the flights of a cache entry.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+
+        Returns:
+            FlightColumns: The flight columns, built on first use and rebuilt when the file changes externally.
+        """
+        return entry.index("Columns", FlightColumns)
+
+    @staticmethod
+    def query(client_id=None, airline_id=None, start=None, end=None, start_city=None, end_city=None):
+        """
+        Find the flights matching all of the given conditions.
+
+        The conditions are checked over the flight columns rather than the records, so even
+        large flight files are filtered quickly. With FLIGHT_STORE set to "mmap", the columns are
+        the only in-memory copy of the flights, and only the matching flights are decoded.
+
+        Args:
+            client_id (int, optional): The Client ID to match.
+            airline_id (int, optional): The Airline ID to match.
+            start (str, optional): The earliest Date/Time to match, as YYYY-MM-DD HH:MM.
+            end (str, optional): The latest Date/Time to match, as YYYY-MM-DD HH:MM.
+            start_city (str, optional): The Start City to match.
+            end_city (str, optional): The End City to match.
+
+        Returns:
+            list: Copies of the matching flight records, in file order.
+
+        Raises:
+            ValueError: If start or end is not a valid date and time.
+        """
+        bounds = FlightRecord._minute_bounds(start, end)
+        if FLIGHT_STORE == "mmap":
+            return RecordCache.storage.select(FLIGHT_FILE, client_id, airline_id, bounds[0], bounds[1], start_city, end_city)
+        entry = RecordCache.open(FLIGHT_FILE)
+        positions = FlightRecord._columns(entry).select(client_id, airline_id, bounds[0], bounds[1], start_city, end_city)
+        return [dict(entry.records[position]) for position in positions]
+
+    @staticmethod
+    def count_by(field):
+        """
+        Count the flights for each value of a field.
+
+        Args:
+            field (str): "Client_ID", "Airline_ID", "Start City" or "End City".
+
+        Returns:
+            dict: The number of flights for each value.
+
+        Raises:
+            ValueError: If the field cannot be counted.
+        """
+        if FLIGHT_STORE == "mmap":
+            return RecordCache.storage.count_by(FLIGHT_FILE, field)
+        return FlightRecord._columns(RecordCache.open(FLIGHT_FILE)).count_by(field)
 
     @staticmethod
     def save_all(records):
@@ -47,8 +431,7 @@ class FlightRecord:
 
         This method overwrites the current data in the file with the provided list.
         """
-        with open(FLIGHT_FILE, "w") as f:
-            json.dump(records, f, indent=4)
+        RecordCache.save(FLIGHT_FILE, [dict(record) for record in records])
 
     @staticmethod
     def is_duplicate_flight(client_id, airline_id, date_time):
@@ -63,15 +446,7 @@ class FlightRecord:
         Returns:
             bool: True if a duplicate exists, False otherwise.
         """
-        records = FlightRecord.load_all()
-        for record in records:
-            if (
-                record["Client_ID"] == client_id
-                and record["Airline_ID"] == airline_id
-                and record["Date/Time"] == date_time
-            ):
-                return True
-        return False
+        return FlightRecord._is_duplicate_flight(RecordCache.open(FLIGHT_FILE), (client_id, airline_id, date_time))
 
     @staticmethod
     def is_valid_date_time(date_time):
@@ -92,6 +467,27 @@ class FlightRecord:
         except ValueError:
             return False
 
+    @staticmethod
+    def normalize_date_time(date_time):
+        """
+        Return a date and time in the standard, zero-padded format.
+
+        Args:
+            date_time (str): The date and time, such as "2026-1-5 9:05".
+
+        Returns:
+            str: The same date and time as YYYY-MM-DD HH:MM, such as "2026-01-05 09:05".
+
+        Raises:
+            ValueError: If the date and time format is invalid.
+
+        Flights are saved with normalized dates, so the Date/Time index and the flight
+        columns, which only read the standard format, include every flight.
+        """
+        if not FlightRecord.is_valid_date_time(date_time):
+            raise ValueError("Invalid date and time format. Use YYYY-MM-DD HH:MM.")
+        return datetime.strptime(date_time, "%Y-%m-%d %H:%M").isoformat(" ", "minutes")
+
     @staticmethod
     def create(flight_data):
         """
@@ -99,16 +495,136 @@ class FlightRecord:
 
         Args:
             flight_data (dict): A dictionary containing flight information, such as client ID, airline ID, date, start city, and end city.
+                If it has no "Flight_ID", a new ID is allocated from the ID sequence.
+
+        Returns:
+            int: The Flight_ID of the new flight.
 
         Raises:
-            ValueError: If the date and time format is invalid.
+            ValueError: If the date and time format is invalid, a duplicate flight is detected,
+                the given Flight_ID is not a positive integer or is already taken,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+
+        With FLIGHT_STORE set to "mmap", the flight is checked against the key index of the
+        memory-mapped flight file and written to its row, without loading the other flights.
         """
-        if not FlightRecord.is_valid_date_time(flight_data["Date/Time"]):
-            raise ValueError("Invalid date and time format. Use YYYY-MM-DD HH:MM.")
-        
-        records = FlightRecord.load_all()
-        records.append(flight_data)
-        FlightRecord.save_all(records)
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return FlightRecord._create_mapped(flights, flight_data)
+        entry = RecordCache.open(FLIGHT_FILE)
+        with entry.lock:
+            flight_id = FlightRecord._create_in(entry, flight_data)
+            RecordCache.commit(entry)
+        return flight_id
+
+    @staticmethod
+    def _create_in(entry, flight_data, floor=0):
+        """
+        Validate a new flight against a cache entry and append a copy of it, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            flight_data (dict): A dictionary containing flight information.
+                If it has no "Flight_ID", a new ID is allocated once the record is valid.
+            floor (int, optional): The smallest acceptable new ID.
+
+        Returns:
+            int: The ID of the new flight.
+
+        Raises:
+            ValueError: If the date and time format is invalid, a duplicate flight is detected,
+                the given Flight_ID is not a positive integer or is already taken,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+        """
+        # Dates are saved zero-padded, the only format the Date/Time index reads
+        flight_data = dict(flight_data, **{"Date/Time": FlightRecord.normalize_date_time(flight_data["Date/Time"])})
+        FlightRecord._check_references(flight_data)
+        if FlightRecord._is_duplicate_flight(entry, FlightRecord._flight_key(flight_data)):
+            raise ValueError("Duplicate flight record detected.")
+        if "Flight_ID" in flight_data:
+            check_new_id(FlightRecord._id_index(entry), flight_data["Flight_ID"])
+        else:
+            flight_data = dict(flight_data, Flight_ID=FlightRecord._allocate_id(entry, floor))
+        if FLIGHT_STORE == "mmap":
+            # Rejected here rather than when the batch is written, so other flights are still saved
+            check_storable(flight_data)
+        entry.insert(dict(flight_data))
+        return flight_data["Flight_ID"]
+
+    @staticmethod
+    @contextmanager
+    def _mapped_file():
+        """
+        Hold the exclusive lock of the flight file while the memory-mapped flights are changed.
+
+        Yields:
+            FlightFile: The memory-mapped flight file. Its change counter is increased on
+            exit if rows were changed, so other processes and the record cache reload.
+        """
+        with file_lock(FLIGHT_FILE).exclusive():
+            flights = RecordCache.storage.flight_file(FLIGHT_FILE)
+            try:
+                yield flights
+            finally:
+                if flights.changed:
+                    flights.bump()
+
+    @staticmethod
+    def _create_mapped(flights, flight_data, floor=0):
+        """
+        Validate a new flight against the memory-mapped flight file and write its row.
+
+        Args:
+            flights (FlightFile): The memory-mapped flight file, locked by _mapped_file().
+            flight_data (dict): A dictionary containing flight information.
+                If it has no "Flight_ID", a new ID is allocated once the record is valid.
+            floor (int, optional): The smallest acceptable new ID.
+
+        Returns:
+            int: The ID of the new flight.
+
+        Raises:
+            ValueError: If the date and time format is invalid, a duplicate flight is detected,
+                the given Flight_ID is not a positive integer or is already taken,
+                the flight cannot be stored in a fixed-width row,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+        """
+        # Dates are saved zero-padded, the only format the Date/Time index reads
+        flight_data = dict(flight_data, **{"Date/Time": FlightRecord.normalize_date_time(flight_data["Date/Time"])})
+        FlightRecord._check_references(flight_data)
+        if flights.find_key(row_key(flight_data)):
+            raise ValueError("Duplicate flight record detected.")
+        if "Flight_ID" in flight_data:
+            check_new_id(flights, flight_data["Flight_ID"])
+        else:
+            flight_data = dict(flight_data, Flight_ID=FlightRecord.sequence.allocate(max(flights.highest + 1, floor)))
+        flights.put(flight_data)
+        return flight_data["Flight_ID"]
+
+    @staticmethod
+    def create_many(records):
+        """
+        Create many flight records with one validation pass and a single write.
+
+        Args:
+            records (list): Dictionaries containing flight information. Records without a "Flight_ID"
+                are given new IDs from the ID sequence.
+
+        Returns:
+            BatchResult: The IDs of the created flights, and (batch position, error message)
+            tuples for the records that were rejected, such as invalid dates, duplicate flights or duplicate IDs.
+        """
+        # New IDs must also stay above every ID given explicitly in the batch
+        floor = id_floor(records, "Flight_ID")
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return run_batch(records, lambda flight_data: FlightRecord._create_mapped(flights, flight_data, floor))
+        entry = RecordCache.open(FLIGHT_FILE)
+
+        def create(flight_data):
+            return FlightRecord._create_in(entry, flight_data, floor)
+
+        return apply_batch(entry, records, create)
 
     @staticmethod
     def search(flight_id):
@@ -120,12 +636,29 @@ class FlightRecord:
 
         Returns:
             dict: The flight record if found, otherwise None.
+
+        With FLIGHT_STORE set to "mmap", the flight is decoded from its row of the
+        memory-mapped flight file, without loading any other flight.
+        """
+        if FLIGHT_STORE == "mmap":
+            return RecordCache.storage.get(FLIGHT_FILE, flight_id)
+        record = FlightRecord._id_index(RecordCache.open(FLIGHT_FILE)).get(flight_id)
+        return dict(record) if record is not None else None
+
+    @staticmethod
+    def exists(flight_id):
+        """
+        Check whether a flight with the given ID exists.
+
+        Args:
+            flight_id (int): The ID to check.
+
+        Returns:
+            bool: True if a flight has the ID, False otherwise.
+
+        This method looks the ID up like search(), so it takes constant time.
         """
-        records = FlightRecord.load_all()
-        for record in records:
-            if record.get("Flight_ID") == flight_id:
-                return record
-        return None
+        return FlightRecord.search(flight_id) is not None
 
     @staticmethod
     def generate_id():
@@ -135,13 +668,27 @@ class FlightRecord:
         Returns:
             int: A unique flight ID.
 
-        IDs are generated sequentially, starting from 1.
+        IDs come from the persisted ID sequence, so they are increasing and unique across
+        windows, processes and restarts. The ID is reserved even if no record is created with it.
+        """
+        if FLIGHT_STORE == "mmap":
+            return FlightRecord.sequence.allocate(RecordCache.storage.highest_id(FLIGHT_FILE) + 1)
+        return FlightRecord._allocate_id(RecordCache.open(FLIGHT_FILE))
+
+    @staticmethod
+    def _allocate_id(entry, floor=0):
+        """
+        Allocate a new flight ID from the ID sequence.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            floor (int, optional): The smallest acceptable ID, in addition to staying above every stored ID.
+
+        Returns:
+            int: An ID above every stored ID that no other call or process has been given.
         """
-        records = FlightRecord.load_all()
-        if not records:
-            return 1
-        return max(record.get("Flight_ID", 0) for record in records) + 1
-    
+        return FlightRecord.sequence.allocate(max(FlightRecord._id_index(entry).highest + 1, floor))
+
     @staticmethod
     def update(flight_id, updated_data):
         """
@@ -155,18 +702,123 @@ class FlightRecord:
             bool: True if the record was updated, False if no matching record was found.
 
         Raises:
-            ValueError: If the date and time format is invalid.
+            ValueError: If the date and time format is invalid, the update would duplicate another flight,
+                the Flight_ID would change to one that is invalid or already taken,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+
+        With FLIGHT_STORE set to "mmap", the row of the flight is read, checked and written
+        back, without loading the other flights.
         """
-        if not FlightRecord.is_valid_date_time(updated_data["Date/Time"]):
-            raise ValueError("Invalid date and time format. Use YYYY-MM-DD HH:MM.")
-        
-        records = FlightRecord.load_all()
-        for record in records:
-            if record.get("Flight_ID") == flight_id:
-                record.update(updated_data)
-                FlightRecord.save_all(records)
-                return True
-        return False
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return FlightRecord._update_mapped(flights, flight_id, updated_data)
+        entry = RecordCache.open(FLIGHT_FILE)
+        with entry.lock:
+            if not FlightRecord._update_in(entry, flight_id, updated_data):
+                return False
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _update_in(entry, flight_id, updated_data):
+        """
+        Validate changes to a flight against a cache entry and apply them, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            flight_id (int): The ID of the flight to update.
+            updated_data (dict): A dictionary containing the updated flight information.
+
+        Returns:
+            bool: True if the record was updated, False if no matching record was found.
+
+        Raises:
+            ValueError: If the date and time format is invalid, the update would duplicate another flight,
+                the Flight_ID would change to one that is invalid or already taken,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+        """
+        # Dates are saved zero-padded, the only format the Date/Time index reads
+        updated_data = dict(updated_data, **{"Date/Time": FlightRecord.normalize_date_time(updated_data["Date/Time"])})
+        id_index = FlightRecord._id_index(entry)
+        position = id_index.position(flight_id)
+        if position is None:
+            return False
+        FlightRecord._check_references(updated_data)
+        if updated_data.get("Flight_ID", flight_id) != flight_id:
+            check_new_id(id_index, updated_data["Flight_ID"])
+        # The key is built from the record as it will look after the update
+        updated_record = {**entry.records[position], **updated_data}
+        if FlightRecord._is_duplicate_flight(entry, FlightRecord._flight_key(updated_record), flight_id):
+            raise ValueError("Duplicate flight record detected.")
+        if FLIGHT_STORE == "mmap":
+            # Rejected here rather than when the batch is written, so other flights are still saved
+            check_storable(updated_record)
+        entry.update(position, updated_data)
+        return True
+
+    @staticmethod
+    def _update_mapped(flights, flight_id, updated_data):
+        """
+        Validate changes to a flight against the memory-mapped flight file and write its row.
+
+        Args:
+            flights (FlightFile): The memory-mapped flight file, locked by _mapped_file().
+            flight_id (int): The ID of the flight to update.
+            updated_data (dict): A dictionary containing the updated flight information.
+
+        Returns:
+            bool: True if the record was updated, False if no matching record was found.
+
+        Raises:
+            ValueError: If the date and time format is invalid, the update would duplicate another flight,
+                the Flight_ID would change to one that is invalid or already taken,
+                the flight cannot be stored in a fixed-width row,
+                or the client or airline does not exist while CHECK_FLIGHT_REFERENCES is set.
+        """
+        # Dates are saved zero-padded, the only format the Date/Time index reads
+        updated_data = dict(updated_data, **{"Date/Time": FlightRecord.normalize_date_time(updated_data["Date/Time"])})
+        current = flights.get(flight_id)
+        if current is None:
+            return False
+        FlightRecord._check_references(updated_data)
+        updated_record = {**current, **updated_data}
+        new_id = updated_record["Flight_ID"]
+        if new_id != flight_id:
+            check_new_id(flights, new_id)
+        if any(holder != flight_id for holder in flights.find_key(row_key(updated_record))):
+            raise ValueError("Duplicate flight record detected.")
+        flights.put(updated_record)
+        if new_id != flight_id:
+            flights.remove(flight_id)
+        return True
+
+    @staticmethod
+    def update_many(updates):
+        """
+        Update many flight records with one validation pass and a single write.
+
+        Args:
+            updates (list): (flight ID, updated data) tuples, applied in order.
+
+        Returns:
+            BatchResult: The IDs of the updated flights, and (batch position, error message)
+            tuples for the updates that were rejected or whose flight was not found.
+        """
+        def update(item):
+            flight_id, updated_data = item
+            if FLIGHT_STORE == "mmap":
+                found = FlightRecord._update_mapped(flights, flight_id, updated_data)
+            else:
+                found = FlightRecord._update_in(entry, flight_id, updated_data)
+            if not found:
+                raise ValueError("No flight found with the given ID.")
+            return flight_id
+
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return run_batch(updates, update)
+        entry = RecordCache.open(FLIGHT_FILE)
+        return apply_batch(entry, updates, update)
 
     @staticmethod
     def delete(flight_id):
@@ -178,10 +830,61 @@ class FlightRecord:
 
         Returns:
             bool: True if the record was deleted, False if no matching record was found.
+
+        With FLIGHT_STORE set to "mmap", only the row of the flight is emptied.
         """
-        records = FlightRecord.load_all()
-        updated_records = [record for record in records if record.get("Flight_ID") != flight_id]
-        if len(records) != len(updated_records):
-            FlightRecord.save_all(updated_records)
-            return True
-        return False
\ No newline at end of file
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return flights.remove(flight_id)
+        entry = RecordCache.open(FLIGHT_FILE)
+        with entry.lock:
+            if not FlightRecord._delete_in(entry, flight_id):
+                return False
+            RecordCache.commit(entry)
+        return True
+
+    @staticmethod
+    def _delete_in(entry, flight_id):
+        """
+        Remove a flight from a cache entry, without saving.
+
+        Args:
+            entry (CachedFile): The cache entry of the flight file.
+            flight_id (int): The ID of the flight to delete.
+
+        Returns:
+            bool: True if the record was removed, False if not found.
+        """
+        index = FlightRecord._id_index(entry)
+        if flight_id not in index:
+            return False
+        while flight_id in index:
+            entry.delete(index.position(flight_id))
+        return True
+
+    @staticmethod
+    def delete_many(flight_ids):
+        """
+        Delete many flight records by ID with a single write.
+
+        Args:
+            flight_ids (list): The IDs of the flights to delete.
+
+        Returns:
+            BatchResult: The IDs of the deleted flights, and (batch position, error message)
+            tuples for the IDs that were not found.
+        """
+        def delete(flight_id):
+            if FLIGHT_STORE == "mmap":
+                found = flights.remove(flight_id)
+            else:
+                found = FlightRecord._delete_in(entry, flight_id)
+            if not found:
+                raise ValueError("No flight found with the given ID.")
+            return flight_id
+
+        if FLIGHT_STORE == "mmap":
+            with FlightRecord._mapped_file() as flights:
+                return run_batch(flight_ids, delete)
+        entry = RecordCache.open(FLIGHT_FILE)
+        return apply_batch(entry, flight_ids, delete)
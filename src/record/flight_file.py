@@ -0,0 +1,1117 @@
+"""
+This module provides a memory-mapped, fixed-width flight file for the Record Management System.
+
+Every flight takes one fixed-width row, packed with struct:
+
+    used flag (1 byte) | Flight_ID | Client_ID | Airline_ID | Date/Time | Start City | End City
+                         64-bit integers; Date/Time in minutes since the epoch  | 32-bit city codes
+
+Cities are dictionary encoded: each row stores a small code, and the city names are kept
+once in a file next to the flight file ("<data file>.bin.cities"), one JSON string per line.
+
+The row of a flight is found from its ID alone: Flight_ID n is kept in row n - 1. Reading or
+updating one flight is then a seek plus a decode or encode of one row in the memory-mapped
+file; the other rows are never read or copied, and the operating system only loads the pages
+touched, so the process stays small even for tens of millions of flights. Deleted flights
+leave an empty row behind, and the file grows to the highest Flight_ID.
+
+Scans, filters and aggregations run over typed columns built from the rows (see record.columns),
+one row per Flight_ID, so no record is created for the flights they skip. The columns follow the
+changes made through the file, and are built again after another process changed it.
+
+Duplicate flights are found through a key index kept next to the flight file
+("<data file>.bin.keys"): a memory-mapped hash table from the (Client_ID, Airline_ID, Date/Time)
+key of each flight to its Flight_ID. It is updated along with the rows, and rebuilt from the
+rows when it is missing or out of step with them, so a duplicate check reads a few slots
+instead of the flights.
+
+Only the six standard flight fields can be stored. Flights with other fields, non-integer
+IDs, or an invalid Date/Time are rejected with ValueError rather than stored incompletely.
+
+Classes:
+    FlightFile: A memory-mapped file of fixed-width flight rows, addressed by Flight_ID.
+    FlightKeys: A memory-mapped hash table from the duplicate key of each flight to its Flight_ID.
+    MappedFlightStorage: A storage engine keeping the flight file memory-mapped and other files in another engine.
+
+Functions:
+    check_storable: Check that a flight can be stored in a fixed-width row.
+    row_key: Return the duplicate key of a flight, as the key index stores it.
+"""
+
+import json  # Importing JSON module for the city dictionary
+import mmap  # Importing mmap to access the flight file without reading it
+import os  # Importing os to create, resize and replace the flight file
+import struct  # Importing struct for the fixed-width row layout
+import threading  # Importing threading to guard the open flight files
+from record.columns import MISSING, NO_CITY, EMPTY_ROW, FlightColumns, to_minutes, from_minutes  # Import the column encodings shared with FlightColumns
+from record.locking import file_lock  # Import the data file locks, taken while one flight is read
+from record.models import Flight, record_type  # Import the flight record type, to find the flight file
+
+# File header: magic, layout version, row size, change counter, number of flights, highest Flight_ID
+HEADER = struct.Struct("<8sIIqqq")
+HEADER_SIZE = 64  # Bytes reserved for the header, so rows start at an aligned offset
+MAGIC = b"RMSFLT\x00\x01"
+LAYOUT_VERSION = 2
+
+# Row: used flag, Flight_ID, Client_ID, Airline_ID, minutes since the epoch, Start City, End City codes
+ROW = struct.Struct("<Bqqqqii")
+
+# Largest number of empty rows a new flight may leave before it, so a mistyped huge Flight_ID
+# cannot grow the file to terabytes
+MAX_ID_GAP = 1_000_000
+
+# Number of rows decoded at a time when streaming the flights
+_CHUNK_ROWS = 4096
+
+# Fields stored in a row, in row order
+_FIELDS = ("Flight_ID", "Client_ID", "Airline_ID", "Date/Time", "Start City", "End City")
+
+# Key index header: magic, inode and change counter of the flight file it matches, slots, keys, removed keys
+KEYS_HEADER = struct.Struct("<8sQqqqq")
+KEYS_MAGIC = b"RMSKEY\x00\x01"
+# Key index slot: Client_ID, Airline_ID, minutes since the epoch, and the Flight_ID, which is 0
+# if the slot was never used and -1 if its key was removed
+SLOT = struct.Struct("<qqqq")
+_REMOVED = -1
+# Smallest number of slots in a key index
+_MIN_SLOTS = 1024
+
+
+class FlightFile:
+    """
+    A memory-mapped file of fixed-width flight rows, addressed by Flight_ID.
+
+    Callers guard the file with its data file lock: a shared lock to read, and an exclusive
+    lock to change it or look up duplicate keys.
+    """
+
+    key = "Flight_ID"  # Name of the ID field, as for PrimaryIndex, so new IDs are checked the same way
+
+    def __init__(self, path):
+        """
+        Open and map an existing flight file.
+
+        Args:
+            path (str): The path of the flight file.
+
+        Raises:
+            FileNotFoundError: If the file is missing.
+            ValueError: If the file is not a flight file of this layout.
+        """
+        self.path = path
+        self.cities_path = path + ".cities"
+        self.keys_path = path + ".keys"
+        self._keys = None  # FlightKeys, opened on the first change or duplicate check
+        self._columns = None  # FlightColumns of the rows, built on the first query
+        self._columns_version = None  # Change counter the columns were last in step with
+        self._file = open(path, "r+b")
+        try:
+            self.inode = os.fstat(self._file.fileno()).st_ino
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, layout, row_size = HEADER.unpack_from(self._map, 0)[:3]
+            if magic != MAGIC or layout != LAYOUT_VERSION or row_size != ROW.size:
+                raise ValueError(f"{path} is not a flight file of this layout.")
+        except Exception:
+            self.close()
+            raise
+        self.cities = []  # City code -> city name
+        self.city_codes = {}  # City name -> city code
+        self._cities_size = 0  # Bytes of the city dictionary read so far
+        self._load_cities()
+        self.changed = False  # Whether rows were changed since the last bump()
+
+    @classmethod
+    def create(cls, path, records):
+        """
+        Write a new flight file holding the given flights, replacing any existing one.
+
+        The file is written next to its final name and swapped in, so readers never see a half-written file.
+        Its key index is built on first use.
+
+        Args:
+            path (str): The path of the flight file.
+            records (iterable): The flight records, such as a list or a stream read from the JSON file.
+
+        Returns:
+            FlightFile: The new file, opened.
+
+        Raises:
+            ValueError: If a record cannot be stored in a fixed-width row.
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        cities = {}  # City name -> city code
+        used = bytearray()  # One byte per row, set once the row holds a flight
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, LAYOUT_VERSION, ROW.size, 0, 0, 0).ljust(HEADER_SIZE, b"\0"))
+            position = HEADER_SIZE
+            for record in records:
+                row = _encode(record, lambda city: cities.setdefault(city, len(cities)))
+                if row[1] > len(used):
+                    if row[1] - 1 - len(used) > MAX_ID_GAP:
+                        raise ValueError(f"Flight ID {row[1]} is too far above the highest stored flight ID.")
+                    used.extend(bytes(row[1] - len(used)))
+                # A later flight with the same ID replaces the earlier one
+                used[row[1] - 1] = 1
+                offset = _offset(row[1])
+                if offset != position:
+                    # Seeking flushes the write buffer, so flights already in ID order are written without it
+                    f.seek(offset)
+                f.write(ROW.pack(*row))
+                position = offset + ROW.size
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, LAYOUT_VERSION, ROW.size, 0, used.count(1), len(used)))
+        with open(temp_path + ".cities", "w") as f:
+            f.write("".join(json.dumps(city) + "\n" for city in cities))
+        # The cities go first, so a flight file is never paired with a dictionary missing its codes
+        os.replace(temp_path + ".cities", path + ".cities")
+        os.replace(temp_path, path)
+        return cls(path)
+
+    def close(self):
+        """
+        Unmap and close the file and its key index.
+        """
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if self._keys is not None:
+            self._keys.close()
+            self._keys = None
+        self._file.close()
+
+    @property
+    def version(self):
+        """
+        int: The change counter, increased by every commit, which tells other processes the file changed.
+        """
+        return HEADER.unpack_from(self._map, 0)[3]
+
+    @property
+    def highest(self):
+        """
+        int: The highest Flight_ID ever stored; not lowered when flights are removed.
+        """
+        return HEADER.unpack_from(self._map, 0)[5]
+
+    def __len__(self):
+        return HEADER.unpack_from(self._map, 0)[4]
+
+    def __contains__(self, flight_id):
+        return self.get(flight_id) is not None
+
+    def _set_header(self, version, count, highest):
+        """
+        Update the change counter, the number of flights and the highest Flight_ID in the header.
+        """
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, ROW.size, version, count, highest)
+
+    def _load_cities(self):
+        """
+        Read the city dictionary, including cities added by other processes since it was last read.
+        """
+        try:
+            with open(self.cities_path, "rb") as f:
+                # The dictionary is only ever appended to, so only the new lines are read
+                f.seek(self._cities_size)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A line still being appended by another process is read next time
+        data = data[:data.rfind(b"\n") + 1]
+        for line in data.splitlines():
+            city = json.loads(line)
+            self.city_codes[city] = len(self.cities)
+            self.cities.append(city)
+        self._cities_size += len(data)
+
+    def _city_code(self, city):
+        """
+        Return the code of a city, adding it to the dictionary on first use.
+
+        Args:
+            city (str): The city name.
+
+        Returns:
+            int: The city code.
+        """
+        code = self.city_codes.get(city)
+        if code is None:
+            # Another process may have added the city meanwhile
+            self._load_cities()
+            code = self.city_codes.get(city)
+        if code is None:
+            code = len(self.cities)
+            line = (json.dumps(city) + "\n").encode("utf-8")
+            with open(self.cities_path, "ab") as f:
+                f.write(line)
+            self.cities.append(city)
+            self.city_codes[city] = code
+            self._cities_size += len(line)
+        return code
+
+    def _city(self, code):
+        """
+        Return the name of a city code, reading cities added by other processes if needed.
+        """
+        if code >= len(self.cities):
+            self._load_cities()
+        return self.cities[code]
+
+    def _remap(self):
+        """
+        Map the file again if another process or a commit changed its size.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if size != len(self._map):
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _decode(self, row):
+        """
+        Convert an unpacked row to a flight record.
+
+        Args:
+            row (tuple): The row values, as unpacked from ROW.
+
+        Returns:
+            dict: The flight record, leaving out missing fields.
+        """
+        _, flight_id, client_id, airline_id, minutes, start_city, end_city = row
+        record = {"Flight_ID": flight_id}
+        if client_id != MISSING:
+            record["Client_ID"] = client_id
+        if airline_id != MISSING:
+            record["Airline_ID"] = airline_id
+        if minutes != MISSING:
+            record["Date/Time"] = from_minutes(minutes)
+        if start_city != NO_CITY:
+            record["Start City"] = self._city(start_city)
+        if end_city != NO_CITY:
+            record["End City"] = self._city(end_city)
+        return record
+
+    def _row(self, flight_id):
+        """
+        Unpack the row of a flight.
+
+        Args:
+            flight_id (int): The ID of the flight.
+
+        Returns:
+            tuple: The row values, or None if there is no flight with the ID.
+        """
+        if type(flight_id) is not int or flight_id < 1:
+            return None
+        offset = _offset(flight_id)
+        if offset + ROW.size > len(self._map):
+            self._remap()
+            if offset + ROW.size > len(self._map):
+                return None
+        row = ROW.unpack_from(self._map, offset)
+        return row if row[0] else None
+
+    def get(self, flight_id):
+        """
+        Read one flight: a seek to its row and a decode of that row only.
+
+        Args:
+            flight_id (int): The ID of the flight.
+
+        Returns:
+            dict: The flight record, or None if there is no flight with the ID.
+        """
+        row = self._row(flight_id)
+        return self._decode(row) if row is not None else None
+
+    def encode(self, record, highest=0):
+        """
+        Convert a flight to the row it would be written as, without writing it.
+
+        New cities are added to the city dictionary, which is harmless if the row is never written.
+
+        Args:
+            record (dict): The flight record.
+            highest (int, optional): The highest Flight_ID written before this one, if above the
+                highest stored one, such as an earlier flight of the same commit.
+
+        Returns:
+            tuple: The row values, ready for put_row().
+
+        Raises:
+            ValueError: If the record cannot be stored in a fixed-width row.
+        """
+        row = _encode(record, self._city_code)
+        if row[1] - 1 - max(self.highest, highest) > MAX_ID_GAP:
+            raise ValueError(f"Flight ID {row[1]} is too far above the highest stored flight ID.")
+        return row
+
+    def put(self, record):
+        """
+        Write one flight to its row, adding it or replacing the flight with the same ID.
+
+        Args:
+            record (dict): The flight record.
+
+        Raises:
+            ValueError: If the record cannot be stored in a fixed-width row.
+        """
+        self.put_row(self.encode(record))
+
+    def put_row(self, row):
+        """
+        Write an encoded flight to its row, and move its key in the key index.
+
+        Args:
+            row (tuple): The row values, from encode().
+        """
+        offset = _offset(row[1])
+        self._remap()
+        rows = (len(self._map) - HEADER_SIZE) // ROW.size
+        if offset + ROW.size > len(self._map):
+            # Grow by doubling, so adding flights one at a time only remaps the file now and then
+            self._file.truncate(HEADER_SIZE + max(row[1], 2 * rows, 1024) * ROW.size)
+            self._remap()
+        keys = self.key_index()
+        old = ROW.unpack_from(self._map, offset)
+        if old[0]:
+            keys.remove(old[2:5], old[1])
+        ROW.pack_into(self._map, offset, *row)
+        self._keys = keys.add(row[2:5], row[1])
+        self._update_columns(row[1], row[1:])
+        self._set_header(self.version, len(self) + (not old[0]), max(self.highest, row[1]))
+        self.changed = True
+
+    def remove(self, flight_id):
+        """
+        Empty the row of a flight.
+
+        Args:
+            flight_id (int): The ID of the flight.
+
+        Returns:
+            bool: True if the flight was removed, False if there was no flight with the ID.
+        """
+        row = self._row(flight_id)
+        if row is None:
+            return False
+        self.key_index().remove(row[2:5], flight_id)
+        self._map[_offset(flight_id)] = 0
+        self._update_columns(flight_id, EMPTY_ROW)
+        self._set_header(self.version, len(self) - 1, self.highest)
+        self.changed = True
+        return True
+
+    def bump(self):
+        """
+        Increase the change counter and flush the changed rows and keys to disk.
+        """
+        version = self.version + 1
+        if self._columns_version == self.version:
+            self._columns_version = version
+        self._set_header(version, len(self), self.highest)
+        self._map.flush()
+        if self._keys is not None:
+            self._keys.sync(self.inode, version)
+        self.changed = False
+
+    def key_index(self):
+        """
+        Return the key index of the file, opening it, or building it from the rows if it is
+        missing or was not updated along with the last changes to the rows.
+
+        Returns:
+            FlightKeys: The key index, matching the rows.
+        """
+        keys = self._keys
+        if keys is not None and not keys.current(self.inode, self.version):
+            keys.close()
+            keys = None
+        if keys is None:
+            try:
+                keys = FlightKeys(self.keys_path)
+                if not keys.current(self.inode, self.version):
+                    keys.close()
+                    keys = None
+            except (FileNotFoundError, ValueError):
+                keys = None
+        if keys is None:
+            keys = FlightKeys.create(self.keys_path, self._keys_of_rows(), len(self), self.inode, self.version)
+        self._keys = keys
+        return keys
+
+    def columns(self):
+        """
+        Return the flights as typed columns, one row per Flight_ID, building them from the rows
+        on first use and after another process changed the file.
+
+        Returns:
+            FlightColumns: The columns; row n - 1 holds Flight_ID n, and rows without a flight hold EMPTY_ROW.
+        """
+        if self._columns is None or self._columns_version != self.version:
+            self._load_cities()
+            columns = FlightColumns()
+            # The rows hold the codes of the city dictionary, so the columns share it
+            columns.cities, columns.city_codes = self.cities, self.city_codes
+            self._remap()
+            highest = self.highest
+            for first_row in range(0, highest, _CHUNK_ROWS):
+                end = min(first_row + _CHUNK_ROWS, highest)
+                for row in ROW.iter_unpack(self._map[HEADER_SIZE + first_row * ROW.size:HEADER_SIZE + end * ROW.size]):
+                    columns.put_row(len(columns), row[1:] if row[0] else EMPTY_ROW)
+            self._columns, self._columns_version = columns, self.version
+        return self._columns
+
+    def _update_columns(self, flight_id, values):
+        """
+        Copy a changed row to the columns, if they are built and in step with the file.
+
+        Args:
+            flight_id (int): The ID of the flight.
+            values (tuple): The row values without the used flag, or EMPTY_ROW.
+        """
+        if self._columns is not None and self._columns_version == self.version:
+            self._columns.put_row(flight_id - 1, values)
+
+    def _keys_of_rows(self):
+        """
+        Read the key of every flight from the rows, a chunk at a time.
+
+        Yields:
+            tuple: The key of a flight, as stored in its row, and its Flight_ID.
+        """
+        self._remap()
+        total = (len(self._map) - HEADER_SIZE) // ROW.size
+        for first_row in range(0, total, _CHUNK_ROWS):
+            end = min(first_row + _CHUNK_ROWS, total)
+            for row in ROW.iter_unpack(self._map[HEADER_SIZE + first_row * ROW.size:HEADER_SIZE + end * ROW.size]):
+                if row[0]:
+                    yield row[2:5], row[1]
+
+    def find_key(self, key):
+        """
+        Find the flights with a duplicate key, through the key index.
+
+        Args:
+            key (tuple): The key, from row_key().
+
+        Returns:
+            list: The Flight_IDs of the flights with the key.
+        """
+        return self.key_index().find(key)
+
+    def read_chunk(self, first_row, rows=_CHUNK_ROWS):
+        """
+        Decode the flights in a range of rows.
+
+        Args:
+            first_row (int): The first row to decode.
+            rows (int): The number of rows to decode.
+
+        Returns:
+            tuple: The flight records in the rows, in Flight_ID order, and the first row
+            after the range, or None if the range reached the end of the file.
+        """
+        self._remap()
+        total = (len(self._map) - HEADER_SIZE) // ROW.size
+        end = min(first_row + rows, total)
+        data = self._map[HEADER_SIZE + first_row * ROW.size:HEADER_SIZE + end * ROW.size]
+        records = [self._decode(row) for row in ROW.iter_unpack(data) if row[0]]
+        return records, (end if end < total else None)
+
+    def __iter__(self):
+        """
+        Decode the flights one at a time, in Flight_ID order, a chunk of rows at a time.
+
+        Yields:
+            dict: The flight records.
+        """
+        first_row = 0
+        while first_row is not None:
+            records, first_row = self.read_chunk(first_row)
+            yield from records
+
+
+class FlightKeys:
+    """
+    A memory-mapped hash table from the (Client_ID, Airline_ID, Date/Time) key of each flight
+    to its Flight_ID, using open addressing with linear probing. Several flights may share a key.
+
+    The header records the inode and change counter of the flight file the keys match, so an
+    index that missed changes to the rows is noticed and rebuilt.
+    """
+
+    def __init__(self, path):
+        """
+        Open and map an existing key index.
+
+        Args:
+            path (str): The path of the key index.
+
+        Raises:
+            FileNotFoundError: If the file is missing.
+            ValueError: If the file is not a key index.
+        """
+        self.path = path
+        self._file = open(path, "r+b")
+        try:
+            self.inode = os.fstat(self._file.fileno()).st_ino
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            if KEYS_HEADER.unpack_from(self._map, 0)[0] != KEYS_MAGIC:
+                raise ValueError(f"{path} is not a flight key index.")
+        except Exception:
+            self.close()
+            raise
+        self.slots = KEYS_HEADER.unpack_from(self._map, 0)[3]
+
+    @classmethod
+    def create(cls, path, entries, count, flights_inode, flights_version):
+        """
+        Write a new key index, replacing any existing one.
+
+        Args:
+            path (str): The path of the key index.
+            entries (iterable): (key, Flight_ID) tuples to index.
+            count (int): The number of entries, to size the table.
+            flights_inode (int): The inode of the flight file the keys belong to.
+            flights_version (int): The change counter of the flight file the keys belong to.
+
+        Returns:
+            FlightKeys: The new index, opened.
+        """
+        slots = _MIN_SLOTS
+        # Filled to at most a third, so there is room to add keys before it grows again
+        while slots < 3 * (count + 1):
+            slots *= 2
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(KEYS_HEADER.pack(KEYS_MAGIC, flights_inode, flights_version, slots, 0, 0).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + slots * SLOT.size)
+        keys = cls(temp_path)
+        try:
+            for key, flight_id in entries:
+                keys.add(key, flight_id)
+            keys._map.flush()
+        finally:
+            keys.close()
+        os.replace(temp_path, path)
+        return cls(path)
+
+    def close(self):
+        """
+        Unmap and close the file.
+        """
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def current(self, flights_inode, flights_version):
+        """
+        Check whether the index is still the one on disk, and matches a flight file.
+
+        Args:
+            flights_inode (int): The inode of the flight file.
+            flights_version (int): The change counter of the flight file.
+
+        Returns:
+            bool: True if the keys match the rows of the flight file.
+        """
+        try:
+            if os.stat(self.path).st_ino != self.inode:
+                # Rebuilt by another process
+                return False
+        except FileNotFoundError:
+            return False
+        return KEYS_HEADER.unpack_from(self._map, 0)[1:3] == (flights_inode, flights_version)
+
+    def sync(self, flights_inode, flights_version):
+        """
+        Record that the keys match a version of the flight file, and flush them to disk.
+        """
+        _, _, _, slots, used, removed = KEYS_HEADER.unpack_from(self._map, 0)
+        KEYS_HEADER.pack_into(self._map, 0, KEYS_MAGIC, flights_inode, flights_version, slots, used, removed)
+        self._map.flush()
+
+    def _counts(self, used_change, removed_change):
+        """
+        Update the numbers of keys and removed keys in the header.
+        """
+        magic, inode, version, slots, used, removed = KEYS_HEADER.unpack_from(self._map, 0)
+        KEYS_HEADER.pack_into(self._map, 0, magic, inode, version, slots, used + used_change, removed + removed_change)
+
+    def _probe(self, key):
+        """
+        Yield the offsets of the slots to look at for a key, in probing order.
+        """
+        mask = self.slots - 1
+        slot = _hash(key) & mask
+        while True:
+            yield HEADER_SIZE + slot * SLOT.size
+            slot = (slot + 1) & mask
+
+    def find(self, key):
+        """
+        Find the flights with a key.
+
+        Args:
+            key (tuple): The (Client_ID, Airline_ID, minutes) key, as stored in a row.
+
+        Returns:
+            list: The Flight_IDs of the flights with the key.
+        """
+        found = []
+        for offset in self._probe(key):
+            entry = SLOT.unpack_from(self._map, offset)
+            if entry[3] == 0:
+                return found
+            if entry[3] != _REMOVED and entry[:3] == key:
+                found.append(entry[3])
+
+    def add(self, key, flight_id):
+        """
+        Add the key of a flight.
+
+        Args:
+            key (tuple): The (Client_ID, Airline_ID, minutes) key, as stored in a row.
+            flight_id (int): The ID of the flight.
+
+        Returns:
+            FlightKeys: The index holding the key: this one, or a larger one replacing it once it is full.
+        """
+        _, inode, version, slots, used, removed = KEYS_HEADER.unpack_from(self._map, 0)
+        if 3 * (used + removed + 1) > 2 * slots:
+            # Mostly full, or mostly removed keys: rewrite the live keys into a new table
+            entries = list(self._entries())
+            self.close()
+            keys = FlightKeys.create(self.path, entries + [(key, flight_id)], len(entries) + 1, inode, version)
+            return keys
+        for offset in self._probe(key):
+            slot_id = SLOT.unpack_from(self._map, offset)[3]
+            if slot_id == 0 or slot_id == _REMOVED:
+                SLOT.pack_into(self._map, offset, *key, flight_id)
+                self._counts(1, -1 if slot_id == _REMOVED else 0)
+                return self
+
+    def remove(self, key, flight_id):
+        """
+        Remove the key of a flight.
+
+        Args:
+            key (tuple): The (Client_ID, Airline_ID, minutes) key, as stored in a row.
+            flight_id (int): The ID of the flight.
+        """
+        for offset in self._probe(key):
+            entry = SLOT.unpack_from(self._map, offset)
+            if entry[3] == 0:
+                return
+            if entry[3] == flight_id and entry[:3] == key:
+                SLOT.pack_into(self._map, offset, 0, 0, 0, _REMOVED)
+                self._counts(-1, 1)
+                return
+
+    def _entries(self):
+        """
+        Yield every key in the index.
+
+        Yields:
+            tuple: A key and the Flight_ID holding it.
+        """
+        data = self._map[HEADER_SIZE:HEADER_SIZE + self.slots * SLOT.size]
+        for entry in SLOT.iter_unpack(data):
+            if entry[3] > 0:
+                yield entry[:3], entry[3]
+
+
+def _offset(flight_id):
+    """
+    Return the offset of the row of a flight in the file.
+
+    Args:
+        flight_id (int): The ID of the flight, at least 1.
+
+    Returns:
+        int: The byte offset of the row.
+    """
+    return HEADER_SIZE + (flight_id - 1) * ROW.size
+
+
+def _hash(key):
+    """
+    Hash a key of the key index the same way in every process and Python version.
+
+    Args:
+        key (tuple): The (Client_ID, Airline_ID, minutes) key.
+
+    Returns:
+        int: A 64-bit hash.
+    """
+    client_id, airline_id, minutes = key
+    value = (client_id * 0x9E3779B97F4A7C15 ^ airline_id * 0xC2B2AE3D27D4EB4F ^ minutes * 0x165667B19E3779F9) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 29)
+
+
+def _integer(record, field):
+    """
+    Return an integer field of a flight as stored in a row.
+
+    Raises:
+        ValueError: If the field holds something other than an integer.
+    """
+    value = record.get(field)
+    if value is None:
+        return MISSING
+    if type(value) is not int or value == MISSING:
+        raise ValueError(f"{field} must be an integer to be stored in the flight file.")
+    return value
+
+
+def _describe(record):
+    """
+    Name a flight in error messages: by its ID, or by its key fields if it has no ID yet.
+
+    Args:
+        record (dict): The flight record.
+
+    Returns:
+        str: The name of the flight, such as "Flight 7".
+    """
+    if record.get("Flight_ID") is not None:
+        return f"Flight {record['Flight_ID']}"
+    return f"The flight of client {record.get('Client_ID')} on airline {record.get('Airline_ID')} at {record.get('Date/Time')}"
+
+
+def _encode_fields(record, city_code):
+    """
+    Convert the fields of a flight other than its ID to row values.
+
+    Args:
+        record (dict): The flight record.
+        city_code (callable): A function returning the code of a city name.
+
+    Returns:
+        tuple: The Client_ID, Airline_ID, minutes, Start City and End City values of the row.
+
+    Raises:
+        ValueError: If the fields cannot be stored in a fixed-width row.
+    """
+    others = [field for field in record if field not in _FIELDS]
+    if others:
+        raise ValueError(f"{_describe(record)} has fields the flight file cannot store: {', '.join(others)}.")
+    minutes = MISSING
+    if record.get("Date/Time") is not None:
+        minutes = to_minutes(record["Date/Time"])
+        if minutes is None:
+            raise ValueError(f"{_describe(record)} has an invalid Date/Time.")
+    cities = []
+    for field in ("Start City", "End City"):
+        city = record.get(field)
+        if city is not None and not isinstance(city, str):
+            raise ValueError(f"{field} must be text to be stored in the flight file.")
+        cities.append(NO_CITY if city is None else city_code(city))
+    return (_integer(record, "Client_ID"), _integer(record, "Airline_ID"), minutes, cities[0], cities[1])
+
+
+def _encode(record, city_code):
+    """
+    Convert a flight record to row values.
+
+    Args:
+        record (dict): The flight record.
+        city_code (callable): A function returning the code of a city name.
+
+    Returns:
+        tuple: The row values, ready for ROW.pack().
+
+    Raises:
+        ValueError: If the record cannot be stored in a fixed-width row.
+    """
+    flight_id = record.get("Flight_ID")
+    if type(flight_id) is not int or flight_id < 1:
+        raise ValueError("Flight_ID must be a positive integer to be stored in the flight file.")
+    return (1, flight_id) + _encode_fields(record, city_code)
+
+
+def check_storable(record):
+    """
+    Check that a flight can be stored in a fixed-width row, without storing it.
+
+    Args:
+        record (dict): The flight record.
+
+    Raises:
+        ValueError: If the record cannot be stored in a fixed-width row.
+    """
+    _encode(record, lambda city: NO_CITY)
+
+
+def row_key(record):
+    """
+    Return the duplicate key of a flight, as the key index stores it.
+
+    Args:
+        record (dict): The flight record; its Flight_ID is not needed.
+
+    Returns:
+        tuple: The (Client_ID, Airline_ID, minutes) key, with MISSING for missing fields.
+
+    Raises:
+        ValueError: If the fields of the record cannot be stored in a fixed-width row.
+    """
+    return _encode_fields(record, lambda city: NO_CITY)[:3]
+
+
+class MappedFlightStorage:
+    """
+    A storage engine keeping the flight file in a memory-mapped, fixed-width file ("<data file>.bin"),
+    and every other data file in another engine.
+
+    The first time the flight file is opened, the flights are imported from the other engine,
+    such as the JSON file; the JSON file is left as it was and no longer written. Commits
+    write only the rows of the changed flights, and increase a change counter in the file
+    header, which serves as the signature the record cache uses to notice changes made by
+    other processes.
+    """
+
+    def __init__(self, engine):
+        """
+        Create the engine.
+
+        Args:
+            engine (JsonStorage | SqliteStorage): The engine storing the other data files,
+                and the flights until they are imported.
+        """
+        self.engine = engine
+        self._files = {}  # Data file path -> FlightFile
+        self._files_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Engine-specific methods, such as wait() or close(), are those of the other engine
+        return getattr(self.engine, name)
+
+    @staticmethod
+    def binary_path(path):
+        """
+        Return the path of the memory-mapped file belonging to the flight data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The path of the flight file.
+        """
+        return path + ".bin"
+
+    @staticmethod
+    def is_mapped(path):
+        """
+        Check whether a data file is kept in a memory-mapped flight file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            bool: True for the flight data file, False otherwise.
+        """
+        return record_type(path) is Flight
+
+    def flight_file(self, path):
+        """
+        Return the open flight file of a data file, importing the flights on first use.
+
+        A file replaced by another process, such as by a save of all flights, is opened again.
+
+        Args:
+            path (str): The path of the flight data file.
+
+        Returns:
+            FlightFile: The open flight file.
+        """
+        path = os.path.abspath(path)
+        binary_path = self.binary_path(path)
+        with self._files_lock:
+            current = self._files.get(path)
+            try:
+                inode = os.stat(binary_path).st_ino
+            except FileNotFoundError:
+                inode = None
+            if current is not None and current.inode == inode:
+                return current
+            if current is not None:
+                current.close()
+            if inode is None:
+                current = self._import(path)
+            else:
+                current = FlightFile(binary_path)
+            self._files[path] = current
+            return current
+
+    def _import(self, path):
+        """
+        Import the flights of a data file into a new flight file, unless another process did so meanwhile.
+
+        The import holds the exclusive lock of the flight file itself rather than of the data file,
+        since flight_file() is called by readers already holding the lock of the data file, which is
+        not reentrant.
+
+        Args:
+            path (str): The absolute path of the flight data file.
+
+        Returns:
+            FlightFile: The flight file, opened.
+        """
+        binary_path = self.binary_path(path)
+        with file_lock(binary_path).exclusive():
+            if os.path.exists(binary_path):
+                # Imported by another process while this one waited for the lock
+                return FlightFile(binary_path)
+            return FlightFile.create(binary_path, self.engine.iter_records(path))
+
+    def get(self, path, flight_id):
+        """
+        Read one flight from the flight file under the shared lock, without loading the others.
+
+        Args:
+            path (str): The path of the flight data file.
+            flight_id (int): The ID of the flight.
+
+        Returns:
+            dict: The flight record, or None if there is no flight with the ID.
+        """
+        with file_lock(path).shared():
+            return self.flight_file(path).get(flight_id)
+
+    def select(self, path, client_id=None, airline_id=None, start=None, end=None, start_city=None, end_city=None):
+        """
+        Find the flights matching all of the given conditions over the columns of the flight file,
+        decoding only the matching rows.
+
+        Args:
+            path (str): The path of the flight data file.
+            client_id (int, optional): The Client ID to match.
+            airline_id (int, optional): The Airline ID to match.
+            start (int, optional): The earliest Date/Time to match, in minutes since the epoch.
+            end (int, optional): The latest Date/Time to match, in minutes since the epoch.
+            start_city (str, optional): The Start City to match.
+            end_city (str, optional): The End City to match.
+
+        Returns:
+            list: The matching flight records, in Flight_ID order.
+        """
+        with file_lock(path).shared():
+            flights = self.flight_file(path)
+            positions = flights.columns().select(client_id, airline_id, start, end, start_city, end_city)
+            records = [flights.get(position + 1) for position in positions]
+        # Rows without a flight only match when there are no conditions
+        return [record for record in records if record is not None]
+
+    def count_by(self, path, field):
+        """
+        Count the flights for each value of a field over the columns of the flight file.
+
+        Args:
+            path (str): The path of the flight data file.
+            field (str): "Client_ID", "Airline_ID", "Start City" or "End City".
+
+        Returns:
+            dict: The number of flights for each value.
+
+        Raises:
+            ValueError: If the field cannot be counted.
+        """
+        with file_lock(path).shared():
+            return self.flight_file(path).columns().count_by(field)
+
+    def highest_id(self, path):
+        """
+        Return the highest Flight_ID ever stored in the flight file, without loading the flights.
+
+        Args:
+            path (str): The path of the flight data file.
+
+        Returns:
+            int: The highest Flight_ID, or 0 if no flight was stored.
+        """
+        with file_lock(path).shared():
+            return self.flight_file(path).highest
+
+    def signature(self, path):
+        if not self.is_mapped(path):
+            return self.engine.signature(path)
+        flights = self.flight_file(path)
+        return (flights.inode, flights.version)
+
+    def read(self, path):
+        if not self.is_mapped(path):
+            return self.engine.read(path)
+        return list(self.flight_file(path))
+
+    def iter_records(self, path):
+        if not self.is_mapped(path):
+            yield from self.engine.iter_records(path)
+            return
+        first_row = 0
+        while first_row is not None:
+            # The lock is only held while a chunk is decoded, so long scans do not hold up commits
+            with file_lock(path).shared():
+                records, first_row = self.flight_file(path).read_chunk(first_row)
+            yield from records
+
+    def write(self, path, records):
+        """
+        Replace all records of a data file.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): A list of dictionaries representing the records to save.
+
+        Raises:
+            ValueError: If a flight cannot be stored in a fixed-width row.
+        """
+        if not self.is_mapped(path):
+            self.engine.write(path, records)
+            return
+        version = self.flight_file(path).version
+        flights = FlightFile.create(self.binary_path(path), records)
+        # Keep counting from the replaced file, so the signature always changes
+        flights._set_header(version + 1, len(flights), flights.highest)
+        flights.close()
+
+    def commit(self, entry, lock):
+        """
+        Write the rows of the flights changed in a cache entry, leaving every other row untouched.
+
+        Every changed flight is encoded before any row is written, so a flight that cannot be
+        stored leaves the file as it was.
+
+        Args:
+            entry (CachedFile): The cache entry holding the records and their pending changes.
+            lock (threading.RLock): The lock guarding the cache entry.
+
+        Raises:
+            ValueError: If a flight cannot be stored in a fixed-width row.
+        """
+        if not self.is_mapped(entry.path):
+            self.engine.commit(entry, lock)
+            return
+        flights = self.flight_file(entry.path)
+        writes = []  # (Flight_ID whose row is emptied or None, row to write or None) for each change
+        highest = 0
+        for change in entry.changes:
+            removed = row = None
+            if change["op"] in ("update", "delete"):
+                old = change["before"] if change["op"] == "update" else change["record"]
+                if change["op"] == "delete" or old.get("Flight_ID") != change["record"].get("Flight_ID"):
+                    removed = old.get("Flight_ID")
+            if change["op"] in ("insert", "update"):
+                row = flights.encode(change["record"], highest)
+                highest = max(highest, row[1])
+            writes.append((removed, row))
+        try:
+            for removed, row in writes:
+                if removed is not None:
+                    flights.remove(removed)
+                if row is not None:
+                    flights.put_row(row)
+        finally:
+            if flights.changed:
+                flights.bump()
@@ -0,0 +1,650 @@
+"""
+This module provides in-memory indexes over cached records in the Record Management System.
+
+Indexes are attached to a cached data file and are kept up to date by the cache whenever
+records are inserted, updated or deleted. They are rebuilt from scratch when the data file
+is changed by another program.
+
+Classes:
+    Index: The base class describing the hooks every index implements.
+    PrimaryIndex: A hash index mapping a record's unique ID to the record and its position.
+    UniqueIndex: A hash index mapping a derived key to the records holding it.
+    MultiIndex: A hash index mapping a derived key to the many records sharing it.
+    SortedIndex: An ordered index answering range queries over a derived key.
+    PrefixIndex: An ordered index over the terms of a text field, answering prefix queries.
+    InvertedIndex: A full-text index mapping each token to the records containing it, answering ranked AND queries.
+    TrigramIndex: A fuzzy index mapping each trigram of a text field to the records containing it.
+
+Functions:
+    trigrams: Split text into the three-letter sequences compared by fuzzy searches.
+"""
+
+import heapq  # Importing heapq to pick the best ranked search results
+import math  # Importing math to weight rare search terms above common ones
+import re  # Importing re to split text into words for trigrams
+from bisect import bisect_left, bisect_right  # Importing bisect to search the sorted index
+from collections import Counter  # Importing Counter to count the terms of a record
+
+
+class Index:
+    """
+    The base class for indexes over a list of records.
+
+    Subclasses override add() and remove() to keep their lookup structures up to date.
+    """
+
+    def build(self, records):
+        """
+        Fill the index from a list of records.
+
+        Args:
+            records (list): The records to index, in file order.
+
+        Returns:
+            Index: The index itself, so it can be built and returned in one call.
+        """
+        for position, record in enumerate(records):
+            self.add(record, position)
+        return self
+
+    def add(self, record, position):
+        """
+        Add a record stored at the given position to the index.
+
+        Args:
+            record (dict): The record to add.
+            position (int): The position of the record in the list of records.
+        """
+
+    def remove(self, record, position):
+        """
+        Remove a record stored at the given position from the index.
+
+        Args:
+            record (dict): The record to remove.
+            position (int): The position of the record in the list of records.
+        """
+
+    def compact(self, records, position):
+        """
+        Account for a record that was dropped from the list, moving later records down by one.
+
+        Indexes holding positions renumber every later record, so this takes time proportional
+        to the number of records after the dropped one.
+
+        Args:
+            records (list): The list of records after the record was dropped.
+            position (int): The position the record was dropped from.
+        """
+
+    def compact_many(self, records, positions):
+        """
+        Account for several records that were dropped from the list at once.
+
+        Args:
+            records (list): The list of records after the records were dropped.
+            positions (list): The positions the records were dropped from, in the list before the drop.
+        """
+
+
+class PrimaryIndex(Index):
+    """
+    A hash index mapping the unique ID of each record to the record and to its position.
+
+    Looking a record up by its ID takes constant time. Positions follow the order of the
+    records in the file, so deleting a record renumbers the positions of the records after it.
+
+    If the same ID occurs more than once, the first occurrence is indexed, which matches
+    what a linear search through the records would find.
+    """
+
+    def __init__(self, key):
+        """
+        Create an empty primary index.
+
+        Args:
+            key (str): The name of the ID field, such as "ID" or "Flight_ID".
+        """
+        self.key = key
+        self.records = {}  # ID -> record
+        self.positions = {}  # ID -> position in the list of records
+        self.duplicates = False  # True once an ID has been seen twice
+        self.highest = 0  # Highest integer ID ever indexed; not lowered when records are removed
+
+    def get(self, record_id):
+        """
+        Look up a record by its ID.
+
+        Args:
+            record_id (int): The ID to look up.
+
+        Returns:
+            dict: The record if found, otherwise None.
+        """
+        return self.records.get(record_id)
+
+    def position(self, record_id):
+        """
+        Look up the position of a record by its ID.
+
+        Args:
+            record_id (int): The ID to look up.
+
+        Returns:
+            int: The position of the record if found, otherwise None.
+        """
+        return self.positions.get(record_id)
+
+    def __contains__(self, record_id):
+        return record_id in self.positions
+
+    def add(self, record, position):
+        record_id = record.get(self.key)
+        if record_id is None:
+            return
+        if isinstance(record_id, int) and record_id > self.highest:
+            self.highest = record_id
+        if record_id in self.positions:
+            # Keep the first occurrence, as a linear search would
+            self.duplicates = True
+            if self.positions[record_id] < position:
+                return
+        self.records[record_id] = record
+        self.positions[record_id] = position
+
+    def remove(self, record, position):
+        record_id = record.get(self.key)
+        if self.positions.get(record_id) == position:
+            del self.records[record_id]
+            del self.positions[record_id]
+
+    def compact(self, records, position):
+        if self.duplicates:
+            # A later duplicate may now be the first occurrence, so index everything again
+            self.records.clear()
+            self.positions.clear()
+            self.duplicates = False
+            self.build(records)
+            return
+        # Only the records after the dropped one have moved
+        for new_position in range(position, len(records)):
+            record_id = records[new_position].get(self.key)
+            if record_id is not None:
+                self.positions[record_id] = new_position
+
+    def compact_many(self, records, positions):
+        # Only the records after the first dropped one have moved
+        self.compact(records, min(positions))
+
+
+class UniqueIndex(Index):
+    """
+    A hash index mapping a derived key, such as a normalized phone number, to the records holding it.
+
+    The index is meant for values that should be unique, so each key usually maps to one record.
+    Records that already share a key in the data file are all kept, so none of them is lost on removal.
+    """
+
+    def __init__(self, key_func):
+        """
+        Create an empty unique index.
+
+        Args:
+            key_func (callable): A function returning the index key of a record, or None to skip it.
+        """
+        self.key_func = key_func
+        self.records = {}  # Key -> list of records holding that key
+
+    def get(self, key):
+        """
+        Look up the records holding a key.
+
+        Args:
+            key: The key to look up, already normalized by the caller.
+
+        Returns:
+            list: The records holding the key, or an empty list.
+        """
+        return self.records.get(key, [])
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def add(self, record, position):
+        key = self.key_func(record)
+        if key is not None:
+            self.records.setdefault(key, []).append(record)
+
+    def remove(self, record, position):
+        key = self.key_func(record)
+        holders = self.records.get(key)
+        if not holders:
+            return
+        # Remove this exact record, leaving other holders of the key in place
+        for i, holder in enumerate(holders):
+            if holder is record:
+                del holders[i]
+                break
+        if not holders:
+            del self.records[key]
+
+
+class MultiIndex(Index):
+    """
+    A hash index mapping a derived key, such as a flight's Client_ID, to the many records sharing it.
+
+    Unlike UniqueIndex, each key is expected to hold many records, so the records of a key are
+    kept in a dictionary keyed by record identity and can be added and removed in constant time.
+    """
+
+    def __init__(self, key_func):
+        """
+        Create an empty multi-value index.
+
+        Args:
+            key_func (callable): A function returning the index key of a record, or None to skip it.
+        """
+        self.key_func = key_func
+        self.records = {}  # Key -> {id(record): record}, in the order the records were added
+
+    def get(self, key):
+        """
+        Look up the records holding a key.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            list: The records holding the key, in the order they were added, or an empty list.
+        """
+        holders = self.records.get(key)
+        return list(holders.values()) if holders else []
+
+    def count(self, key):
+        """
+        Count the records holding a key.
+
+        Args:
+            key: The key to count.
+
+        Returns:
+            int: The number of records holding the key.
+        """
+        return len(self.records.get(key, ()))
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def add(self, record, position):
+        key = self.key_func(record)
+        if key is not None:
+            self.records.setdefault(key, {})[id(record)] = record
+
+    def remove(self, record, position):
+        key = self.key_func(record)
+        holders = self.records.get(key)
+        if holders is None:
+            return
+        holders.pop(id(record), None)
+        if not holders:
+            del self.records[key]
+
+
+class SortedIndex(Index):
+    """
+    An ordered index over a derived key, such as a flight's departure time, answering range queries.
+
+    Keys are kept in a sorted list searched with bisect, so a range query takes O(log n + k)
+    for k results. Records with equal keys stay in the order they were added.
+    """
+
+    def __init__(self, key_func):
+        """
+        Create an empty sorted index.
+
+        Args:
+            key_func (callable): A function returning the sort key of a record, or None to skip it.
+        """
+        self.key_func = key_func
+        self.keys = []  # Sorted keys
+        self.records = []  # The record of each key, in the same order
+
+    def build(self, records):
+        # Sort once, rather than inserting every record into the sorted lists
+        pairs = [(key, record) for record in records for key in (self.key_func(record),) if key is not None]
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.records = [record for _, record in pairs]
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def range(self, low=None, high=None, limit=None):
+        """
+        Find the records whose key lies between two bounds.
+
+        Args:
+            low (optional): The smallest key to include; unbounded if omitted.
+            high (optional): The largest key to include; unbounded if omitted.
+            limit (int, optional): The largest number of records to return.
+
+        Returns:
+            list: The matching records, in key order.
+        """
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.records[start:end]
+
+    def add(self, record, position):
+        key = self.key_func(record)
+        if key is not None:
+            self._insert(key, record)
+
+    def remove(self, record, position):
+        key = self.key_func(record)
+        if key is not None:
+            self._discard(key, record)
+
+    def _insert(self, key, record):
+        """
+        Insert a record under a key, after the records already holding an equal key.
+
+        Args:
+            key: The sort key.
+            record (dict): The record.
+        """
+        at = bisect_right(self.keys, key)
+        self.keys.insert(at, key)
+        self.records.insert(at, record)
+
+    def _discard(self, key, record):
+        """
+        Remove a record from under a key, leaving other records with an equal key in place.
+
+        Args:
+            key: The sort key.
+            record (dict): The record.
+        """
+        # Find this exact record among the records sharing its key
+        for at in range(bisect_left(self.keys, key), bisect_right(self.keys, key)):
+            if self.records[at] is record:
+                del self.keys[at]
+                del self.records[at]
+                return
+
+
+class PrefixIndex(SortedIndex):
+    """
+    A sorted index over the terms of a text field, such as the words of a client name, answering prefix queries.
+
+    Each record is indexed under several terms, so a query can match the start of any of them.
+    A prefix query finds the first matching term with bisect and reads on while terms still
+    start with the prefix, so it takes O(log n + k) however many records are indexed.
+    """
+
+    def __init__(self, terms_func):
+        """
+        Create an empty prefix index.
+
+        Args:
+            terms_func (callable): A function returning the normalized terms of a record, possibly none.
+        """
+        super().__init__(None)
+        self.terms_func = terms_func
+
+    def build(self, records):
+        pairs = [(term, record) for record in records for term in self.terms_func(record)]
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [term for term, _ in pairs]
+        self.records = [record for _, record in pairs]
+        return self
+
+    def add(self, record, position):
+        for term in self.terms_func(record):
+            self._insert(term, record)
+
+    def remove(self, record, position):
+        for term in self.terms_func(record):
+            self._discard(term, record)
+
+    def prefix(self, prefix, limit=None):
+        """
+        Find the records with a term starting with a prefix.
+
+        Args:
+            prefix (str): The normalized prefix.
+            limit (int, optional): The largest number of records to return.
+
+        Returns:
+            list: The matching records in term order, each listed once.
+        """
+        matches = []
+        seen = set()
+        for at in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[at].startswith(prefix):
+                break
+            record = self.records[at]
+            if id(record) not in seen:
+                seen.add(id(record))
+                matches.append(record)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+
+class InvertedIndex(Index):
+    """
+    A full-text index mapping each token, such as a word of an address, to the records containing it.
+
+    A query lists the records containing every one of its tokens, ranked by tf-idf: tokens that
+    occur in few records weigh more, and so do tokens a record contains several times. The
+    records of each token are grouped by how often they contain it, so a query walks the records
+    of its rarest token best first, looks each one up in the other tokens' groups, and stops as
+    soon as no remaining record can enter the top results. Queries for common words therefore
+    stop after a few matches instead of scoring every record.
+    """
+
+    def __init__(self, tokens_func):
+        """
+        Create an empty inverted index.
+
+        Args:
+            tokens_func (callable): A function returning the tokens of a record, repeats included.
+        """
+        self.tokens_func = tokens_func
+        self.postings = {}  # Token -> {times a record contains it: {id(record): record}}
+        self.size = 0  # Number of records with at least one token
+
+    def add(self, record, position):
+        counts = Counter(self.tokens_func(record))
+        if not counts:
+            return
+        self.size += 1
+        for token, count in counts.items():
+            self.postings.setdefault(token, {}).setdefault(count, {})[id(record)] = record
+
+    def remove(self, record, position):
+        counts = Counter(self.tokens_func(record))
+        if not counts:
+            return
+        self.size -= 1
+        for token, count in counts.items():
+            groups = self.postings.get(token)
+            if groups is None or count not in groups:
+                continue
+            groups[count].pop(id(record), None)
+            if not groups[count]:
+                del groups[count]
+                if not groups:
+                    del self.postings[token]
+
+    def frequency(self, token):
+        """
+        Count the records containing a token.
+
+        Args:
+            token (str): The normalized token.
+
+        Returns:
+            int: The number of records containing the token.
+        """
+        return sum(map(len, self.postings.get(token, {}).values()))
+
+    def search(self, tokens, limit=None):
+        """
+        Find the records containing all of the given tokens, best matches first.
+
+        Args:
+            tokens (iterable): The normalized tokens of the query.
+            limit (int, optional): The largest number of records to return.
+
+        Returns:
+            list: The matching records, ranked by score; records with equal scores stay in index order.
+        """
+        terms = []  # (groups, weight) of each query token
+        for token in set(tokens):
+            if token not in self.postings:
+                # No record contains this token, so no record contains them all
+                return []
+            frequency = self.frequency(token)
+            terms.append((frequency, self.postings[token], math.log(1 + self.size / frequency)))
+        if not terms:
+            return []
+        terms.sort(key=lambda term: term[0])
+        _, first, first_weight = terms[0]
+        others = [(groups, weight) for _, groups, weight in terms[1:]]
+        # The most the other tokens can add to the score of any record
+        others_best = sum(weight * max(groups) for groups, weight in others)
+
+        best = []  # Min-heap of (score, -order, record); the root is the first to be pushed out
+        order = 0
+        for count in sorted(first, reverse=True):
+            bound = first_weight * count + others_best
+            if limit is not None and len(best) >= limit and best[0][0] >= bound:
+                # No remaining record can score above the current top results
+                break
+            for key, record in first[count].items():
+                score = first_weight * count
+                for groups, weight in others:
+                    for other_count, group in groups.items():
+                        if key in group:
+                            score += weight * other_count
+                            break
+                    else:
+                        score = None
+                        break
+                if score is None:
+                    continue
+                order += 1
+                if limit is None or len(best) < limit:
+                    heapq.heappush(best, (score, -order, record))
+                elif (score, -order) > best[0][:2]:
+                    heapq.heapreplace(best, (score, -order, record))
+                if limit is not None and len(best) >= limit and best[0][0] >= bound:
+                    break
+        return [record for _, _, record in sorted(best, key=lambda match: match[:2], reverse=True)]
+
+
+# Words, as split for trigrams
+_WORDS = re.compile(r"\w+")
+
+
+def trigrams(text):
+    """
+    Split text into the three-letter sequences compared by fuzzy searches.
+
+    Each case-folded word is padded with two spaces in front and one behind, so the start
+    of a word weighs more than its middle, as in PostgreSQL's pg_trgm.
+
+    Args:
+        text (str): The text to split, such as a company name.
+
+    Returns:
+        set: The trigrams of the text, or an empty set if it has no words.
+    """
+    grams = set()
+    if not isinstance(text, str):
+        return grams
+    for word in _WORDS.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex(Index):
+    """
+    A fuzzy index mapping each trigram of a text field, such as a company name, to the records containing it.
+
+    A search only considers the records sharing at least one trigram with the query, counts
+    the shared trigrams of each with Counter, and scores them by their Jaccard similarity,
+    so misspelled names are found without comparing the query with every name.
+    """
+
+    def __init__(self, text_func):
+        """
+        Create an empty trigram index.
+
+        Args:
+            text_func (callable): A function returning the text of a record, or None to skip it.
+        """
+        self.text_func = text_func
+        self.postings = {}  # Trigram -> {id(record): record}
+        self.sizes = {}  # id(record) -> number of trigrams of the record
+        self.records = {}  # id(record) -> record
+
+    def add(self, record, position):
+        grams = trigrams(self.text_func(record))
+        if not grams:
+            return
+        key = id(record)
+        self.sizes[key] = len(grams)
+        self.records[key] = record
+        for gram in grams:
+            self.postings.setdefault(gram, {})[key] = record
+
+    def remove(self, record, position):
+        key = id(record)
+        if self.sizes.pop(key, None) is None:
+            return
+        del self.records[key]
+        for gram in trigrams(self.text_func(record)):
+            holders = self.postings.get(gram)
+            if holders is None:
+                continue
+            holders.pop(key, None)
+            if not holders:
+                del self.postings[gram]
+
+    def search(self, text, threshold, limit=None):
+        """
+        Find the records whose text is similar to the given text, most similar first.
+
+        Args:
+            text (str): The text to look for.
+            threshold (float): The smallest similarity to return, between 0 and 1.
+            limit (int, optional): The largest number of records to return.
+
+        Returns:
+            list: (similarity, record) tuples, most similar first; equal similarities stay in index order.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            holders = self.postings.get(gram)
+            if holders:
+                shared.update(holders.keys())
+        matches = []
+        for key, count in shared.items():
+            similarity = count / (len(grams) + self.sizes[key] - count)
+            if similarity >= threshold:
+                matches.append((similarity, self.records[key]))
+        if limit is None:
+            matches.sort(key=lambda match: match[0], reverse=True)
+        else:
+            matches = heapq.nlargest(limit, matches, key=lambda match: match[0])
+        return matches
@@ -0,0 +1,163 @@
+"""
+This module provides the locks that keep data files consistent when several threads
+and processes share them in the Record Management System.
+
+Each data file has a lock file next to it ("<data file>.lock"). Reading a data file takes
+a shared lock, so any number of readers run in parallel, and writing it takes an exclusive
+lock, so a reader never sees a half-written file and two writers never interleave. The lock
+file is separate from the data file because data files are replaced on write, and a lock on
+a replaced file would no longer guard anything.
+
+Within a process, the same shared/exclusive rules are applied by a reader/writer lock, so
+threads do not queue on the operating system lock and are still guarded where fcntl is
+not available.
+
+Classes:
+    ReadWriteLock: A reader/writer lock for the threads of one process.
+    FileLock: A shared/exclusive lock on a data file, for both threads and processes.
+
+Functions:
+    file_lock: Return the lock of a data file.
+"""
+
+import os  # Importing os to open lock files at a low level
+import threading  # Importing threading for the in-process reader/writer lock
+from contextlib import contextmanager  # Importing contextmanager to use the locks in with statements
+
+try:
+    import fcntl  # Importing fcntl to lock data files between processes
+except ImportError:
+    # Not available on Windows; the locks then only guard against other threads
+    fcntl = None
+
+
+class ReadWriteLock:
+    """
+    A reader/writer lock for the threads of one process.
+
+    Any number of threads may read at once, while a writer runs alone. A waiting writer
+    stops new readers from starting, so a steady stream of readers cannot starve writers.
+    The lock is not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0  # Number of threads reading
+        self._writer = False  # Whether a thread is writing
+        self._waiting_writers = 0  # Number of threads waiting to write
+
+    @contextmanager
+    def reading(self):
+        """
+        Hold the lock for reading, alongside other readers.
+        """
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Hold the lock for writing, without any readers or other writers.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class FileLock:
+    """
+    A shared/exclusive lock on a data file, guarding it against other threads and processes.
+    """
+
+    def __init__(self, path):
+        """
+        Create the lock of a data file. The lock file is created on first use.
+
+        Args:
+            path (str): The path of the data file.
+        """
+        self.path = path + ".lock"
+        self._threads = ReadWriteLock()
+
+    @contextmanager
+    def shared(self):
+        """
+        Hold the lock for reading the data file, alongside other readers.
+        """
+        with self._threads.reading(), self._flock(fcntl.LOCK_SH if fcntl else None):
+            yield
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the lock for writing the data file, without any readers or other writers.
+        """
+        with self._threads.writing(), self._flock(fcntl.LOCK_EX if fcntl else None):
+            yield
+
+    @contextmanager
+    def _flock(self, operation):
+        """
+        Hold an operating system lock on the lock file.
+
+        Args:
+            operation (int): fcntl.LOCK_SH or fcntl.LOCK_EX, or None if fcntl is not available.
+        """
+        if operation is None:
+            yield
+            return
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            # The data directory does not exist yet, so there is no data file to guard
+            yield
+            return
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            # Closing the file also releases the lock
+            os.close(fd)
+
+
+# Locks handed out so far: absolute data file path -> FileLock
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path):
+    """
+    Return the lock of a data file, the same one for every thread of the process.
+
+    Args:
+        path (str): The path of the data file.
+
+    Returns:
+        FileLock: The lock of the file.
+    """
+    key = os.path.abspath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = FileLock(key)
+        return lock
@@ -0,0 +1,233 @@
+"""
+This module provides compact record types for the cached records of the Record Management System.
+
+Each record type stores its standard fields in __slots__ instead of a per-record dictionary,
+which cuts the memory used by large cached files and makes attribute access cheap. The types
+also behave like read/write mappings keyed by the original field names ("Phone Number",
+"Date/Time", ...), so indexes, storage engines and the record classes can use them in place
+of dictionaries. Fields that are not standard for a type are kept in a small dictionary of
+extra fields, so no data is lost.
+
+Records are converted to plain dictionaries only where they leave the record package,
+such as when they are returned to the GUI or written to a JSON file.
+
+Classes:
+    Record: The base class implementing the mapping behaviour on top of __slots__.
+    Client: A client record.
+    Airline: An airline record.
+    Flight: A flight record.
+
+Functions:
+    record_type: Find the record type used for the records of a data file.
+"""
+
+import os  # Importing os to work with file paths
+
+
+class Record:
+    """
+    The base class for compact records stored in __slots__.
+
+    Subclasses list their standard fields in FIELDS as (field name, attribute name) tuples,
+    in the order the fields are written to the data files, and name the field identifying
+    a record in KEY.
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS = ()
+    KEY = "ID"
+    _ATTRIBUTES = {}  # Field name -> attribute name, filled in for each subclass
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRIBUTES = dict(cls.FIELDS)
+
+    def __init__(self):
+        self._extra = None  # Fields that are not standard for the record type, or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a record from a dictionary.
+
+        Args:
+            data (dict): The record fields.
+
+        Returns:
+            Record: The new record, holding copies of the field references.
+        """
+        record = cls()
+        attributes = cls._ATTRIBUTES
+        for field, value in data.items():
+            attribute = attributes.get(field)
+            if attribute is None:
+                if record._extra is None:
+                    record._extra = {}
+                record._extra[field] = value
+            else:
+                setattr(record, attribute, value)
+        return record
+
+    def to_dict(self):
+        """
+        Convert the record to a dictionary.
+
+        Returns:
+            dict: The fields of the record, standard fields first.
+        """
+        return dict(self.items())
+
+    def keys(self):
+        for field, attribute in self.FIELDS:
+            if hasattr(self, attribute):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def items(self):
+        for field, attribute in self.FIELDS:
+            try:
+                yield field, getattr(self, attribute)
+            except AttributeError:
+                # The field is missing from this record
+                pass
+        if self._extra:
+            yield from self._extra.items()
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self):
+        return sum(1 for _ in self.keys())
+
+    def __contains__(self, field):
+        attribute = self._ATTRIBUTES.get(field)
+        if attribute is None:
+            return self._extra is not None and field in self._extra
+        return hasattr(self, attribute)
+
+    def __getitem__(self, field):
+        attribute = self._ATTRIBUTES.get(field)
+        try:
+            if attribute is None:
+                return self._extra[field]
+            return getattr(self, attribute)
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(field) from None
+
+    def __setitem__(self, field, value):
+        attribute = self._ATTRIBUTES.get(field)
+        if attribute is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[field] = value
+        else:
+            setattr(self, attribute, value)
+
+    def get(self, field, default=None):
+        """
+        Return the value of a field, or a default if the record does not have it.
+
+        Args:
+            field (str): The field name, such as "ID" or "Phone Number".
+            default: The value returned if the field is missing.
+
+        Returns:
+            The value of the field, or the default.
+        """
+        attribute = self._ATTRIBUTES.get(field)
+        if attribute is None:
+            return default if self._extra is None else self._extra.get(field, default)
+        return getattr(self, attribute, default)
+
+    def update(self, data):
+        """
+        Set several fields at once.
+
+        Args:
+            data (dict): The fields to set.
+        """
+        for field, value in data.items():
+            self[field] = value
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # Records are mutable, like the dictionaries they replace
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Client(Record):
+    """
+    A client record.
+    """
+
+    FIELDS = (
+        ("ID", "id"),
+        ("Type", "type"),
+        ("Name", "name"),
+        ("Address Line 1", "address_line_1"),
+        ("Address Line 2", "address_line_2"),
+        ("Address Line 3", "address_line_3"),
+        ("City", "city"),
+        ("State", "state"),
+        ("Zip Code", "zip_code"),
+        ("Country", "country"),
+        ("Phone Number", "phone_number"),
+    )
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+class Airline(Record):
+    """
+    An airline record.
+    """
+
+    FIELDS = (
+        ("ID", "id"),
+        ("Type", "type"),
+        ("Company Name", "company_name"),
+    )
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+class Flight(Record):
+    """
+    A flight record.
+    """
+
+    FIELDS = (
+        ("Flight_ID", "flight_id"),
+        ("Client_ID", "client_id"),
+        ("Airline_ID", "airline_id"),
+        ("Date/Time", "date_time"),
+        ("Start City", "start_city"),
+        ("End City", "end_city"),
+    )
+    KEY = "Flight_ID"
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+# Record type of each data file, keyed by the data file name
+RECORD_TYPES = {
+    "clients.json": Client,
+    "airlines.json": Airline,
+    "flights.json": Flight,
+}
+
+
+def record_type(path):
+    """
+    Find the record type used for the records of a data file.
+
+    Args:
+        path (str): The path of the data file.
+
+    Returns:
+        type: The Record subclass for the file, or None if its records are kept as dictionaries.
+    """
+    return RECORD_TYPES.get(os.path.basename(path))
@@ -0,0 +1,91 @@
+"""
+This module provides the shared logic behind the paged queries of the record classes.
+
+A page holds a slice of the records in file order, or sorted by one field. Sorted pages are
+served from a sorted index per field, built on first use and kept up to date by the cache,
+so fetching any page of a large file only copies the records on that page.
+
+Classes:
+    Page: One page of records, together with the total number of records.
+
+Functions:
+    sort_key: The key records are sorted by on a field.
+    fetch_page: Fetch a page of records from a cache entry.
+"""
+
+from record.index import SortedIndex  # Import the sorted index used for sorted pages
+
+
+class Page:
+    """
+    One page of records.
+
+    Attributes:
+        offset (int): The position of the first record of the page, in the requested order.
+        total (int): The number of records in the data file.
+        records (list): Copies of the records on the page, as dictionaries.
+    """
+
+    def __init__(self, offset, total, records):
+        self.offset = offset
+        self.total = total
+        self.records = records
+
+    def __repr__(self):
+        return f"Page(offset={self.offset!r}, total={self.total!r}, records={len(self.records)})"
+
+
+def sort_key(value):
+    """
+    The key records are sorted by on a field.
+
+    Numbers sort before text, text sorts without regard to case, and records missing
+    the field sort last, so records with mixed or missing values can still be ordered.
+
+    Args:
+        value: The value of the field, or None if the record does not have it.
+
+    Returns:
+        tuple: A key that can be compared with the key of any other value.
+    """
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value).casefold())
+
+
+def fetch_page(entry, offset, limit, sort_by=None, descending=False):
+    """
+    Fetch a page of records from a cache entry.
+
+    Args:
+        entry (CachedFile): The cache entry of the data file.
+        offset (int): The number of records to skip, in the requested order.
+        limit (int): The largest number of records on the page.
+        sort_by (str, optional): The field to sort by; file order if omitted.
+        descending (bool): Whether to sort from the largest value down.
+
+    Returns:
+        Page: The records on the page and the total number of records.
+
+    Raises:
+        ValueError: If the offset or limit is negative, or the record type has no such field.
+    """
+    if offset < 0 or limit < 0:
+        raise ValueError("The offset and limit of a page cannot be negative.")
+    total = len(entry.records)
+    if sort_by is None:
+        records = entry.records
+    else:
+        if entry.record_type is not None and sort_by not in (field for field, _ in entry.record_type.FIELDS):
+            raise ValueError(f"Records cannot be sorted by {sort_by}.")
+        records = entry.index(
+            f"Sorted {sort_by}", lambda: SortedIndex(lambda record: sort_key(record.get(sort_by)))
+        ).records
+    if descending:
+        end = max(total - offset, 0)
+        page = records[max(end - limit, 0):end][::-1]
+    else:
+        page = records[offset:offset + limit]
+    return Page(offset, total, [dict(record) for record in page])
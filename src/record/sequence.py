@@ -0,0 +1,88 @@
+"""
+This module provides a persisted ID sequence for the Record Management System.
+
+Each record type hands out new IDs from its own sequence file in the data directory. The file
+holds the first ID no process has leased yet. A process leases a block of IDs at a time
+(the hi/lo pattern) under an exclusive file lock, then hands out IDs from its block in memory,
+so allocating an ID takes constant time and processes only contend once per block. Leased
+IDs are never leased again, so IDs stay unique across processes and restarts; IDs left
+unused in a block when a process exits are skipped.
+
+Classes:
+    IdSequence: Hands out unique IDs from blocks leased from a sequence file.
+"""
+
+import os  # Importing os to open the sequence file at a low level
+import threading  # Importing threading to hand out IDs safely within a process
+from conf.config import ID_BLOCK_SIZE  # Import the number of IDs leased at a time
+
+try:
+    import fcntl  # Importing fcntl to lock the sequence file between processes
+except ImportError:
+    # Not available on Windows; the sequence then only guards against other threads
+    fcntl = None
+
+
+class IdSequence:
+    """
+    Hands out unique, increasing IDs from blocks leased from a sequence file.
+    """
+
+    def __init__(self, path, block_size=ID_BLOCK_SIZE):
+        """
+        Create a sequence backed by a file. The file is created on the first lease.
+
+        Args:
+            path (str): The path of the sequence file.
+            block_size (int): The number of IDs leased at a time.
+        """
+        self.path = path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0  # Next ID to hand out from the current block
+        self._end = 0  # End of the current block (exclusive)
+
+    def allocate(self, floor=1):
+        """
+        Hand out a new ID.
+
+        Args:
+            floor (int): The smallest acceptable ID, such as one more than the highest stored ID.
+                IDs below it are skipped, so records written by other means are never reused.
+
+        Returns:
+            int: An ID no other call, thread or process has been given.
+        """
+        with self._lock:
+            record_id = max(self._next, floor)
+            if record_id >= self._end:
+                record_id = self._lease(floor)
+            self._next = record_id + 1
+            return record_id
+
+    def _lease(self, floor):
+        """
+        Lease a new block of IDs from the sequence file.
+
+        Args:
+            floor (int): The smallest acceptable ID.
+
+        Returns:
+            int: The first ID of the new block.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            content = os.read(fd, 64).decode("ascii").strip()
+            start = max(int(content) if content.isdigit() else 1, floor)
+            self._end = start + self.block_size
+            # Record the end of the block, so no other process leases it
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(self._end).encode("ascii"))
+            os.fsync(fd)
+        finally:
+            # Closing the file also releases the lock
+            os.close(fd)
+        return start
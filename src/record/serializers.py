@@ -0,0 +1,114 @@
+"""
+This module provides the serializers that turn lists of records into bytes and back
+for the Record Management System.
+
+JSON is the interchange format: the data files stay pretty-printed JSON that people and
+other programs can read and edit, and export files are JSON too. Parsing a large JSON
+file is slow, though, so the storage engines also keep a binary snapshot of each data
+file ("<data file>.snap") in the binary format below, and load it at startup
+when it was written from the current JSON file.
+
+There is no JSON snapshot format: it would write a second JSON copy on every save and
+parse it at startup with the same parser as the data file, so it would load no faster.
+
+There is deliberately no pickle format: the data folder may be shared between workstations,
+and loading a pickle runs whatever code it names, so anyone able to write a snapshot there
+could run code on every workstation. Marshal only decodes plain values.
+
+Serializers offer a small interface, selected through SNAPSHOT_FORMAT in conf/config.py:
+
+    serializer = get_serializer("marshal")
+    data = serializer.dumps(records)
+    records = serializer.loads(data)
+
+Classes:
+    MarshalSerializer: A compact binary format read by the marshal module.
+
+Functions:
+    get_serializer: Return the serializer of a format.
+"""
+
+import marshal  # Importing marshal for the fastest binary format
+import sys  # Importing sys to tie marshal snapshots to the Python version writing them
+from record.models import Record  # Import the base class of the compact record types
+
+
+def _plain(records):
+    """
+    Convert compact records to dictionaries, which every format can encode.
+
+    Args:
+        records (list): The records, as dictionaries or compact records.
+
+    Returns:
+        list: The records as dictionaries.
+    """
+    return [record.to_dict() if isinstance(record, Record) else record for record in records]
+
+
+class MarshalSerializer:
+    """
+    A compact binary format read by the marshal module, the fastest to load.
+
+    The marshal format may change between Python versions, so the version records the
+    Python version too, and snapshots written by another version are not loaded.
+    """
+
+    name = "marshal"
+    version = f"{marshal.version}/{sys.version_info[0]}.{sys.version_info[1]}"
+
+    def dumps(self, records):
+        """
+        Encode records.
+
+        Args:
+            records (list): The records, as dictionaries or compact records.
+
+        Returns:
+            bytes: The encoded records.
+        """
+        return marshal.dumps(_plain(records))
+
+    def loads(self, data):
+        """
+        Decode records.
+
+        Args:
+            data (bytes): Records encoded by dumps().
+
+        Returns:
+            list: The records, as dictionaries.
+
+        Raises:
+            ValueError: If the data is not valid.
+        """
+        try:
+            return marshal.loads(data)
+        except (EOFError, TypeError) as error:
+            raise ValueError(f"Invalid marshal data: {error}") from None
+
+
+# Serializer of each format, keyed by its name
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (MarshalSerializer,)
+}
+
+
+def get_serializer(name):
+    """
+    Return the serializer of a format.
+
+    Args:
+        name (str): The name of the format ("marshal").
+
+    Returns:
+        MarshalSerializer: A serializer for the format.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    serializer = SERIALIZERS.get(name)
+    if serializer is None:
+        raise ValueError(f"Unknown serialization format: {name}")
+    return serializer()
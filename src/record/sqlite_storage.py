@@ -0,0 +1,348 @@
+"""
+This module provides a SQLite storage engine for the Record Management System.
+
+Clients, airlines and flights are stored in tables of one SQLite database, with primary keys,
+unique constraints on client phone numbers and airline names, and indexes on the flight
+Client_ID, Airline_ID and Date/Time columns. Fields without a column of their own are kept
+in a JSON "extra" column, so no record data is lost.
+
+The record classes keep addressing their data by the JSON file paths in conf/config.py;
+this engine maps each file name to its table.
+
+Classes:
+    TableSpec: Describes how the records of one data file map onto a table.
+    SqliteStorage: Stores the records of every data file in a SQLite database.
+"""
+
+import json  # Importing JSON module for the extra column
+import os  # Importing os to work with file paths
+import sqlite3  # Importing SQLite from the standard library
+import threading  # Importing threading to share the connection safely
+from conf.config import SQLITE_FILE  # Import configuration for the database path
+
+
+class TableSpec:
+    """
+    Describes how the records of one data file map onto a SQLite table.
+    """
+
+    def __init__(self, table, columns, key, constraints=(), indexes=()):
+        """
+        Create a table description.
+
+        Args:
+            table (str): The name of the table.
+            columns (list): (record field, column name, column type) tuples, in record field order.
+            key (str): The record field holding the primary key.
+            constraints (tuple): Extra table constraints, such as UNIQUE clauses.
+            indexes (tuple): (index name, column list) tuples for secondary indexes.
+        """
+        self.table = table
+        self.columns = columns
+        self.key = key
+        self.constraints = constraints
+        self.indexes = indexes
+        self.fields = [field for field, _, _ in columns]
+        self.key_column = next(column for field, column, _ in columns if field == key)
+
+    def schema(self):
+        """
+        Build the SQL statements creating the table and its indexes.
+
+        Returns:
+            list: The CREATE TABLE and CREATE INDEX statements.
+        """
+        definitions = [f'"{column}" {column_type}' for _, column, column_type in self.columns]
+        definitions.append('"extra" TEXT')
+        definitions.extend(self.constraints)
+        statements = [f'CREATE TABLE IF NOT EXISTS "{self.table}" ({", ".join(definitions)})']
+        for name, columns in self.indexes:
+            statements.append(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{self.table}" ({columns})')
+        return statements
+
+    def to_row(self, record):
+        """
+        Convert a record to a table row.
+
+        Args:
+            record (dict): The record to convert.
+
+        Returns:
+            tuple: The column values, followed by the JSON encoded extra fields (or None).
+        """
+        extra = {field: value for field, value in record.items() if field not in self.fields}
+        return tuple(record.get(field) for field in self.fields) + (json.dumps(extra) if extra else None,)
+
+    def to_record(self, row):
+        """
+        Convert a table row back to a record.
+
+        Fields stored as NULL were missing from the original record and are left out.
+
+        Args:
+            row (tuple): The column values, followed by the extra column.
+
+        Returns:
+            dict: The record.
+        """
+        record = {field: value for field, value in zip(self.fields, row) if value is not None}
+        if row[-1]:
+            record.update(json.loads(row[-1]))
+        return record
+
+
+# Table layout of each data file, keyed by the data file name
+TABLES = {
+    "clients.json": TableSpec(
+        "clients",
+        [
+            ("ID", "id", "INTEGER PRIMARY KEY"),
+            ("Type", "type", "TEXT"),
+            ("Name", "name", "TEXT"),
+            ("Address Line 1", "address_line_1", "TEXT"),
+            ("Address Line 2", "address_line_2", "TEXT"),
+            ("Address Line 3", "address_line_3", "TEXT"),
+            ("City", "city", "TEXT"),
+            ("State", "state", "TEXT"),
+            ("Zip Code", "zip_code", "TEXT"),
+            ("Country", "country", "TEXT"),
+            ("Phone Number", "phone_number", "TEXT UNIQUE"),
+        ],
+        "ID",
+    ),
+    "airlines.json": TableSpec(
+        "airlines",
+        [
+            ("ID", "id", "INTEGER PRIMARY KEY"),
+            ("Type", "type", "TEXT"),
+            ("Company Name", "company_name", "TEXT UNIQUE COLLATE NOCASE"),
+        ],
+        "ID",
+    ),
+    "flights.json": TableSpec(
+        "flights",
+        [
+            ("Flight_ID", "flight_id", "INTEGER PRIMARY KEY"),
+            ("Client_ID", "client_id", "INTEGER"),
+            ("Airline_ID", "airline_id", "INTEGER"),
+            ("Date/Time", "date_time", "TEXT"),
+            ("Start City", "start_city", "TEXT"),
+            ("End City", "end_city", "TEXT"),
+        ],
+        "Flight_ID",
+        indexes=(
+            ("idx_flights_client_id", "client_id"),
+            ("idx_flights_airline_id", "airline_id"),
+            ("idx_flights_date_time", "date_time"),
+        ),
+    ),
+}
+
+
+class SqliteStorage:
+    """
+    A storage engine keeping the records of every data file in one SQLite database.
+
+    Each commit also bumps a per-table version number, which serves as the signature the
+    record cache uses to notice changes made by other processes.
+    """
+
+    def __init__(self, database=SQLITE_FILE):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            database (str): The path of the SQLite database file.
+        """
+        self.database = database
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS "versions" ("name" TEXT PRIMARY KEY, "version" INTEGER NOT NULL)')
+            for spec in TABLES.values():
+                for statement in spec.schema():
+                    self._connection.execute(statement)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def table(path):
+        """
+        Find the table layout for a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            TableSpec: The layout of the table storing the file's records.
+
+        Raises:
+            ValueError: If the file name has no table.
+        """
+        try:
+            return TABLES[os.path.basename(path)]
+        except KeyError:
+            raise ValueError(f"No SQLite table is defined for {os.path.basename(path)}.")
+
+    def signature(self, path):
+        """
+        Return the version of the table storing a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            tuple: The database path and table version.
+        """
+        spec = self.table(path)
+        with self._lock:
+            row = self._connection.execute('SELECT "version" FROM "versions" WHERE "name" = ?', (spec.table,)).fetchone()
+        return (self.database, row[0] if row else 0)
+
+    def read(self, path):
+        """
+        Read all records of a data file from its table, ordered by primary key.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            list: A list of dictionaries representing the records.
+        """
+        spec = self.table(path)
+        columns = ", ".join(f'"{column}"' for _, column, _ in spec.columns)
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT {columns}, "extra" FROM "{spec.table}" ORDER BY "{spec.key_column}"'
+            ).fetchall()
+        return [spec.to_record(row) for row in rows]
+
+    def iter_records(self, path, batch_size=1000):
+        """
+        Read the records of a data file from its table a batch of rows at a time, ordered by primary key.
+
+        Args:
+            path (str): The path of the data file.
+            batch_size (int): The number of rows fetched at a time.
+
+        Yields:
+            dict: The records.
+        """
+        spec = self.table(path)
+        columns = ", ".join(f'"{column}"' for _, column, _ in spec.columns)
+        with self._lock:
+            cursor = self._connection.execute(
+                f'SELECT {columns}, "extra" FROM "{spec.table}" ORDER BY "{spec.key_column}"'
+            )
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield spec.to_record(row)
+        finally:
+            cursor.close()
+
+    def _insert_sql(self, spec):
+        """
+        Build the INSERT statement for a table.
+
+        Args:
+            spec (TableSpec): The table layout.
+
+        Returns:
+            str: The parameterized INSERT statement.
+        """
+        columns = ", ".join(f'"{column}"' for _, column, _ in spec.columns)
+        placeholders = ", ".join("?" for _ in range(len(spec.columns) + 1))
+        return f'INSERT INTO "{spec.table}" ({columns}, "extra") VALUES ({placeholders})'
+
+    def _bump_version(self, spec):
+        """
+        Increase the version of a table inside the current transaction.
+
+        Args:
+            spec (TableSpec): The table layout.
+        """
+        self._connection.execute(
+            'INSERT INTO "versions" ("name", "version") VALUES (?, 1) '
+            'ON CONFLICT("name") DO UPDATE SET "version" = "version" + 1',
+            (spec.table,),
+        )
+
+    def write(self, path, records):
+        """
+        Replace all records of a data file in one transaction.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): A list of dictionaries representing the records to save.
+
+        Raises:
+            ValueError: If the records violate a primary key or unique constraint.
+        """
+        spec = self.table(path)
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(f'DELETE FROM "{spec.table}"')
+                self._connection.executemany(self._insert_sql(spec), (spec.to_row(record) for record in records))
+                self._bump_version(spec)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Could not save {spec.table}: {e}")
+
+    def import_records(self, path, records):
+        """
+        Replace all records of a data file, skipping records that violate a constraint.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): A list of dictionaries representing the records to import.
+
+        Returns:
+            list: (record, error message) tuples for the records that were skipped.
+        """
+        spec = self.table(path)
+        insert_sql = self._insert_sql(spec)
+        skipped = []
+        with self._lock, self._connection:
+            self._connection.execute(f'DELETE FROM "{spec.table}"')
+            for record in records:
+                try:
+                    self._connection.execute(insert_sql, spec.to_row(record))
+                except sqlite3.IntegrityError as e:
+                    skipped.append((record, str(e)))
+            self._bump_version(spec)
+        return skipped
+
+    def commit(self, entry, lock):
+        """
+        Apply the pending changes of a cache entry to its table in one transaction.
+
+        Args:
+            entry (CachedFile): The cache entry holding the records and their pending changes.
+            lock (threading.RLock): The lock guarding the cache entry.
+
+        Raises:
+            ValueError: If a change violates a primary key or unique constraint.
+        """
+        spec = self.table(entry.path)
+        insert_sql = self._insert_sql(spec)
+        delete_sql = f'DELETE FROM "{spec.table}" WHERE "{spec.key_column}" = ?'
+        try:
+            with self._lock, self._connection:
+                for change in entry.changes:
+                    if change["op"] in ("update", "delete"):
+                        old = change["before"] if change["op"] == "update" else change["record"]
+                        self._connection.execute(delete_sql, (old.get(spec.key),))
+                    if change["op"] in ("insert", "update"):
+                        self._connection.execute(insert_sql, spec.to_row(change["record"]))
+                self._bump_version(spec)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Could not save {spec.table}: {e}")
@@ -0,0 +1,663 @@
+"""
+This module provides the storage engines used to persist records in the Record Management System.
+
+It offers:
+- A JSON engine that rewrites the whole pretty-printed data file on every save,
+  replacing the file in one step so readers never see a half-written file.
+- Binary snapshots of the JSON files (see record.serializers), loaded at startup instead
+  of parsing the JSON while they still match it.
+- Optional gzip or lzma compression of the JSON files (see record.compression).
+- A log engine that appends each change to a compact log next to the data file,
+  replays the log on load, and compacts it into the data file in the background.
+- A SQLite engine, provided by record.sqlite_storage.
+- A memory-mapped store for the flights, provided by record.flight_file, wrapping any of the above.
+
+The engine is chosen with STORAGE_ENGINE in conf/config.py.
+
+Classes:
+    JsonStorage: Stores each data file as a single JSON document.
+    LogStorage: Stores each data file as a JSON snapshot plus an append-only log of changes.
+
+Functions:
+    file_signature: Compute the signature used to detect changes to a file.
+    iter_json_array: Parse the items of a JSON list one at a time from an open file.
+    get_storage: Create the storage engine selected in the configuration.
+"""
+
+import json  # Importing JSON module for reading and writing JSON files
+import os  # Importing os to read file metadata and replace files
+import re  # Importing re to skip whitespace quickly while streaming JSON
+import threading  # Importing threading to compact logs in the background
+import uuid  # Importing uuid to tell apart the logs written for the same snapshot
+from conf.config import STORAGE_ENGINE, LOG_COMPACTION_THRESHOLD, SNAPSHOT_FORMAT, COMPRESSION, FLIGHT_STORE  # Import storage configuration
+from record.models import Record  # Import the base class of the compact record types
+from record.locking import file_lock  # Import the data file locks, taken while a log is compacted
+from record.serializers import get_serializer  # Import the serializers of the binary snapshots
+from record.compression import DECODE_ERRORS, get_codec, open_text, variants  # Import the codecs of compressed data files
+
+
+def file_signature(path):
+    """
+    Compute the signature used to detect changes to a file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        tuple: The (mtime in nanoseconds, size, inode) of the file, or None if the file is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _to_json(value):
+    """
+    Convert a compact record to a dictionary for the JSON encoder.
+
+    Args:
+        value: An object the JSON encoder cannot serialize by itself.
+
+    Returns:
+        dict: The fields of the record.
+
+    Raises:
+        TypeError: If the value is not a record.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Whitespace and the commas separating the items of a JSON list
+_SEPARATORS = re.compile(r"[ \t\r\n,]*")
+
+
+def iter_json_array(f, chunk_size=64 * 1024):
+    """
+    Parse the items of a JSON list one at a time from an open file.
+
+    Only the item being parsed is kept in memory, so very large files can be scanned
+    with constant memory, and the scan can stop as soon as the caller stops iterating.
+
+    Args:
+        f (file): A text file opened for reading, holding a JSON list.
+        chunk_size (int): The number of characters read at a time.
+
+    Yields:
+        The items of the list, in order.
+
+    Raises:
+        json.JSONDecodeError: If the file does not hold a valid JSON list. Items before
+        the error have already been yielded.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+
+    def fill():
+        # Read more of the file, dropping what was already parsed
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        # Skip whitespace, and the separating comma between items
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position < len(buffer) or eof:
+                break
+            fill()
+        if position >= len(buffer):
+            raise json.JSONDecodeError("Unexpected end of file", buffer, position)
+        if not started:
+            if buffer[position] != "[":
+                raise json.JSONDecodeError("Expected a list", buffer, position)
+            position += 1
+            started = True
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The item continues in the next chunk
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A number may continue in the next chunk, so parse it again with more input
+            fill()
+            continue
+        position = end
+        yield item
+
+
+class JsonStorage:
+    """
+    A storage engine keeping each data file as one pretty-printed JSON list of records.
+
+    Next to each data file, a binary snapshot ("<data file>.snap") holds the same records in
+    a format that loads several times faster. Its header names the format and the signature
+    of the JSON file it was written from, so it is only loaded while the JSON file is
+    unchanged; after the JSON file was edited by another program, the JSON is parsed and
+    the snapshot written again.
+
+    Data files may be compressed (see record.compression). Paths given to the engine are
+    always the plain names, such as "clients.json"; the file actually holding the records
+    is the newest of "clients.json", "clients.json.gz" and "clients.json.xz", so switching
+    codecs keeps the records, and the file is written with the configured codec.
+    """
+
+    # First line of every snapshot file
+    SNAPSHOT_MAGIC = b"RMS snapshot\n"
+
+    def __init__(self, snapshot_format=SNAPSHOT_FORMAT, compression=COMPRESSION):
+        """
+        Create a JSON storage engine.
+
+        Args:
+            snapshot_format (str): The format of the binary snapshots, or None to keep no snapshots.
+            compression (str): The codec data files are written with ("gzip" or "lzma"), or None for plain files.
+        """
+        self.snapshot = None if snapshot_format is None else get_serializer(snapshot_format)
+        self.codec = get_codec(compression)
+
+    def target_path(self, path):
+        """
+        Return the path a data file is written to: its name with the suffix of the configured codec.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The path of the file to write.
+        """
+        return path if self.codec is None else path + self.codec.suffix
+
+    def stored_path(self, path):
+        """
+        Return the path of the file holding the records of a data file: the newest of its
+        plain and compressed variants, or the file to write if there is none yet.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The path of the file to read.
+        """
+        target = self.target_path(path)
+        stored, newest = target, None
+        # The target comes first, so it wins when two variants have the same mtime
+        for candidate in [target] + [variant for variant in variants(path) if variant != target]:
+            signature = file_signature(candidate)
+            if signature is not None and (newest is None or signature[0] > newest):
+                stored, newest = candidate, signature[0]
+        return stored
+
+    @staticmethod
+    def snapshot_path(path):
+        """
+        Return the path of the binary snapshot belonging to a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The path of the snapshot file.
+        """
+        return path + ".snap"
+
+    def signature(self, path):
+        """
+        Compute the signature of a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            tuple: The file signature, or None if the file is missing.
+        """
+        return file_signature(self.stored_path(path))
+
+    def read(self, path):
+        """
+        Read all records of a data file.
+
+        If the file is missing or contains invalid data, return an empty list.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            list: A list of dictionaries representing the records.
+        """
+        # The signature is taken first, so a file changed while it is read does not match the snapshot
+        stored = self.stored_path(path)
+        signature = file_signature(stored)
+        records = self._read_snapshot(path, signature)
+        if records is not None:
+            return records
+        try:
+            # Open the JSON file in read mode, decompressing it if needed, and load the records
+            with open_text(stored, "r") as f:
+                records = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, *DECODE_ERRORS):
+            # If the file is missing or invalid, fall back to an empty list
+            return []
+        # Keep a snapshot, so the next start does not parse the JSON again
+        self._write_snapshot(path, records, signature)
+        return records
+
+    def _read_snapshot(self, path, signature):
+        """
+        Load the records of a data file from its binary snapshot.
+
+        Args:
+            path (str): The path of the data file.
+            signature (tuple): The current signature of the data file.
+
+        Returns:
+            list: The records, or None if there is no snapshot matching the data file.
+        """
+        if self.snapshot is None or signature is None:
+            return None
+        try:
+            with open(self.snapshot_path(path), "rb") as f:
+                if f.readline() != self.SNAPSHOT_MAGIC:
+                    return None
+                header = json.loads(f.readline())
+                if header != self._snapshot_header(signature):
+                    # Written from an older JSON file, or in another format
+                    return None
+                return self.snapshot.loads(f.read())
+        except (OSError, ValueError):
+            # A missing or damaged snapshot only means the JSON file is parsed instead
+            return None
+
+    def _write_snapshot(self, path, records, signature):
+        """
+        Write the binary snapshot of a data file.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): The records now in the data file.
+            signature (tuple): The signature of the data file holding the records.
+        """
+        if self.snapshot is None or signature is None:
+            return
+        snapshot_path = self.snapshot_path(path)
+        temp_path = f"{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(self.SNAPSHOT_MAGIC)
+                f.write(json.dumps(self._snapshot_header(signature)).encode("utf-8") + b"\n")
+                f.write(self.snapshot.dumps(records))
+            os.replace(temp_path, snapshot_path)
+        except OSError:
+            # The snapshot only speeds up loading, so the data file is still saved without it;
+            # an outdated snapshot left behind no longer matches the data file and is ignored
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def _snapshot_header(self, signature):
+        """
+        Build the header identifying a snapshot: its format and the data file it was written from.
+
+        Args:
+            signature (tuple): The signature of the data file.
+
+        Returns:
+            dict: The header, as stored in the snapshot.
+        """
+        return {"format": self.snapshot.name, "version": self.snapshot.version, "base": list(signature)}
+
+    def iter_records(self, path):
+        """
+        Read the records of a data file one at a time, without loading the whole file.
+
+        If the file is missing, nothing is yielded. If it contains invalid data, the scan
+        stops at the first invalid item.
+
+        Args:
+            path (str): The path of the data file.
+
+        Yields:
+            dict: The records, in file order.
+        """
+        try:
+            with open_text(self.stored_path(path), "r") as f:
+                yield from iter_json_array(f)
+        except (FileNotFoundError, json.JSONDecodeError, *DECODE_ERRORS):
+            return
+
+    def write(self, path, records):
+        """
+        Overwrite a data file with the given records.
+
+        Args:
+            path (str): The path of the data file.
+            records (list): A list of dictionaries representing the records to save.
+        """
+        # Dump the records to a temporary file and swap it in, so readers never see a half-written file
+        target = self.target_path(path)
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        with open_text(temp_path, "w", self.codec) as f:
+            json.dump(records, f, indent=4, default=_to_json)
+        os.replace(temp_path, target)
+        self._write_snapshot(path, records, file_signature(target))
+
+    def commit(self, entry, lock):
+        """
+        Persist the changes recorded in a cache entry.
+
+        The JSON engine has no incremental format, so the whole file is written again.
+
+        Args:
+            entry (CachedFile): The cache entry holding the records and their pending changes.
+            lock (threading.RLock): The lock guarding the cache entry.
+        """
+        self.write(entry.path, entry.records)
+
+
+class LogStorage(JsonStorage):
+    """
+    A storage engine keeping each data file as a JSON snapshot plus an append-only log.
+
+    Every change is appended to "<data file>.log" as one compact JSON line. The first line of
+    the log names the snapshot it applies to, so a log left behind by an older snapshot, or by
+    a data file replaced by another program, is ignored, and a generation that changes every
+    time a log is started. Once the log grows past a threshold it is folded into the snapshot
+    by a background thread. A compaction is dropped if another process compacted or restarted
+    the log meanwhile, so several processes can share the data files.
+    """
+
+    def __init__(self, threshold=LOG_COMPACTION_THRESHOLD):
+        """
+        Create a log storage engine.
+
+        Args:
+            threshold (int): The log size in bytes above which it is compacted into the snapshot.
+        """
+        super().__init__()
+        self.threshold = threshold
+        self._compacting = {}  # Data file path -> compaction thread
+
+    @staticmethod
+    def log_path(path):
+        """
+        Return the path of the log belonging to a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The path of the log file.
+        """
+        return path + ".log"
+
+    def _base(self, path):
+        """
+        Identify the snapshot a log applies to.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            list: The [mtime in nanoseconds, size] of the snapshot, or None if it is missing.
+        """
+        signature = file_signature(self.stored_path(path))
+        return None if signature is None else [signature[0], signature[1]]
+
+    def signature(self, path):
+        snapshot = file_signature(self.stored_path(path))
+        log = file_signature(self.log_path(path))
+        if snapshot is None and log is None:
+            return None
+        return (snapshot, log)
+
+    def read(self, path):
+        records = super().read(path)
+        try:
+            with open(self.log_path(path), "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return records
+        if not lines or not self._is_current(lines[0], path):
+            return records
+        for line in lines[1:]:
+            try:
+                change = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from an interrupted write; everything before it is intact
+                break
+            self.apply(records, change)
+        return records
+
+    def iter_records(self, path):
+        if self._log_is_current(path):
+            # Logged changes refer to positions in the snapshot, so the records are replayed in memory
+            yield from self.read(path)
+        else:
+            yield from super().iter_records(path)
+
+    def _is_current(self, header, path):
+        """
+        Check whether a log header names the current snapshot.
+
+        Args:
+            header (str): The first line of the log.
+            path (str): The path of the data file.
+
+        Returns:
+            bool: True if the log applies to the current snapshot, False otherwise.
+        """
+        try:
+            return json.loads(header).get("base") == self._base(path)
+        except (json.JSONDecodeError, AttributeError):
+            return False
+
+    @staticmethod
+    def apply(records, change):
+        """
+        Apply one logged change to a list of records.
+
+        Args:
+            records (list): The records to change in place.
+            change (dict): The logged change, as written by commit().
+        """
+        if change["op"] == "insert":
+            records.append(change["record"])
+        elif change["op"] == "update":
+            records[change["position"]].update(change["data"])
+        elif change["op"] == "delete":
+            del records[change["position"]]
+
+    def write(self, path, records):
+        super().write(path, records)
+        # The snapshot now holds everything, so the old log no longer applies
+        try:
+            os.remove(self.log_path(path))
+        except FileNotFoundError:
+            pass
+
+    def commit(self, entry, lock):
+        """
+        Append the pending changes of a cache entry to the log, starting a compaction if the log is large.
+
+        Args:
+            entry (CachedFile): The cache entry holding the records and their pending changes.
+            lock (threading.RLock): The lock guarding the cache entry.
+        """
+        log_path = self.log_path(entry.path)
+        lines = [json.dumps(self._log_entry(change), separators=(",", ":"), default=_to_json) for change in entry.changes]
+        header = self._current_header(entry.path)
+        if header is None:
+            # Start a new log for the current snapshot
+            header = self._new_header(entry.path)
+            lines.insert(0, header)
+            mode = "w"
+        else:
+            mode = "a"
+        with open(log_path, mode) as f:
+            f.write("".join(line + "\n" for line in lines))
+
+        if os.path.getsize(log_path) > self.threshold and entry.path not in self._compacting:
+            # Copy the records now, while they match the log exactly
+            records = [dict(record) for record in entry.records]
+            offset = os.path.getsize(log_path)
+            thread = threading.Thread(target=self._compact, args=(entry, lock, records, header, offset), daemon=True)
+            self._compacting[entry.path] = thread
+            thread.start()
+
+    @staticmethod
+    def _log_entry(change):
+        """
+        Reduce a change recorded by a cache entry to what the log needs to replay it.
+
+        Args:
+            change (dict): The change recorded by CachedFile.
+
+        Returns:
+            dict: The change as written to the log.
+        """
+        if change["op"] == "insert":
+            return {"op": "insert", "record": change["record"]}
+        if change["op"] == "update":
+            return {"op": "update", "position": change["position"], "data": change["data"]}
+        return {"op": "delete", "position": change["position"]}
+
+    def _new_header(self, path):
+        """
+        Build the first line of a new log for the current snapshot of a data file.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The header, naming the snapshot and a new generation.
+        """
+        return json.dumps({"base": self._base(path), "generation": uuid.uuid4().hex}, separators=(",", ":"))
+
+    def _current_header(self, path):
+        """
+        Read the first line of the log of a data file, if the log applies to the current snapshot.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            str: The header of the log, or None if there is no log or it applies to another snapshot.
+        """
+        try:
+            with open(self.log_path(path), "r") as f:
+                header = f.readline().rstrip("\n")
+        except FileNotFoundError:
+            return None
+        return header if self._is_current(header, path) else None
+
+    def _log_is_current(self, path):
+        """
+        Check whether the log of a data file exists and applies to the current snapshot.
+
+        Args:
+            path (str): The path of the data file.
+
+        Returns:
+            bool: True if new changes can be appended to the existing log, False otherwise.
+        """
+        return self._current_header(path) is not None
+
+    def _compact(self, entry, lock, records, header, offset):
+        """
+        Fold the log into a new snapshot, keeping any changes logged while the snapshot was written.
+
+        The compaction is dropped if, by the time the file lock is taken, another process has
+        compacted or restarted the log, since the offset then no longer marks the changes the
+        records are missing. That process has already folded the log in.
+
+        Args:
+            entry (CachedFile): The cache entry the records were copied from.
+            lock (threading.RLock): The lock guarding the cache entry.
+            records (list): A copy of the records matching the first offset bytes of the log.
+            header (str): The first line of the log when the records were copied.
+            offset (int): The size of the log when the records were copied.
+        """
+        path = entry.path
+        log_path = self.log_path(path)
+        target = self.target_path(path)
+        # Named after the process and thread, so compactions in other processes do not share it
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Writing the snapshot is the slow part, so it runs without holding the lock
+            with open_text(temp_path, "w", self.codec) as f:
+                json.dump(records, f, indent=4)
+
+            # The file lock is taken before the cache lock, in the same order as RecordCache.commit()
+            with file_lock(path).exclusive(), lock:
+                if self._current_header(path) != header or os.path.getsize(log_path) < offset:
+                    return
+                unchanged = entry.signature == self.signature(path)
+                with open(log_path, "r") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                os.replace(temp_path, target)
+                # Keep changes logged during the compaction, now based on the new snapshot
+                with open(log_path + ".tmp", "w") as f:
+                    f.write(self._new_header(path) + "\n" + tail)
+                os.replace(log_path + ".tmp", log_path)
+                if unchanged:
+                    # The cached records still match the files, so they stay valid
+                    entry.signature = self.signature(path)
+        finally:
+            self._compacting.pop(path, None)
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+
+    def wait(self):
+        """
+        Wait for all running compactions to finish.
+        """
+        for thread in list(self._compacting.values()):
+            thread.join()
+
+
+def get_storage():
+    """
+    Create the storage engine selected in the configuration.
+
+    Returns:
+        JsonStorage | SqliteStorage | MappedFlightStorage: The engine named by STORAGE_ENGINE,
+        wrapped to keep the flights in a memory-mapped file if FLIGHT_STORE is "mmap".
+
+    Raises:
+        ValueError: If STORAGE_ENGINE names an unknown engine, or FLIGHT_STORE an unknown store.
+    """
+    if STORAGE_ENGINE == "json":
+        engine = JsonStorage()
+    elif STORAGE_ENGINE == "log":
+        engine = LogStorage()
+    elif STORAGE_ENGINE == "sqlite":
+        # Imported here so the JSON engines do not open a database
+        from record.sqlite_storage import SqliteStorage
+        engine = SqliteStorage()
+    else:
+        raise ValueError(f"Unknown storage engine: {STORAGE_ENGINE}")
+    if FLIGHT_STORE == "engine":
+        return engine
+    if FLIGHT_STORE == "mmap":
+        from record.flight_file import MappedFlightStorage
+        return MappedFlightStorage(engine)
+    raise ValueError(f"Unknown flight store: {FLIGHT_STORE}")
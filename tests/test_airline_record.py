@@ -2,11 +2,13 @@ import unittest
 import os
 import json
 import sys
+import tempfile
 
 # Add the src directory to the system path dynamically
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 from record.airline import AirlineRecord  # Adjust this import to match the correct file location
+from record.sequence import IdSequence  # Import the ID sequence, to give each test a fresh one
 from conf.config import AIRLINE_FILE  # Adjust this import to match the correct file location
 
 class TestAirlineRecord(unittest.TestCase):
@@ -32,10 +34,17 @@ class TestAirlineRecord(unittest.TestCase):
         with open(self.test_airline_file, "w") as f:
             json.dump(self.test_data, f, indent=4)
 
+        # Hand out IDs from a fresh sequence file, so earlier runs do not affect the IDs
+        self.sequence_dir = tempfile.TemporaryDirectory()
+        self.original_sequence = AirlineRecord.sequence
+        AirlineRecord.sequence = IdSequence(os.path.join(self.sequence_dir.name, "airlines.seq"))
+
     def tearDown(self):
         """
         Clean up the test environment by restoring the original file contents.
         """
+        AirlineRecord.sequence = self.original_sequence
+        self.sequence_dir.cleanup()
         if self.original_data is not None:
             with open(self.test_airline_file, "w") as f:
                 f.write(self.original_data)
@@ -81,6 +90,29 @@ class TestAirlineRecord(unittest.TestCase):
         result = AirlineRecord.is_duplicate_airline_name(duplicate_name)
         self.assertTrue(result)
 
+    def test_search_by_name(self):
+        """Test searching for an airline record by company name in any case."""
+        record = AirlineRecord.search_by_name("AIRLINE two")
+        self.assertIsNotNone(record)
+        self.assertEqual(record["ID"], 2)
+        self.assertIsNone(AirlineRecord.search_by_name("Airline Three"))
+
+    def test_fuzzy_search(self):
+        """Test finding airlines by a misspelled company name."""
+        AirlineRecord.create({"Company Name": "Lufthansa"})
+        matches = AirlineRecord.fuzzy_search("Lufthnasa")
+        self.assertEqual([record["Company Name"] for _, record in matches], ["Lufthansa"])
+        self.assertEqual([record["ID"] for _, record in AirlineRecord.fuzzy_search("airline tow")], [2, 1])
+        AirlineRecord.update_airline(3, {"Company Name": "Condor"})
+        self.assertEqual(AirlineRecord.fuzzy_search("Lufthnasa"), [])
+        self.assertEqual(AirlineRecord.fuzzy_search(" "), [])
+
+    def test_update_airline_to_own_name(self):
+        """Test renaming an airline to its own name and to another airline's name."""
+        self.assertTrue(AirlineRecord.update_airline(1, {"Company Name": "AIRLINE ONE"}))
+        with self.assertRaises(ValueError):
+            AirlineRecord.update_airline(1, {"Company Name": "airline two"})
+
     def test_update_airline(self):
         """Test updating an existing airline record."""
         updated_data = {"Company Name": "Updated Airline One", "Country": "Updated Country"}
@@ -97,5 +129,22 @@ class TestAirlineRecord(unittest.TestCase):
         records = AirlineRecord.load_all()
         self.assertNotIn({"ID": 1, "Company Name": "Airline One", "Country": "Country A"}, records)
 
+    def test_create_many(self):
+        """Test creating many airline records with case-insensitive duplicates."""
+        ids, errors = AirlineRecord.create_many([
+            {"Company Name": "Airline Three"},
+            {"Company Name": "AIRLINE THREE"},
+            {"ID": 10, "Company Name": "Airline Ten"},
+            {"ID": "20", "Company Name": "Airline Twenty"},
+            {"ID": 10, "Company Name": "Airline Ten Again"},
+            {"Company Name": "Airline Eleven"}
+        ])
+        self.assertEqual(ids, [11, 10, 12])
+        self.assertEqual(errors, [
+            (1, "Duplicate airline name detected."),
+            (3, "Invalid ID: IDs must be positive integers."),
+            (4, "Duplicate ID detected.")
+        ])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -2,11 +2,16 @@ import unittest
 import os
 import json
 import sys
+import threading
+import tempfile
+from unittest.mock import patch
 
 # Add the src directory to the system path dynamically
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 from record.client import ClientRecord  # Adjust based on where your ClientRecord class is located
+from record.flight import FlightRecord  # Import FlightRecord, whose reference checks are replaced in tests
+from record.sequence import IdSequence  # Import the ID sequence, to give each test a fresh one
 from conf.config import CLIENT_FILE  # Adjust the import based on the actual file path
 
 class TestClientRecord(unittest.TestCase):
@@ -32,10 +37,17 @@ class TestClientRecord(unittest.TestCase):
         with open(self.test_client_file, "w") as f:
             json.dump(self.test_data, f, indent=4)
 
+        # Hand out IDs from a fresh sequence file, so earlier runs do not affect the IDs
+        self.sequence_dir = tempfile.TemporaryDirectory()
+        self.original_sequence = ClientRecord.sequence
+        ClientRecord.sequence = IdSequence(os.path.join(self.sequence_dir.name, "clients.seq"))
+
     def tearDown(self):
         """
         Clean up the test environment by restoring the original file contents.
         """
+        ClientRecord.sequence = self.original_sequence
+        self.sequence_dir.cleanup()
         if self.original_data is not None:
             with open(self.test_client_file, "w") as f:
                 f.write(self.original_data)
@@ -48,6 +60,51 @@ class TestClientRecord(unittest.TestCase):
         self.assertEqual(len(records), len(self.test_data))
         self.assertEqual(records[0]["Name"], "John Doe")
 
+    def test_iter_where(self):
+        """Test streaming the client records matching a condition."""
+        records = list(ClientRecord.iter_where(lambda record: record["Name"].startswith("Jane")))
+        self.assertEqual(records, [self.test_data[1]])
+        self.assertEqual(list(ClientRecord.iter_all()), self.test_data)
+
+    def test_page(self):
+        """Test fetching client records a page at a time, in file order and sorted."""
+        ClientRecord.create({"ID": 3, "Name": "alice Brown", "Phone Number": "1-212-5551234"})
+        page = ClientRecord.page(1, 1)
+        self.assertEqual((page.total, [record["ID"] for record in page.records]), (3, [2]))
+        page = ClientRecord.page(0, 2, sort_by="Name")
+        self.assertEqual([record["Name"] for record in page.records], ["alice Brown", "Jane Smith"])
+        page = ClientRecord.page(0, 2, sort_by="Name", descending=True)
+        self.assertEqual([record["Name"] for record in page.records], ["John Doe", "Jane Smith"])
+        self.assertEqual(ClientRecord.page(5, 2).records, [])
+        with self.assertRaises(ValueError):
+            ClientRecord.page(0, 2, sort_by="Company Name")
+
+    def test_search_name_prefix(self):
+        """Test finding clients by the start of their name or of a word of it."""
+        self.assertEqual([record["ID"] for record in ClientRecord.search_name_prefix("j")], [2, 1])
+        self.assertEqual([record["ID"] for record in ClientRecord.search_name_prefix("  SMI")], [2])
+        ClientRecord.create({"ID": 3, "Name": "Jo  Smithers", "Phone Number": "1-212-5551234"})
+        self.assertEqual([record["ID"] for record in ClientRecord.search_name_prefix("jo s")], [3])
+        self.assertEqual([record["ID"] for record in ClientRecord.search_name_prefix("smith", limit=1)], [2])
+        self.assertEqual(ClientRecord.search_name_prefix(" "), [])
+
+    def test_fuzzy_search(self):
+        """Test finding clients by a misspelled name."""
+        matches = ClientRecord.fuzzy_search("Jane Smiht")
+        self.assertEqual([record["ID"] for _, record in matches], [2])
+        self.assertGreater(matches[0][0], 0.4)
+        self.assertEqual(ClientRecord.fuzzy_search("Jane Smiht", threshold=0.9), [])
+
+    def test_search_text(self):
+        """Test finding clients by words of their name and address, in any order."""
+        ClientRecord.create({"ID": 3, "Name": "Alice Brown", "Address Line 1": "12 Elm Street", "City": "Chicago", "Phone Number": "1-212-5551234"})
+        ClientRecord.create({"ID": 4, "Name": "Bob Elm", "Address Line 1": "9 Elm Street", "City": "Boston", "Phone Number": "1-212-5554321"})
+        self.assertEqual([record["ID"] for record in ClientRecord.search_text("chicago ELM")], [3])
+        self.assertEqual([record["ID"] for record in ClientRecord.search_text("elm")], [4, 3])
+        ClientRecord.update(3, {"City": "Denver", "Phone Number": "1-212-5551234"})
+        self.assertEqual(ClientRecord.search_text("elm chicago"), [])
+        self.assertEqual(ClientRecord.search_text("  "), [])
+
     def test_save_all(self):
         """Test saving all client records."""
         new_record = {"ID": 3, "Name": "Alice Brown", "Phone Number": "1-773-1112222"}
@@ -70,6 +127,14 @@ class TestClientRecord(unittest.TestCase):
         self.assertIsNotNone(record)
         self.assertEqual(record["Name"], "John Doe")
 
+    def test_search_after_external_change(self):
+        """Test that the ID index is rebuilt when the file is changed externally."""
+        self.assertIsNotNone(ClientRecord.search(1))
+        with open(self.test_client_file, "w") as f:
+            json.dump([{"ID": 5, "Name": "Alice Brown", "Phone Number": "1-773-1112222"}], f, indent=4)
+        self.assertIsNone(ClientRecord.search(1))
+        self.assertEqual(ClientRecord.search(5)["Name"], "Alice Brown")
+
     def test_generate_id(self):
         """Test generating a unique client ID."""
         new_id = ClientRecord.generate_id()
@@ -96,11 +161,37 @@ class TestClientRecord(unittest.TestCase):
         records = ClientRecord.load_all()
         self.assertNotIn({"ID": 1, "Name": "John Doe", "Phone Number": "1-773-5435432"}, records)
 
+    def test_delete_restricted_by_flights(self):
+        """Test that a client with flights is kept when ON_DELETE is "restrict"."""
+        with patch("record.client.ON_DELETE", "restrict"), patch.object(FlightRecord, "references", return_value=1):
+            with self.assertRaises(ValueError):
+                ClientRecord.delete(1)
+        self.assertIsNotNone(ClientRecord.search(1))
+
+    def test_delete_cascades_to_flights(self):
+        """Test that the flights of a client are deleted with it when ON_DELETE is "cascade"."""
+        with patch("record.client.ON_DELETE", "cascade"), patch.object(FlightRecord, "delete_references", return_value=0) as delete_references:
+            self.assertTrue(ClientRecord.delete(1))
+        delete_references.assert_called_once_with("Client_ID", [1])
+        self.assertIsNone(ClientRecord.search(1))
+
     def test_is_duplicate_phone(self):
         """Test checking for duplicate phone numbers."""
         self.assertTrue(ClientRecord.is_duplicate_phone("1-773-5435432"))
         self.assertFalse(ClientRecord.is_duplicate_phone("1-773-1112222"))
 
+    def test_is_duplicate_phone_ignores_formatting(self):
+        """Test that phone numbers differing only in formatting are duplicates."""
+        self.assertTrue(ClientRecord.is_duplicate_phone("1 773 543 5432"))
+        self.assertFalse(ClientRecord.is_duplicate_phone("1-773-5435432", client_id=1))
+
+    def test_update_with_duplicate_phone(self):
+        """Test updating a client to another client's phone number."""
+        with self.assertRaises(ValueError):
+            ClientRecord.update(1, {"Name": "John Doe", "Phone Number": "1-312-6546543"})
+        # Keeping a client's own number is not a duplicate
+        self.assertTrue(ClientRecord.update(1, {"Name": "John Doe", "Phone Number": "1-773-5435432"}))
+
     def test_create_with_invalid_phone(self):
         """Test creating a client record with an invalid phone number."""
         invalid_record = {"ID": 4, "Name": "Bob Martin", "Phone Number": "17735435432"}
@@ -113,5 +204,57 @@ class TestClientRecord(unittest.TestCase):
         with self.assertRaises(ValueError):
             ClientRecord.create(duplicate_record)
 
+    def test_create_many(self):
+        """Test creating many client records, with per-record errors."""
+        ids, errors = ClientRecord.create_many([
+            {"Name": "Alice Brown", "Phone Number": "1-773-1112222"},
+            {"Name": "Bob Martin", "Phone Number": "17735435432"},
+            {"Name": "Carol White", "Phone Number": "1 773 111 2222"},
+            {"Name": "Dan Green", "Phone Number": "1-773-3334444"}
+        ])
+        self.assertEqual(ids, [3, 4])
+        self.assertEqual([position for position, _ in errors], [1, 2])
+        self.assertEqual(ClientRecord.search(4)["Name"], "Dan Green")
+
+    def test_concurrent_creates_keep_phones_unique(self):
+        """Test that threads creating clients with the same phone numbers cannot both pass the duplicate check."""
+        phones = [f"1-555-{number:07d}" for number in range(150)]
+        created = []
+
+        def create_all():
+            for phone in phones:
+                try:
+                    created.append(ClientRecord.create({"Name": "Thread Client", "Phone Number": phone}))
+                except ValueError:
+                    pass
+
+        threads = [threading.Thread(target=create_all) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        records = ClientRecord.load_all()
+        self.assertEqual(len(created), 150)
+        self.assertEqual(len(records), 152)
+        self.assertEqual(len({record["Phone Number"] for record in records}), 152)
+
+    def test_update_many(self):
+        """Test updating many client records, with per-record errors."""
+        ids, errors = ClientRecord.update_many([
+            (1, {"Name": "Johnathan Doe", "Phone Number": "1-773-9998888"}),
+            (2, {"Name": "Jane Smith", "Phone Number": "1-773-5435432"}),
+            (9, {"Name": "Nobody", "Phone Number": "1-773-1112222"})
+        ])
+        self.assertEqual(ids, [1, 2])
+        self.assertEqual(errors, [(2, "No client found with the given ID.")])
+        self.assertEqual(ClientRecord.search(2)["Phone Number"], "1-773-5435432")
+
+    def test_delete_many(self):
+        """Test deleting many client records."""
+        ids, errors = ClientRecord.delete_many([1, 9, 2])
+        self.assertEqual(ids, [1, 2])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(ClientRecord.load_all(), [])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -3,12 +3,17 @@ import os
 import json
 from datetime import datetime
 import sys
+import tempfile
+from unittest.mock import patch
 import os
 
 # Add the src directory to the system path dynamically
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 from record.flight import FlightRecord  # Import FlightRecord class
+from record.client import ClientRecord  # Import the client records flights refer to
+from record.airline import AirlineRecord  # Import the airline records flights refer to
+from record.sequence import IdSequence  # Import the ID sequence, to give each test a fresh one
 from conf.config import FLIGHT_FILE  # Import configuration
 
 # Add the 'src' directory to the Python path
@@ -38,10 +43,17 @@ class TestFlightRecord(unittest.TestCase):
         with open(self.test_flight_file, "w") as f:
             json.dump(self.test_data, f, indent=4)
 
+        # Hand out IDs from a fresh sequence file, so earlier runs do not affect the IDs
+        self.sequence_dir = tempfile.TemporaryDirectory()
+        self.original_sequence = FlightRecord.sequence
+        FlightRecord.sequence = IdSequence(os.path.join(self.sequence_dir.name, "flights.seq"))
+
     def tearDown(self):
         """
         Clean up the test environment by restoring the original file contents.
         """
+        FlightRecord.sequence = self.original_sequence
+        self.sequence_dir.cleanup()
         if self.original_data is not None:
             with open(self.test_flight_file, "w") as f:
                 f.write(self.original_data)
@@ -54,6 +66,14 @@ class TestFlightRecord(unittest.TestCase):
         self.assertEqual(len(records), len(self.test_data))
         self.assertEqual(records[0]["Flight_ID"], 1)
 
+    def test_page_sorted_index_follows_changes(self):
+        """Test that sorted pages stay in order as flights are created and deleted."""
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.page(0, 5, sort_by="Date/Time", descending=True).records], [2, 1])
+        FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-01 08:00"})
+        FlightRecord.delete(2)
+        page = FlightRecord.page(0, 5, sort_by="Date/Time")
+        self.assertEqual((page.total, [record["Flight_ID"] for record in page.records]), (2, [3, 1]))
+
     def test_save_all(self):
         """Test saving all flight records."""
         new_record = {"Flight_ID": 3, "Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-20 10:00", "Start_City": "Paris", "End_City": "Berlin"}
@@ -86,6 +106,28 @@ class TestFlightRecord(unittest.TestCase):
         self.assertTrue(FlightRecord.is_valid_date_time("2023-12-20 10:00"))
         self.assertFalse(FlightRecord.is_valid_date_time("2023-12-20"))
 
+    def test_is_duplicate_flight(self):
+        """Test checking for duplicate flights by Client ID, Airline ID and Date/Time."""
+        self.assertTrue(FlightRecord.is_duplicate_flight(101, 201, "2023-12-15 12:00"))
+        self.assertFalse(FlightRecord.is_duplicate_flight(101, 201, "2023-12-15 13:00"))
+
+    def test_create_duplicate_flight(self):
+        """Test that create rejects a duplicate flight."""
+        duplicate_record = {"Flight_ID": 3, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00", "Start_City": "Paris", "End_City": "Berlin"}
+        with self.assertRaises(ValueError):
+            FlightRecord.create(duplicate_record)
+
+    def test_update_to_duplicate_flight(self):
+        """Test that update rejects changes that duplicate another flight."""
+        with self.assertRaises(ValueError):
+            FlightRecord.update(2, {"Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00"})
+
+    def test_update_to_taken_id(self):
+        """Test that update rejects changing the Flight_ID to the ID of another flight."""
+        with self.assertRaises(ValueError):
+            FlightRecord.update(1, {"Flight_ID": 2, "Date/Time": "2023-12-15 12:00"})
+        self.assertEqual(FlightRecord.search(2)["Client_ID"], 102)
+
     def test_update(self):
         """Test updating an existing flight record."""
         updated_data = {"Date/Time": "2023-12-18 18:00", "Start_City": "San Francisco"}
@@ -102,5 +144,104 @@ class TestFlightRecord(unittest.TestCase):
         records = FlightRecord.load_all()
         self.assertNotIn({"Flight_ID": 1}, records)
 
+    def test_create_many(self):
+        """Test creating many flight records with duplicates inside the batch."""
+        new_flight = {"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-20 10:00", "Start_City": "Paris", "End_City": "Berlin"}
+        ids, errors = FlightRecord.create_many([new_flight, dict(new_flight), dict(new_flight, **{"Date/Time": "2023-12-20"})])
+        self.assertEqual(ids, [3])
+        self.assertEqual([position for position, _ in errors], [1, 2])
+        self.assertEqual(len(FlightRecord.load_all()), 3)
+
+    def test_create_many_explicit_ids(self):
+        """Test that explicit Flight_IDs already stored, repeated in the batch or not integers are rejected one by one."""
+        ids, errors = FlightRecord.create_many([
+            {"Flight_ID": 1, "Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-20 10:00"},
+            {"Flight_ID": 7, "Client_ID": 104, "Airline_ID": 203, "Date/Time": "2023-12-20 11:00"},
+            {"Flight_ID": 7, "Client_ID": 105, "Airline_ID": 203, "Date/Time": "2023-12-20 12:00"},
+            {"Flight_ID": "abc", "Client_ID": 106, "Airline_ID": 203, "Date/Time": "2023-12-20 13:00"},
+            {"Client_ID": 107, "Airline_ID": 203, "Date/Time": "2023-12-20 14:00"}
+        ])
+        self.assertEqual(ids, [7, 8])
+        self.assertEqual(errors, [
+            (0, "Duplicate Flight_ID detected."),
+            (2, "Duplicate Flight_ID detected."),
+            (3, "Invalid Flight_ID: IDs must be positive integers.")
+        ])
+        self.assertEqual(sorted(record["Flight_ID"] for record in FlightRecord.load_all()), [1, 2, 7, 8])
+        with self.assertRaises(ValueError):
+            FlightRecord.create({"Flight_ID": "abc", "Client_ID": 108, "Airline_ID": 203, "Date/Time": "2023-12-21 10:00"})
+
+    def test_query(self):
+        """Test filtering flights through the flight columns, including after an update."""
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.query(airline_id=202)], [2])
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.query(start="2023-12-16 00:00")], [2])
+        FlightRecord.update(1, {"Date/Time": "2023-12-17 09:00", "Airline_ID": 202})
+        self.assertEqual(FlightRecord.count_by("Airline_ID"), {202: 2})
+        self.assertEqual(len(FlightRecord.query(airline_id=202, start="2023-12-16 00:00", end="2023-12-17 09:00")), 2)
+        with self.assertRaises(ValueError):
+            FlightRecord.query(start="2023-12-16")
+
+    def test_find_by_client_and_airline(self):
+        """Test finding flights by client and by airline, including after changes."""
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_by_client(101)], [1])
+        FlightRecord.create({"Flight_ID": 3, "Client_ID": 101, "Airline_ID": 202, "Date/Time": "2023-12-20 10:00"})
+        FlightRecord.delete(2)
+        self.assertEqual(sorted(record["Flight_ID"] for record in FlightRecord.find_by_client(101)), [1, 3])
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_by_airline(202)], [3])
+        self.assertEqual(FlightRecord.find_by_client(102), [])
+
+    def test_find_between(self):
+        """Test finding flights in a date range, in time order."""
+        FlightRecord.create({"Flight_ID": 3, "Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-14 08:00"})
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_between("2023-12-14 00:00", "2023-12-15 12:00")], [3, 1])
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_between(None, None, limit=2)], [3, 1])
+        self.assertEqual(FlightRecord.find_between("2024-01-01 00:00", None), [])
+        with self.assertRaises(ValueError):
+            FlightRecord.find_between("2023-12-14", None)
+
+    def test_dates_without_leading_zeros(self):
+        """Test that dates without leading zeros are saved zero-padded, so date range searches find them."""
+        flight_id = FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2026-1-5 9:05"})
+        self.assertEqual(FlightRecord.search(flight_id)["Date/Time"], "2026-01-05 09:05")
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_between("2026-01-01 00:00", "2026-01-31 00:00")], [flight_id])
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.query(start="2026-01-01 00:00", end="2026-01-31 00:00")], [flight_id])
+        FlightRecord.update(1, {"Date/Time": "2026-1-6 7:00"})
+        self.assertEqual(FlightRecord.search(1)["Date/Time"], "2026-01-06 07:00")
+        self.assertEqual(len(FlightRecord.find_between("2026-01-01 00:00", "2026-01-31 00:00")), 2)
+        with self.assertRaises(ValueError):
+            FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2026-1-5 9:05"})
+
+    def test_bounds_without_leading_zeros(self):
+        """Test that date range searches accept bounds without leading zeros, like create and update."""
+        flight_id = FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2026-01-05 09:05"})
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.find_between("2026-1-1 0:00", "2026-1-31 0:00")], [flight_id])
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.query(start="2026-1-5 9:05", end="2026-1-5 9:05")], [flight_id])
+        with self.assertRaises(ValueError):
+            FlightRecord.find_between("2026-1-32 0:00", None)
+
+    def test_delete_references(self):
+        """Test counting and deleting the flights of a client."""
+        FlightRecord.create({"Client_ID": 101, "Airline_ID": 202, "Date/Time": "2023-12-17 09:00"})
+        self.assertEqual(FlightRecord.references("Client_ID", 101), 2)
+        self.assertEqual(FlightRecord.delete_references("Client_ID", [101, 999]), 2)
+        self.assertEqual(FlightRecord.references("Client_ID", 101), 0)
+        self.assertEqual([record["Flight_ID"] for record in FlightRecord.load_all()], [2])
+        with self.assertRaises(ValueError):
+            FlightRecord.references("Date/Time", 101)
+
+    def test_check_references(self):
+        """Test that flights must refer to an existing client and airline when CHECK_FLIGHT_REFERENCES is set."""
+        flight = {"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-20 10:00"}
+        with patch("record.flight.CHECK_FLIGHT_REFERENCES", True), \
+                patch.object(ClientRecord, "exists", return_value=False), \
+                patch.object(AirlineRecord, "exists", return_value=True):
+            with self.assertRaisesRegex(ValueError, "No client found"):
+                FlightRecord.create(flight)
+            with self.assertRaisesRegex(ValueError, "No client found"):
+                FlightRecord.update(1, flight)
+            # Fields that are not changed are not checked
+            self.assertTrue(FlightRecord.update(1, {"Airline_ID": 203, "Date/Time": "2023-12-15 12:00"}))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import unittest
+import os
+import io
+import sys
+import json
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from import_export import read_rows, to_record, detect_format, import_records  # Import the import/export helpers
+from record.cache import RecordCache  # Import the cache, to drop the temporary flight file afterwards
+from record.flight import FlightRecord  # Import the flight records the feed is imported into
+from record.sequence import IdSequence  # Import the ID sequence, to give each test a fresh one
+
+
+class TestImportExport(unittest.TestCase):
+    """Unit tests for the import/export command-line helpers."""
+
+    def test_detect_format(self):
+        """Test detecting the file format from the extension."""
+        self.assertEqual(detect_format("feed.CSV", None), "csv")
+        self.assertEqual(detect_format("feed.ndjson", None), "ndjson")
+        self.assertEqual(detect_format("feed.txt", "csv"), "csv")
+
+    def test_read_csv_rows(self):
+        """Test reading CSV rows with their line numbers."""
+        f = io.StringIO("Client_ID,Airline_ID\n1,2\n3,4\n")
+        rows = list(read_rows(f, "csv"))
+        self.assertEqual(rows, [(2, {"Client_ID": "1", "Airline_ID": "2"}), (3, {"Client_ID": "3", "Airline_ID": "4"})])
+
+    def test_read_ndjson_rows(self):
+        """Test reading NDJSON rows, including a line that cannot be parsed."""
+        f = io.StringIO('{"ID": 1}\n\n{broken\n')
+        rows = list(read_rows(f, "ndjson"))
+        self.assertEqual(rows[0], (1, {"ID": 1}))
+        self.assertEqual(rows[1][0], 3)
+        with self.assertRaises(ValueError):
+            to_record(rows[1][1], ["ID"])
+
+    def test_to_record(self):
+        """Test converting integer fields and leaving out empty IDs."""
+        record = to_record({"Flight_ID": "", "Client_ID": "7", "Date/Time": "2023-12-20 10:00"}, ["Flight_ID", "Client_ID"])
+        self.assertEqual(record, {"Client_ID": 7, "Date/Time": "2023-12-20 10:00"})
+        with self.assertRaises(ValueError):
+            to_record({"Client_ID": "seven"}, ["Client_ID"])
+
+
+
+class TestImportRecords(unittest.TestCase):
+    """End-to-end tests of importing a flight feed whose IDs overlap the stored flights."""
+
+    def setUp(self):
+        """
+        Set up the test environment with a flight file holding flights 1 and 2, and a feed reusing their IDs.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.flight_file = os.path.join(self.temp_dir.name, "flights.json")
+        self.feed = os.path.join(self.temp_dir.name, "feed.ndjson")
+        stored = [
+            {"Flight_ID": 1, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00"},
+            {"Flight_ID": 2, "Client_ID": 102, "Airline_ID": 202, "Date/Time": "2023-12-16 15:30"}
+        ]
+        with open(self.flight_file, "w") as f:
+            json.dump(stored, f, indent=4)
+        feed = [
+            {"Flight_ID": 2, "Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-20 10:00"},
+            {"Flight_ID": 5, "Client_ID": 104, "Airline_ID": 203, "Date/Time": "2023-12-20 11:00"},
+            {"Flight_ID": 5, "Client_ID": 105, "Airline_ID": 203, "Date/Time": "2023-12-20 12:00"},
+            {"Client_ID": 106, "Airline_ID": 203, "Date/Time": "2023-12-20 13:00"}
+        ]
+        with open(self.feed, "w") as f:
+            f.write("".join(json.dumps(row) + "\n" for row in feed))
+        patches = [
+            patch("record.flight.FLIGHT_FILE", self.flight_file),
+            patch.object(FlightRecord, "sequence", IdSequence(os.path.join(self.temp_dir.name, "flights.seq")))
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        """
+        Clean up the test environment by removing the temporary files.
+        """
+        RecordCache.invalidate(self.flight_file)
+        self.temp_dir.cleanup()
+
+    def stored_ids(self):
+        return sorted(record["Flight_ID"] for record in FlightRecord.iter_all())
+
+    def test_rejects_overlapping_ids(self):
+        """Test that rows reusing a stored ID or an earlier row's ID are rejected, and the stored flights kept."""
+        out = io.StringIO()
+        self.assertEqual(import_records("flights", self.feed, chunk_size=2, out=out), (2, 2))
+        self.assertIn("Line 1: rejected (Duplicate Flight_ID detected.)", out.getvalue())
+        self.assertIn("Line 3: rejected (Duplicate Flight_ID detected.)", out.getvalue())
+        self.assertEqual(self.stored_ids(), [1, 2, 5, 6])
+        self.assertEqual(FlightRecord.search(2)["Client_ID"], 102)
+
+    def test_renumbers_overlapping_ids(self):
+        """Test that rows reusing an ID are imported under new IDs when renumbering."""
+        out = io.StringIO()
+        self.assertEqual(import_records("flights", self.feed, chunk_size=2, out=out, on_conflict="renumber"), (4, 0))
+        self.assertIn("Line 1: Flight_ID 2 already taken", out.getvalue())
+        self.assertEqual(self.stored_ids(), [1, 2, 5, 6, 7, 8])
+        self.assertEqual(FlightRecord.search(2)["Client_ID"], 102)
+        self.assertEqual(FlightRecord.search(5)["Client_ID"], 104)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import json
+import sys
+import asyncio
+import tempfile
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.background import AsyncClientRecord, as_awaitable  # Import the asynchronous facades
+from record.client import ClientRecord  # Import ClientRecord, to give it a fresh ID sequence
+from record.sequence import IdSequence  # Import the ID sequence, to give each test a fresh one
+from gui.tasks import run_in_background  # Import the Tk integration of background calls
+from conf.config import CLIENT_FILE  # Import the client data file path
+
+
+class FakeWindow:
+    """A stand-in for a Tk window that runs after() callbacks when asked."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def run_pending(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+
+class TestRecordBackground(unittest.TestCase):
+    """Unit tests for the asynchronous record facades."""
+
+    def setUp(self):
+        """
+        Set up the test environment by writing a client data file.
+        """
+        with open(CLIENT_FILE, "r") as f:
+            self.original_data = f.read()
+        with open(CLIENT_FILE, "w") as f:
+            json.dump([{"ID": 1, "Name": "John Doe", "Phone Number": "1-773-5435432"}], f, indent=4)
+        self.sequence_dir = tempfile.TemporaryDirectory()
+        self.original_sequence = ClientRecord.sequence
+        ClientRecord.sequence = IdSequence(os.path.join(self.sequence_dir.name, "clients.seq"))
+
+    def tearDown(self):
+        """
+        Clean up the test environment by restoring the original file contents.
+        """
+        ClientRecord.sequence = self.original_sequence
+        self.sequence_dir.cleanup()
+        with open(CLIENT_FILE, "w") as f:
+            f.write(self.original_data)
+
+    def test_calls_run_in_order(self):
+        """Test that a search made after a save sees the saved record."""
+        created = AsyncClientRecord.create({"Name": "Jane Smith", "Phone Number": "1-312-6546543"})
+        found = AsyncClientRecord.search(2)
+        self.assertEqual(created.result(5), 2)
+        self.assertEqual(found.result(5)["Name"], "Jane Smith")
+        self.assertFalse(hasattr(AsyncClientRecord, "iter_all"))
+
+    def test_errors_are_raised_by_result(self):
+        """Test that validation errors reach the caller."""
+        future = AsyncClientRecord.create({"Name": "Jane Smith", "Phone Number": "1-773-5435432"})
+        with self.assertRaises(ValueError):
+            future.result(5)
+
+    def test_await(self):
+        """Test that facade calls can be awaited in asyncio code."""
+        async def search():
+            return await as_awaitable(AsyncClientRecord.search(1))
+
+        self.assertEqual(asyncio.run(search())["Name"], "John Doe")
+
+    def test_run_in_background(self):
+        """Test that results and errors are delivered through the window's after() callbacks."""
+        window = FakeWindow()
+        results, errors = [], []
+        future = AsyncClientRecord.search(1)
+        run_in_background(window, future, results.append, errors.append)
+        future.result(5)
+        self.assertEqual(results, [])  # Nothing is delivered outside the Tk event loop
+        window.run_pending()
+        self.assertEqual(results[0]["Name"], "John Doe")
+
+        run_in_background(window, AsyncClientRecord.create({"Phone Number": "invalid"}), results.append, errors.append)
+        while window.callbacks:
+            window.run_pending()
+        self.assertIsInstance(errors[0], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import os
+import json
+import multiprocessing
+import sys
+import tempfile
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import RecordCache  # Import the shared record cache
+from record.index import PrimaryIndex, UniqueIndex  # Import the indexes kept up to date by the cache
+from record.locking import fcntl  # Import fcntl as the locking module found it, to skip the process tests without it
+from record.storage import LogStorage  # Import the log engine shared by the processes
+
+
+def create_unique_names(path, worker, names):
+    """
+    Insert records with the given names through the log engine, as a separate application
+    would, skipping names another record already has.
+
+    Args:
+        path (str): The path of the data file.
+        worker (int): The number of the process, used to make the IDs unique.
+        names (list): The names to insert.
+    """
+    # A small threshold, so the processes compact the log while the others append to it
+    RecordCache.storage = LogStorage(threshold=2000)
+    RecordCache.invalidate()
+    for number, name in enumerate(names):
+        entry = RecordCache.open(path)
+        with entry.lock:
+            if name in entry.index("Name", lambda: UniqueIndex(lambda record: record.get("Name"))):
+                continue
+            entry.insert({"ID": 100 + worker * len(names) + number, "Name": name})
+            try:
+                RecordCache.commit(entry)
+            except ValueError:
+                # Another process saved the name first
+                pass
+    RecordCache.storage.wait()
+
+
+class TestRecordCache(unittest.TestCase):
+    """Unit tests for the RecordCache class."""
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a temporary data file.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.test_file = os.path.join(self.temp_dir.name, "records.json")
+        self.test_data = [
+            {"ID": 1, "Name": "John Doe"},
+            {"ID": 2, "Name": "Jane Smith"}
+        ]
+        with open(self.test_file, "w") as f:
+            json.dump(self.test_data, f, indent=4)
+
+    def tearDown(self):
+        """
+        Clean up the test environment by removing the temporary data file.
+        """
+        RecordCache.invalidate(self.test_file)
+        self.temp_dir.cleanup()
+
+    def test_load_is_cached(self):
+        """Test that an unchanged file is served from the cache."""
+        first = RecordCache.load(self.test_file)
+        second = RecordCache.load(self.test_file)
+        self.assertIs(first, second)
+        self.assertEqual(first, self.test_data)
+
+    def test_external_change_is_detected(self):
+        """Test that a file rewritten by someone else is parsed again."""
+        RecordCache.load(self.test_file)
+        with open(self.test_file, "w") as f:
+            json.dump([{"ID": 3, "Name": "Alice Brown"}], f, indent=4)
+        records = RecordCache.load(self.test_file)
+        self.assertEqual(records, [{"ID": 3, "Name": "Alice Brown"}])
+
+    def test_save_updates_cache(self):
+        """Test that saved records become the cached records."""
+        new_records = [{"ID": 3, "Name": "Alice Brown"}]
+        RecordCache.save(self.test_file, new_records)
+        self.assertIs(RecordCache.load(self.test_file), new_records)
+        with open(self.test_file, "r") as f:
+            self.assertEqual(json.load(f), new_records)
+
+    def test_delete_many(self):
+        """Test that several records are deleted in one pass, keeping the ID index in step."""
+        RecordCache.save(self.test_file, self.test_data + [{"ID": 3, "Name": "Alice Brown"}])
+        entry = RecordCache.open(self.test_file)
+        ids = entry.index("ID", lambda: PrimaryIndex("ID"))
+        entry.delete_many([2, 0])
+        self.assertEqual([record["ID"] for record in entry.records], [2])
+        self.assertEqual(ids.position(2), 0)
+        self.assertIsNone(ids.position(1))
+
+    def test_commit_keeps_changes_saved_by_another_process(self):
+        """Test that committing an outdated entry replays its changes instead of losing the other save."""
+        entry = RecordCache.open(self.test_file)
+        entry.insert({"ID": 3, "Name": "Alice Brown"})
+        entry.update(0, {"Name": "Johnathan Doe"})
+        # Another process saves the file meanwhile
+        with open(self.test_file, "w") as f:
+            json.dump(self.test_data + [{"ID": 4, "Name": "Bob White"}], f)
+        RecordCache.commit(entry)
+        with open(self.test_file, "r") as f:
+            names = [record["Name"] for record in json.load(f)]
+        self.assertEqual(names, ["Johnathan Doe", "Jane Smith", "Bob White", "Alice Brown"])
+
+    def test_replay_rejects_unique_conflicts(self):
+        """Test that a replayed change breaking a unique index of the current records is rejected."""
+        entry = RecordCache.open(self.test_file)
+        names = entry.index("Name", lambda: UniqueIndex(lambda record: record.get("Name")))
+        self.assertNotIn("Alice Brown", names)
+        entry.insert({"ID": 3, "Name": "Alice Brown"})
+        # Another process saves a record with the same name meanwhile
+        with open(self.test_file, "w") as f:
+            json.dump(self.test_data + [{"ID": 4, "Name": "Alice Brown"}], f)
+        with self.assertRaises(ValueError):
+            RecordCache.commit(entry)
+        with open(self.test_file, "r") as f:
+            self.assertEqual([record["ID"] for record in json.load(f)], [1, 2, 4])
+        # Renaming a record to its own name is not a conflict
+        entry = RecordCache.open(self.test_file)
+        entry.index("Name", lambda: UniqueIndex(lambda record: record.get("Name")))
+        entry.update(0, {"Name": "John Doe"})
+        with open(self.test_file, "w") as f:
+            json.dump(self.test_data + [{"ID": 5, "Name": "Bob White"}], f)
+        RecordCache.commit(entry)
+
+    @unittest.skipIf(fcntl is None or "fork" not in multiprocessing.get_all_start_methods(), "fcntl or fork is not available")
+    def test_log_engine_between_processes(self):
+        """Test that processes saving the same names through the log engine keep every name once."""
+        names = [f"Client {number}" for number in range(60)]
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=create_unique_names, args=(self.test_file, worker, names)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        records = LogStorage().read(self.test_file)
+        self.assertEqual(sorted(record["Name"] for record in records), sorted(names + ["John Doe", "Jane Smith"]))
+        self.assertEqual(len({record["ID"] for record in records}), len(records))
+
+    def test_missing_file(self):
+        """Test that a missing file loads as an empty list."""
+        os.remove(self.test_file)
+        self.assertEqual(RecordCache.load(self.test_file), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import CachedFile  # Import the cache entry that maintains indexes
+from record.columns import FlightColumns, to_minutes, from_minutes  # Import the columnar flight index
+
+
+class TestFlightColumns(unittest.TestCase):
+    """Unit tests for the FlightColumns class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a few flights and their columns.
+        """
+        self.records = [
+            {"Flight_ID": 1, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00", "Start City": "New York", "End City": "London"},
+            {"Flight_ID": 2, "Client_ID": 102, "Airline_ID": 202, "Date/Time": "2023-12-16 15:30", "Start City": "London", "End City": "Tokyo"},
+            {"Flight_ID": 3, "Client_ID": 101, "Airline_ID": 202, "Date/Time": "2023-12-17 08:00", "Start City": "Tokyo", "End City": "London"}
+        ]
+        self.entry = CachedFile("records.json", None, [dict(record) for record in self.records])
+        self.columns = self.entry.index("Columns", FlightColumns)
+
+    def test_minutes(self):
+        """Test converting dates and times to and from minutes since the epoch."""
+        self.assertEqual(to_minutes("1970-01-02 00:01"), 1441)
+        self.assertEqual(from_minutes(to_minutes("2024-02-29 23:59")), "2024-02-29 23:59")
+        self.assertIsNone(to_minutes("2023-02-30 10:00"))
+        self.assertIsNone(to_minutes("2023-12-20"))
+
+    def test_columns(self):
+        """Test that each field is held in its own column, with dates as minutes and cities as codes."""
+        self.assertEqual(list(self.columns.flight_ids), [1, 2, 3])
+        self.assertEqual(list(self.columns.minutes), [to_minutes(record["Date/Time"]) for record in self.records])
+        self.assertEqual(self.columns.cities, ["New York", "London", "Tokyo"])
+        self.assertEqual(list(self.columns.start_cities), [0, 1, 2])
+        self.assertEqual(list(self.columns.end_cities), [1, 2, 1])
+
+    def test_select(self):
+        """Test filtering rows by several conditions."""
+        self.assertEqual(self.columns.select(client_id=101), [0, 2])
+        self.assertEqual(self.columns.select(client_id=101, end_city="London", start=to_minutes("2023-12-16 00:00")), [2])
+        self.assertEqual(self.columns.select(start_city="Paris"), [])
+
+    def test_follows_cache_changes(self):
+        """Test that updates and deletes made through the cache entry reach the columns."""
+        self.entry.update(0, {"Airline_ID": 202})
+        self.entry.delete(1)
+        self.assertEqual(self.columns.count_by("Airline_ID"), {202: 2})
+        self.assertEqual(self.columns.count_by("End City"), {"London": 2})
+        self.assertEqual(list(self.columns.flight_ids), [1, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,345 @@
+import unittest
+import os
+import json
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import CachedFile, RecordCache  # Import the cache whose changes are committed to the flight file
+from record.flight import FlightRecord  # Import the flight records, to search and update through the flight file
+from record.columns import MISSING  # Import the value of missing fields in the columns
+from record.flight_file import FlightFile, MappedFlightStorage, HEADER_SIZE, ROW, row_key  # Import the memory-mapped flight file
+from record.sequence import IdSequence  # Import the ID sequence, kept next to the test flight file
+from record.storage import JsonStorage  # Import the JSON engine the flights are imported from
+
+
+class TestFlightFile(unittest.TestCase):
+    """Unit tests for the FlightFile class."""
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a flight file with a few flights.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "flights.json.bin")
+        self.records = [
+            {"Flight_ID": 1, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00", "Start City": "New York", "End City": "London"},
+            {"Flight_ID": 2, "Client_ID": 102, "Airline_ID": 202, "Date/Time": "2023-12-16 15:30", "Start City": "London", "End City": "Tokyo"},
+            {"Flight_ID": 4, "Client_ID": 101}
+        ]
+        self.flights = FlightFile.create(self.path, self.records)
+
+    def tearDown(self):
+        """
+        Clean up the test environment by closing and removing the flight file.
+        """
+        self.flights.close()
+        self.temp_dir.cleanup()
+
+    def test_fixed_width_rows(self):
+        """Test that each flight takes one row, addressed by its ID."""
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 4 * ROW.size)
+        self.assertEqual(len(self.flights), 3)
+        self.assertEqual(self.flights.cities, ["New York", "London", "Tokyo"])
+
+    def test_get(self):
+        """Test reading single flights by ID, including missing ones."""
+        self.assertEqual(self.flights.get(2), self.records[1])
+        self.assertEqual(self.flights.get(4), {"Flight_ID": 4, "Client_ID": 101})
+        for flight_id in (3, 5, 1000, 0, -1, "1"):
+            self.assertIsNone(self.flights.get(flight_id))
+        self.assertEqual(list(self.flights), self.records)
+
+    def test_put_and_remove(self):
+        """Test updating a row in place, adding a flight past the end of the file and removing one."""
+        self.flights.put(dict(self.records[0], **{"End City": "Paris"}))
+        self.flights.put({"Flight_ID": 5000, "Client_ID": 103, "Start City": "Paris"})
+        self.assertTrue(self.flights.remove(2))
+        self.assertFalse(self.flights.remove(2))
+        self.assertEqual(self.flights.get(1)["End City"], "Paris")
+        self.assertEqual(self.flights.get(5000), {"Flight_ID": 5000, "Client_ID": 103, "Start City": "Paris"})
+        self.assertIsNone(self.flights.get(2))
+        self.assertEqual([record["Flight_ID"] for record in self.flights], [1, 4, 5000])
+        self.assertEqual(len(self.flights), 3)
+
+    def test_other_process_sees_changes(self):
+        """Test that a second mapping of the file sees changed rows, new cities and growth."""
+        other = FlightFile(self.path)
+        try:
+            self.flights.put({"Flight_ID": 3000, "Start City": "Rome"})
+            self.flights.put(dict(self.records[1], **{"Client_ID": 999}))
+            self.assertEqual(other.get(3000), {"Flight_ID": 3000, "Start City": "Rome"})
+            self.assertEqual(other.get(2)["Client_ID"], 999)
+        finally:
+            other.close()
+
+    def test_rejects_unstorable_flights(self):
+        """Test that flights which do not fit a fixed-width row are rejected instead of truncated."""
+        for record in (
+            {"Flight_ID": 0},
+            {"Flight_ID": "7"},
+            {"Flight_ID": 7, "Notes": "Window seat"},
+            {"Flight_ID": 7, "Date/Time": "tomorrow"},
+            {"Flight_ID": 7, "Client_ID": "101"},
+            {"Flight_ID": 10 ** 12},
+        ):
+            with self.assertRaises(ValueError):
+                self.flights.put(record)
+        self.assertEqual(list(self.flights), self.records)
+
+    def test_columns(self):
+        """Test that the columns hold one row per Flight_ID and follow changes made here and by other processes."""
+        columns = self.flights.columns()
+        self.assertEqual(list(columns.flight_ids), [1, 2, MISSING, 4])
+        self.assertEqual(columns.select(client_id=101), [0, 3])
+        self.assertEqual(columns.count_by("End City"), {"London": 1, "Tokyo": 1})
+        self.flights.put({"Flight_ID": 6, "Client_ID": 101, "End City": "Paris"})
+        self.flights.remove(1)
+        self.flights.bump()
+        self.assertIs(self.flights.columns(), columns)
+        self.assertEqual(columns.select(client_id=101), [3, 5])
+        self.assertEqual(columns.count_by("End City"), {"Tokyo": 1, "Paris": 1})
+        other = FlightFile(self.path)
+        try:
+            other.put({"Flight_ID": 2, "Client_ID": 101, "Start City": "Rome"})
+            other.bump()
+        finally:
+            other.close()
+        self.assertEqual(self.flights.columns().select(client_id=101, start_city="Rome"), [1])
+
+    def test_columns_use_less_memory(self):
+        """Test that the columns of many flights take a fraction of the memory of the cached records."""
+        cities = ["New York", "London", "Tokyo", "Paris", "Rome", "Berlin"]
+        records = [
+            {"Flight_ID": number, "Client_ID": number % 500 + 1, "Airline_ID": number % 40 + 1,
+             "Date/Time": f"2024-{number % 12 + 1:02d}-{number % 28 + 1:02d} {number % 24:02d}:{number % 60:02d}",
+             "Start City": cities[number % 6], "End City": cities[(number + 1) % 6]}
+            for number in range(1, 20001)
+        ]
+        text = json.dumps(records)
+        self.flights.close()
+        self.flights = FlightFile.create(self.path, records)
+        tracemalloc.start()
+        try:
+            entry = CachedFile(os.path.join(self.temp_dir.name, "flights.json"), None, json.loads(text))
+            records_size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.clear_traces()
+            columns = self.flights.columns()
+            columns_size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(columns), len(entry.records))
+        self.assertLess(columns_size * 4, records_size)
+
+    def test_key_index(self):
+        """Test that the key index follows changed rows and is rebuilt when missing or out of date."""
+        key = row_key(self.records[0])
+        self.assertEqual(self.flights.find_key(key), [1])
+        self.assertEqual(self.flights.find_key(row_key({"Client_ID": 101})), [4])
+        self.flights.put(dict(self.records[0], **{"Flight_ID": 7}))
+        self.flights.put(dict(self.records[1], **{"Client_ID": 103}))
+        self.assertTrue(self.flights.remove(1))
+        self.flights.bump()
+        self.assertEqual(self.flights.find_key(key), [7])
+        self.assertEqual(self.flights.find_key(row_key(self.records[1])), [])
+        # A missing index is rebuilt from the rows
+        self.flights.close()
+        os.remove(self.path + ".keys")
+        self.flights = FlightFile(self.path)
+        self.assertEqual(self.flights.find_key(key), [7])
+        # Rows changed without updating the index, as after a crash before bump()
+        ROW.pack_into(self.flights._map, HEADER_SIZE + 6 * ROW.size, 1, 7, 555, 201, 0, -1, -1)
+        self.flights._set_header(self.flights.version + 1, len(self.flights), self.flights.highest)
+        self.assertEqual(self.flights.find_key(key), [])
+        self.assertEqual(self.flights.find_key((555, 201, 0)), [7])
+
+    def test_key_index_grows(self):
+        """Test that the key index grows past its first size and still finds every key."""
+        for flight_id in range(10, 3010):
+            self.flights.put({"Flight_ID": flight_id, "Client_ID": flight_id % 7, "Airline_ID": flight_id})
+        for flight_id in range(10, 3010, 2):
+            self.flights.remove(flight_id)
+        self.assertEqual(self.flights.find_key((11 % 7, 11, row_key({})[2])), [11])
+        self.assertEqual(self.flights.find_key((10 % 7, 10, row_key({})[2])), [])
+        self.assertEqual(self.flights.find_key(row_key(self.records[1])), [2])
+
+
+class TestMappedFlightStorage(unittest.TestCase):
+    """Unit tests for the MappedFlightStorage class."""
+
+    def setUp(self):
+        """
+        Set up the test environment with a flight JSON file and a client JSON file.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.flight_file = os.path.join(self.temp_dir.name, "flights.json")
+        self.client_file = os.path.join(self.temp_dir.name, "clients.json")
+        self.records = [
+            {"Flight_ID": 1, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00", "Start City": "New York", "End City": "London"},
+            {"Flight_ID": 2, "Client_ID": 102, "Airline_ID": 202, "Date/Time": "2023-12-16 15:30", "Start City": "London", "End City": "Tokyo"}
+        ]
+        with open(self.flight_file, "w") as f:
+            json.dump(self.records, f, indent=4)
+        self.storage = MappedFlightStorage(JsonStorage(None))
+
+    def tearDown(self):
+        """
+        Clean up the test environment by closing the flight file and removing the temporary files.
+        """
+        RecordCache.invalidate(self.flight_file)
+        for flights in self.storage._files.values():
+            flights.close()
+        self.temp_dir.cleanup()
+
+    def test_imports_flights_on_first_use(self):
+        """Test that the flights are imported from the JSON file, and other files stay in the other engine."""
+        self.assertEqual(self.storage.get(self.flight_file, 2), self.records[1])
+        self.assertTrue(os.path.exists(MappedFlightStorage.binary_path(self.flight_file)))
+        self.assertEqual(list(self.storage.iter_records(self.flight_file)), self.records)
+        self.storage.write(self.client_file, [{"ID": 1, "Name": "John Doe"}])
+        self.assertEqual(self.storage.read(self.client_file), [{"ID": 1, "Name": "John Doe"}])
+        self.assertFalse(os.path.exists(MappedFlightStorage.binary_path(self.client_file)))
+
+    def test_imports_flights_once(self):
+        """Test that applications opening the flight file at the same time import the flights only once."""
+        imports = []
+
+        class SlowEngine(JsonStorage):
+            def iter_records(self, path):
+                imports.append(path)
+                time.sleep(0.1)
+                yield from super().iter_records(path)
+
+        # Each storage stands for another application, sharing only the files and their locks
+        storages = [MappedFlightStorage(SlowEngine(None)) for _ in range(4)]
+        found = []
+        threads = [threading.Thread(target=lambda storage=storage: found.append(storage.get(self.flight_file, 2))) for storage in storages]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for storage in storages:
+                for flights in storage._files.values():
+                    flights.close()
+        self.assertEqual(len(imports), 1)
+        self.assertEqual(found, [self.records[1]] * 4)
+
+    def test_commit_writes_changed_rows(self):
+        """Test that committing a cache entry changes only the rows of the changed flights."""
+        before = self.storage.signature(self.flight_file)
+        entry = CachedFile(self.flight_file, before, self.storage.read(self.flight_file))
+        entry.update(0, {"Client_ID": 105})
+        entry.insert({"Flight_ID": 3, "Client_ID": 103, "Date/Time": "2023-12-18 09:00"})
+        entry.delete(1)
+        self.storage.commit(entry, threading.RLock())
+        self.assertNotEqual(self.storage.signature(self.flight_file), before)
+        self.assertEqual(self.storage.read(self.flight_file), [dict(record) for record in entry.records])
+        # The JSON file the flights were imported from is no longer written
+        with open(self.flight_file, "r") as f:
+            self.assertEqual(json.load(f), self.records)
+
+    def test_commit_writes_nothing_if_a_flight_is_rejected(self):
+        """Test that a commit holding a flight that cannot be stored leaves every row as it was."""
+        before = self.storage.signature(self.flight_file)
+        entry = CachedFile(self.flight_file, before, self.storage.read(self.flight_file))
+        entry.update(0, {"Client_ID": 105})
+        entry.insert({"Flight_ID": 3, "Client_ID": 103, "Notes": "Window seat"})
+        with self.assertRaises(ValueError):
+            self.storage.commit(entry, threading.RLock())
+        self.assertEqual(self.storage.signature(self.flight_file), before)
+        self.assertEqual(self.storage.read(self.flight_file), self.records)
+
+    def _patch_flight_record(self):
+        """
+        Patch FlightRecord to keep the test flights in the memory-mapped flight file,
+        and fail if they are loaded into the record cache.
+        """
+        def open_other_files(path):
+            self.assertNotEqual(os.path.abspath(path), os.path.abspath(self.flight_file))
+            return open_file(path)
+
+        open_file = RecordCache.open
+        sequence = IdSequence(self.flight_file + ".seq")
+        return patch("record.flight.FLIGHT_FILE", self.flight_file), \
+            patch("record.flight.FLIGHT_STORE", "mmap"), \
+            patch.object(RecordCache, "storage", self.storage), \
+            patch.object(RecordCache, "open", staticmethod(open_other_files)), \
+            patch.object(FlightRecord, "sequence", sequence)
+
+    def test_flight_record_changes_rows_directly(self):
+        """Test creating, updating and deleting flights through the flight file, without loading the flights."""
+        file_patch, store_patch, storage_patch, open_patch, sequence_patch = self._patch_flight_record()
+        with file_patch, store_patch, storage_patch, open_patch, sequence_patch:
+            flight_id = FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-18 9:00"})
+            self.assertEqual(flight_id, 3)
+            self.assertEqual(FlightRecord.generate_id(), 4)
+            with self.assertRaises(ValueError):
+                FlightRecord.create({"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-18 09:00"})
+            with self.assertRaises(ValueError):
+                FlightRecord.create({"Flight_ID": 2, "Client_ID": 104, "Airline_ID": 203, "Date/Time": "2023-12-18 09:00"})
+            with self.assertRaises(ValueError):
+                FlightRecord.update(1, {"Client_ID": 102, "Airline_ID": 202, "Date/Time": "2023-12-16 15:30"})
+            # Changing the ID to one another flight has would overwrite its row
+            with self.assertRaises(ValueError):
+                FlightRecord.update(1, {"Flight_ID": 2, "Date/Time": "2023-12-15 12:00"})
+            self.assertEqual(FlightRecord.search(2), self.records[1])
+            self.assertTrue(FlightRecord.update(1, {"Flight_ID": 10, "Date/Time": "2023-12-15 12:00"}))
+            self.assertIsNone(FlightRecord.search(1))
+            self.assertEqual(FlightRecord.search(10), dict(self.records[0], Flight_ID=10))
+            self.assertFalse(FlightRecord.update(1, {"Date/Time": "2023-12-15 12:00"}))
+            self.assertTrue(FlightRecord.delete(2))
+            self.assertFalse(FlightRecord.delete(2))
+            self.assertEqual([record["Flight_ID"] for record in FlightRecord.iter_all()], [3, 10])
+            # Queries run over the columns of the flight file, in Flight_ID order
+            moved = dict(self.records[0], Flight_ID=10)
+            self.assertEqual(FlightRecord.query(start="2023-12-15 00:00"), [FlightRecord.search(3), moved])
+            self.assertEqual(FlightRecord.query(start_city="New York"), [moved])
+            self.assertEqual(FlightRecord.count_by("Client_ID"), {101: 1, 103: 1})
+
+    def test_flight_record_batches_reject_flights_one_by_one(self):
+        """Test that a flight that cannot be stored is rejected on its own and the rest of the batch is saved."""
+        file_patch, store_patch, storage_patch, open_patch, sequence_patch = self._patch_flight_record()
+        with file_patch, store_patch, storage_patch, open_patch, sequence_patch:
+            ids, errors = FlightRecord.create_many([
+                {"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-18 09:00"},
+                {"Client_ID": 104, "Airline_ID": 203, "Date/Time": "2023-12-18 10:00", "Notes": "Window seat"},
+                {"Client_ID": 103, "Airline_ID": 203, "Date/Time": "2023-12-18 09:00"},
+                {"Client_ID": 105, "Airline_ID": 203, "Date/Time": "2023-12-18 11:00"}
+            ])
+            self.assertEqual(ids, [3, 4])
+            self.assertEqual([position for position, _ in errors], [1, 2])
+            self.assertEqual(errors[0][1], "The flight of client 104 on airline 203 at 2023-12-18 10:00 has fields the flight file cannot store: Notes.")
+            ids, errors = FlightRecord.update_many([
+                (1, {"Date/Time": "2023-12-15 13:00"}),
+                (2, {"Date/Time": "2023-12-16 16:00", "Notes": "Aisle"}),
+                (9, {"Date/Time": "2023-12-16 16:00"})
+            ])
+            self.assertEqual(ids, [1])
+            self.assertEqual([position for position, _ in errors], [1, 2])
+            ids, errors = FlightRecord.delete_many([4, 4])
+            self.assertEqual((ids, errors), ([4], [(1, "No flight found with the given ID.")]))
+            self.assertEqual(FlightRecord.search(2), self.records[1])
+            self.assertEqual([record["Flight_ID"] for record in FlightRecord.iter_all()], [1, 2, 3])
+
+    def test_flight_record_search_and_update(self):
+        """Test searching and updating flights by ID through the flight file."""
+        with patch("record.flight.FLIGHT_FILE", self.flight_file), \
+                patch("record.flight.FLIGHT_STORE", "mmap"), \
+                patch.object(RecordCache, "storage", self.storage):
+            self.assertEqual(FlightRecord.search(1), self.records[0])
+            self.assertTrue(FlightRecord.update(2, {"Date/Time": "2023-12-20 10:00", "End City": "Paris"}))
+            self.assertEqual(FlightRecord.search(2)["End City"], "Paris")
+            self.assertEqual(self.storage.flight_file(self.flight_file).get(2)["Date/Time"], "2023-12-20 10:00")
+            self.assertIsNone(FlightRecord.search(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
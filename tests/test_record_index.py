@@ -0,0 +1,215 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import CachedFile  # Import the cache entry that maintains indexes
+from record.index import PrimaryIndex, MultiIndex, SortedIndex, PrefixIndex, InvertedIndex, TrigramIndex, trigrams  # Import the index classes
+
+
+class TestPrimaryIndex(unittest.TestCase):
+    """Unit tests for the PrimaryIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a few records and an ID index.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"ID": 1, "Name": "John Doe"},
+            {"ID": 2, "Name": "Jane Smith"},
+            {"ID": 3, "Name": "Alice Brown"}
+        ])
+        self.index = self.entry.index("ID", lambda: PrimaryIndex("ID"))
+
+    def test_get_and_position(self):
+        """Test looking records up by ID."""
+        self.assertEqual(self.index.get(2)["Name"], "Jane Smith")
+        self.assertEqual(self.index.position(3), 2)
+        self.assertIsNone(self.index.get(4))
+
+    def test_insert(self):
+        """Test that inserted records are indexed."""
+        self.entry.insert({"ID": 4, "Name": "Bob Martin"})
+        self.assertEqual(self.index.position(4), 3)
+
+    def test_delete_moves_later_positions(self):
+        """Test that deleting a record keeps later positions correct."""
+        self.entry.delete(self.index.position(1))
+        self.assertNotIn(1, self.index)
+        self.assertEqual(self.index.position(2), 0)
+        self.assertEqual(self.index.position(3), 1)
+
+    def test_update_changes_id(self):
+        """Test that updating the ID of a record re-indexes it."""
+        self.entry.update(self.index.position(3), {"ID": 30})
+        self.assertNotIn(3, self.index)
+        self.assertEqual(self.index.get(30)["Name"], "Alice Brown")
+
+    def test_duplicate_ids(self):
+        """Test that the first occurrence of a duplicate ID is indexed."""
+        self.entry.insert({"ID": 1, "Name": "Duplicate"})
+        self.assertEqual(self.index.get(1)["Name"], "John Doe")
+        self.entry.delete(self.index.position(1))
+        self.assertEqual(self.index.get(1)["Name"], "Duplicate")
+
+
+class TestMultiIndex(unittest.TestCase):
+    """Unit tests for the MultiIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a few flights and a Client_ID index.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"Flight_ID": 1, "Client_ID": 101},
+            {"Flight_ID": 2, "Client_ID": 102},
+            {"Flight_ID": 3, "Client_ID": 101}
+        ])
+        self.index = self.entry.index("Client_ID", lambda: MultiIndex(lambda record: record.get("Client_ID")))
+
+    def test_get(self):
+        """Test looking up every record sharing a key."""
+        self.assertEqual([record["Flight_ID"] for record in self.index.get(101)], [1, 3])
+        self.assertEqual(self.index.count(102), 1)
+        self.assertEqual(self.index.get(103), [])
+
+    def test_follows_changes(self):
+        """Test that updates and deletes move records between keys."""
+        self.entry.update(1, {"Client_ID": 101})
+        self.entry.delete(0)
+        self.assertEqual([record["Flight_ID"] for record in self.index.get(101)], [3, 2])
+        self.assertNotIn(102, self.index)
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Unit tests for the SortedIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a few records in no particular order and a sorted index.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"ID": 1, "Rank": 30},
+            {"ID": 2, "Rank": 10},
+            {"ID": 3, "Rank": 20},
+            {"ID": 4}
+        ])
+        self.index = self.entry.index("Rank", lambda: SortedIndex(lambda record: record.get("Rank")))
+
+    def test_range(self):
+        """Test range queries with inclusive, open and limited bounds."""
+        self.assertEqual([record["ID"] for record in self.index.range(10, 20)], [2, 3])
+        self.assertEqual([record["ID"] for record in self.index.range(low=15)], [3, 1])
+        self.assertEqual([record["ID"] for record in self.index.range(limit=2)], [2, 3])
+        self.assertEqual(len(self.index), 3)
+
+    def test_follows_changes(self):
+        """Test that inserts, updates and deletes keep the index ordered."""
+        self.entry.insert({"ID": 5, "Rank": 20})
+        self.entry.update(0, {"Rank": 5})
+        self.entry.delete(2)
+        self.assertEqual([record["ID"] for record in self.index.range()], [1, 2, 5])
+
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Unit tests for the PrefixIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a prefix index over the words of a name.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"ID": 1, "Name": "jane smith"},
+            {"ID": 2, "Name": "john smithers"},
+            {"ID": 3, "Name": "sam jones"},
+        ])
+        self.index = self.entry.index("Name", lambda: PrefixIndex(lambda record: record["Name"].split()))
+
+    def test_prefix(self):
+        """Test that any word of a record matches, and each record is listed once."""
+        self.assertEqual([record["ID"] for record in self.index.prefix("smith")], [1, 2])
+        self.assertEqual([record["ID"] for record in self.index.prefix("j")], [1, 2, 3])
+        self.assertEqual([record["ID"] for record in self.index.prefix("j", limit=2)], [1, 2])
+        self.assertEqual(self.index.prefix("x"), [])
+
+    def test_follows_changes(self):
+        """Test that inserts, updates and deletes keep the index up to date."""
+        self.entry.insert({"ID": 4, "Name": "smitty werben"})
+        self.entry.update(0, {"Name": "jane doe"})
+        self.entry.delete(1)
+        self.assertEqual([record["ID"] for record in self.index.prefix("smit")], [4])
+        self.assertEqual([record["ID"] for record in self.index.prefix("do")], [1])
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Unit tests for the InvertedIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with an inverted index over the words of an address.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"ID": 1, "Address": "1 elm street chicago"},
+            {"ID": 2, "Address": "2 oak street chicago"},
+            {"ID": 3, "Address": "3 elm street boston"},
+            {"ID": 4, "Address": "4 elm elm road chicago"},
+        ])
+        self.index = self.entry.index("Address", lambda: InvertedIndex(lambda record: record["Address"].split()))
+
+    def test_and_query_ranked(self):
+        """Test that only records with every token match, and repeated and rare tokens rank higher."""
+        self.assertEqual([record["ID"] for record in self.index.search(["elm", "chicago"])], [4, 1])
+        self.assertEqual([record["ID"] for record in self.index.search(["street"])], [1, 2, 3])
+        self.assertEqual([record["ID"] for record in self.index.search(["street"], limit=2)], [1, 2])
+        self.assertEqual(self.index.search(["elm", "miami"]), [])
+        self.assertEqual(self.index.frequency("elm"), 3)
+
+    def test_follows_changes(self):
+        """Test that inserts, updates and deletes keep the index up to date."""
+        self.entry.insert({"ID": 5, "Address": "5 elm street chicago"})
+        self.entry.update(0, {"Address": "1 pine street chicago"})
+        self.entry.delete(3)
+        self.assertEqual([record["ID"] for record in self.index.search(["elm", "chicago"])], [5])
+        self.assertEqual(self.index.frequency("road"), 0)
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """Unit tests for the TrigramIndex class."""
+
+    def setUp(self):
+        """
+        Set up a cache entry with a trigram index over company names.
+        """
+        self.entry = CachedFile("records.json", None, [
+            {"ID": 1, "Company Name": "Lufthansa"},
+            {"ID": 2, "Company Name": "Air France"},
+            {"ID": 3, "Company Name": "Air Canada"},
+        ])
+        self.index = self.entry.index("Company Name", lambda: TrigramIndex(lambda record: record["Company Name"]))
+
+    def test_trigrams(self):
+        """Test splitting text into padded, case-folded trigrams."""
+        self.assertEqual(trigrams("Ab"), {"  a", " ab", "ab "})
+        self.assertEqual(trigrams(" - "), set())
+
+    def test_search(self):
+        """Test that misspelled names are found and ranked by similarity."""
+        matches = self.index.search("Lufthnasa", 0.3)
+        self.assertEqual([record["ID"] for _, record in matches], [1])
+        self.assertEqual([record["ID"] for _, record in self.index.search("air france", 0.2)], [2, 3])
+        self.assertEqual(self.index.search("air france", 0.2)[0][0], 1.0)
+        self.assertEqual(self.index.search("Qantas", 0.3), [])
+
+    def test_follows_changes(self):
+        """Test that inserts, updates and deletes keep the index up to date."""
+        self.entry.insert({"ID": 4, "Company Name": "Lufthansa Cargo"})
+        self.entry.update(0, {"Company Name": "Condor"})
+        self.entry.delete(1)
+        self.assertEqual([record["ID"] for _, record in self.index.search("Lufthansa", 0.3)], [4])
+        self.assertEqual([record["ID"] for _, record in self.index.search("air france", 0.2)], [3])
+
+if __name__ == "__main__":
+    unittest.main()
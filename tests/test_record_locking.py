@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.locking import ReadWriteLock, FileLock, fcntl  # Import the data file locks
+
+
+class TestRecordLocking(unittest.TestCase):
+    """Unit tests for the reader/writer and file locks."""
+
+    def setUp(self):
+        """
+        Set up a data file path in a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "records.json")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def run_blocked(self, hold, attempt):
+        """
+        Check whether attempt() waits while hold() is held by the test thread.
+
+        Args:
+            hold (contextmanager): The lock held by the test thread.
+            attempt (contextmanager): The lock taken by another thread.
+
+        Returns:
+            bool: True if the other thread had to wait for the lock.
+        """
+        acquired = threading.Event()
+
+        def take():
+            with attempt:
+                acquired.set()
+
+        with hold:
+            thread = threading.Thread(target=take)
+            thread.start()
+            blocked = not acquired.wait(0.2)
+        thread.join(5)
+        self.assertTrue(acquired.is_set())
+        return blocked
+
+    def test_readers_share(self):
+        """Test that readers run alongside each other."""
+        lock = ReadWriteLock()
+        self.assertFalse(self.run_blocked(lock.reading(), lock.reading()))
+
+    def test_writer_excludes(self):
+        """Test that a writer waits for readers, and readers wait for a writer."""
+        lock = ReadWriteLock()
+        self.assertTrue(self.run_blocked(lock.reading(), lock.writing()))
+        self.assertTrue(self.run_blocked(lock.writing(), lock.reading()))
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_file_lock_between_processes(self):
+        """Test that separate locks on the same file, as held by two processes, exclude each other."""
+        # Two FileLock objects share no in-process state, so only the file lock is tested
+        self.assertFalse(self.run_blocked(FileLock(self.path).shared(), FileLock(self.path).shared()))
+        self.assertTrue(self.run_blocked(FileLock(self.path).exclusive(), FileLock(self.path).shared()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.models import Client, Flight, record_type  # Import the compact record types
+from record.cache import CachedFile  # Import the cache entry that converts records
+
+
+class TestRecordModels(unittest.TestCase):
+    """Unit tests for the compact record types."""
+
+    def setUp(self):
+        """
+        Set up a flight record with a field that is not standard for flights.
+        """
+        self.data = {"Flight_ID": 1, "Client_ID": 101, "Airline_ID": 201, "Date/Time": "2023-12-15 12:00", "Start_City": "New York"}
+        self.flight = Flight.from_dict(self.data)
+
+    def test_round_trip(self):
+        """Test that a record converts back to the same dictionary."""
+        self.assertEqual(self.flight.to_dict(), self.data)
+        self.assertEqual(dict(self.flight), self.data)
+        self.assertEqual(self.flight, self.data)
+
+    def test_mapping_access(self):
+        """Test reading fields by name, by attribute, and with defaults."""
+        self.assertEqual(self.flight["Date/Time"], "2023-12-15 12:00")
+        self.assertEqual(self.flight.client_id, 101)
+        self.assertEqual(self.flight["Start_City"], "New York")
+        self.assertIsNone(self.flight.get("End City"))
+        self.assertNotIn("End City", self.flight)
+        with self.assertRaises(KeyError):
+            self.flight["End City"]
+
+    def test_update(self):
+        """Test that updates set standard and extra fields."""
+        self.flight.update({"Airline_ID": 202, "Gate": "B12"})
+        self.assertEqual(self.flight.airline_id, 202)
+        self.assertEqual(self.flight["Gate"], "B12")
+
+    def test_no_instance_dict(self):
+        """Test that records do not carry a per-record dictionary."""
+        self.assertFalse(hasattr(Client(), "__dict__"))
+
+    def test_cache_entry_converts_records(self):
+        """Test that cache entries hold compact records for the known data files only."""
+        self.assertIs(record_type("/data/flights.json"), Flight)
+        entry = CachedFile("/data/flights.json", None, [self.data])
+        entry.insert({"Flight_ID": 2})
+        self.assertIsInstance(entry.records[0], Flight)
+        self.assertIsInstance(entry.records[1], Flight)
+        self.assertIsInstance(CachedFile("/data/records.json", None, [{"ID": 1}]).records[0], dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.sequence import IdSequence  # Import the persisted ID sequence
+
+
+class TestIdSequence(unittest.TestCase):
+    """Unit tests for the IdSequence class."""
+
+    def setUp(self):
+        """
+        Set up a sequence file in a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "records.seq")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def test_allocate_from_block(self):
+        """Test that IDs are handed out in order and the lease is persisted."""
+        sequence = IdSequence(self.path, block_size=10)
+        self.assertEqual([sequence.allocate() for _ in range(3)], [1, 2, 3])
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "11")
+
+    def test_floor(self):
+        """Test that IDs stay above the floor, leasing a new block when needed."""
+        sequence = IdSequence(self.path, block_size=10)
+        self.assertEqual(sequence.allocate(floor=5), 5)
+        self.assertEqual(sequence.allocate(floor=3), 6)
+        self.assertEqual(sequence.allocate(floor=40), 40)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "50")
+
+    def test_separate_processes_and_restarts(self):
+        """Test that sequences sharing a file, as separate processes would, never hand out the same ID."""
+        first = IdSequence(self.path, block_size=10)
+        second = IdSequence(self.path, block_size=10)
+        ids = [first.allocate(), second.allocate(), first.allocate(), second.allocate()]
+        self.assertEqual(ids, [1, 11, 2, 12])
+        # A restarted process continues after every leased block
+        self.assertEqual(IdSequence(self.path, block_size=10).allocate(), 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,294 @@
+import unittest
+import io
+import os
+import json
+import multiprocessing
+import sys
+import tempfile
+import threading
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import CachedFile, RecordCache  # Import the cache entry that records changes, and the cache committing them
+from record.locking import fcntl  # Import fcntl as the locking module found it, to skip the process tests without it
+from record.storage import JsonStorage, LogStorage, file_signature, iter_json_array  # Import the storage engines
+from record.serializers import get_serializer  # Import the serializers of the binary snapshots
+from record.models import Client  # Import a compact record type to serialize
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Unit tests for the iter_json_array function."""
+
+    def test_small_chunks(self):
+        """Test parsing items that are split across many chunks."""
+        data = [{"ID": i, "Name": "Name " * i, "Score": i * 1000} for i in range(50)] + [12345, "text"]
+        items = list(iter_json_array(io.StringIO(json.dumps(data, indent=4)), chunk_size=7))
+        self.assertEqual(items, data)
+
+    def test_empty_list(self):
+        """Test parsing an empty list."""
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+
+    def test_stops_early(self):
+        """Test that parsing stops when the caller stops iterating."""
+        f = io.StringIO(json.dumps([{"ID": i} for i in range(10000)]))
+        items = iter_json_array(f, chunk_size=64)
+        self.assertEqual(next(items), {"ID": 0})
+        self.assertLess(f.tell(), 1000)
+
+    def test_invalid_json(self):
+        """Test that invalid data raises after the valid items."""
+        items = iter_json_array(io.StringIO('[{"ID": 1}, {"ID": '))
+        self.assertEqual(next(items), {"ID": 1})
+        with self.assertRaises(json.JSONDecodeError):
+            next(items)
+
+
+class TestSerializers(unittest.TestCase):
+    """Unit tests for the serializers."""
+
+    def test_round_trip(self):
+        """Test that every format decodes the records it encoded, compact records as dictionaries."""
+        records = [{"ID": 1, "Name": "John Doe", "Tags": ["a", None]}, Client.from_dict({"ID": 2, "Name": "Jane Smith"})]
+        serializer = get_serializer("marshal")
+        self.assertEqual(serializer.loads(serializer.dumps(records)), [records[0], {"ID": 2, "Name": "Jane Smith"}])
+
+    def test_invalid_data(self):
+        """Test that damaged data and unknown formats raise ValueError."""
+        with self.assertRaises(ValueError):
+            get_serializer("marshal").loads(b"\x80")
+        with self.assertRaises(ValueError):
+            get_serializer("yaml")
+        # A JSON snapshot would load no faster than the JSON file
+        with self.assertRaises(ValueError):
+            get_serializer("json")
+        # Pickle is not offered, since loading one from a shared data folder could run any code
+        with self.assertRaises(ValueError):
+            get_serializer("pickle")
+
+
+class TestJsonSnapshots(unittest.TestCase):
+    """Unit tests for the binary snapshots of the JsonStorage class."""
+
+    def setUp(self):
+        """
+        Set up the test environment by saving a data file through the JSON engine.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.test_file = os.path.join(self.temp_dir.name, "records.json")
+        self.test_data = [
+            {"ID": 1, "Name": "John Doe"},
+            {"ID": 2, "Name": "Jane Smith"}
+        ]
+        self.storage = JsonStorage("marshal")
+        self.storage.write(self.test_file, self.test_data)
+
+    def tearDown(self):
+        """
+        Clean up the test environment by removing the temporary files.
+        """
+        self.temp_dir.cleanup()
+
+    def write_snapshot_only(self, records):
+        """
+        Replace the records in the snapshot without touching the JSON file,
+        so the tests can tell which of the two files was loaded.
+        """
+        self.storage._write_snapshot(self.test_file, records, file_signature(self.test_file))
+
+    def test_write_keeps_json_and_snapshot(self):
+        """Test that saving writes the JSON file and a snapshot next to it."""
+        with open(self.test_file, "r") as f:
+            self.assertEqual(json.load(f), self.test_data)
+        self.assertTrue(os.path.exists(JsonStorage.snapshot_path(self.test_file)))
+
+    def test_read_loads_current_snapshot(self):
+        """Test that a snapshot matching the JSON file is loaded instead of the JSON."""
+        self.write_snapshot_only([{"ID": 3, "Name": "From Snapshot"}])
+        self.assertEqual(self.storage.read(self.test_file), [{"ID": 3, "Name": "From Snapshot"}])
+        # A snapshot written by another version of the format is ignored and the JSON parsed
+        other = JsonStorage("marshal")
+        other.snapshot.version = "0"
+        self.assertEqual(other.read(self.test_file), self.test_data)
+
+    def test_edited_json_ignores_snapshot(self):
+        """Test that a JSON file edited by another program is parsed and its snapshot written again."""
+        edited = self.test_data + [{"ID": 3, "Name": "Alice Brown"}]
+        with open(self.test_file, "w") as f:
+            json.dump(edited, f, indent=4)
+        self.assertEqual(self.storage.read(self.test_file), edited)
+        # The JSON is parsed once; the new snapshot now matches it
+        self.assertEqual(self.storage._read_snapshot(self.test_file, file_signature(self.test_file)), edited)
+
+    def test_damaged_snapshot(self):
+        """Test that a damaged snapshot is ignored."""
+        with open(JsonStorage.snapshot_path(self.test_file), "wb") as f:
+            f.write(b"RMS snapshot\n{")
+        self.assertEqual(self.storage.read(self.test_file), self.test_data)
+
+
+class TestCompressedFiles(unittest.TestCase):
+    """Unit tests for compressed data files in the JsonStorage class."""
+
+    def setUp(self):
+        """
+        Set up the test environment with a temporary directory for the data file.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.test_file = os.path.join(self.temp_dir.name, "records.json")
+        self.test_data = [{"ID": i, "Name": f"Client {i}"} for i in range(100)]
+
+    def tearDown(self):
+        """
+        Clean up the test environment by removing the temporary files.
+        """
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that each codec writes a smaller file named after it and reads it back."""
+        plain = JsonStorage(None)
+        plain.write(self.test_file, self.test_data)
+        for name, suffix, magic in (("gzip", ".gz", b"\x1f\x8b"), ("lzma", ".xz", b"\xfd7zXZ\x00")):
+            storage = JsonStorage(None, name)
+            storage.write(self.test_file, self.test_data)
+            with open(self.test_file + suffix, "rb") as f:
+                self.assertTrue(f.read().startswith(magic))
+            self.assertLess(os.path.getsize(self.test_file + suffix), os.path.getsize(self.test_file))
+            self.assertEqual(storage.read(self.test_file), self.test_data)
+            self.assertEqual(list(storage.iter_records(self.test_file)), self.test_data)
+
+    def test_codec_detected_from_magic_bytes(self):
+        """Test that a compressed file is read whatever its name and the configured codec."""
+        JsonStorage(None, "lzma").write(self.test_file, self.test_data)
+        os.replace(self.test_file + ".xz", self.test_file)
+        self.assertEqual(JsonStorage(None).read(self.test_file), self.test_data)
+        self.assertEqual(JsonStorage(None, "gzip").read(self.test_file), self.test_data)
+
+    def test_switching_codec_keeps_records(self):
+        """Test that the newest of the plain and compressed files is read."""
+        JsonStorage(None).write(self.test_file, self.test_data)
+        storage = JsonStorage(None, "gzip")
+        self.assertEqual(storage.read(self.test_file), self.test_data)
+        storage.write(self.test_file, self.test_data[:1])
+        self.assertEqual(JsonStorage(None).read(self.test_file), self.test_data[:1])
+
+    def test_damaged_file(self):
+        """Test that a truncated compressed file loads as an empty list."""
+        JsonStorage(None, "gzip").write(self.test_file, self.test_data)
+        with open(self.test_file + ".gz", "r+b") as f:
+            f.truncate(20)
+        self.assertEqual(JsonStorage(None, "gzip").read(self.test_file), [])
+
+
+def insert_records(path, worker, count, threshold):
+    """
+    Insert records through the record cache and the log engine, as a separate application would.
+
+    Args:
+        path (str): The path of the data file.
+        worker (int): The number of the process, used to make the IDs unique.
+        count (int): The number of records to insert.
+        threshold (int): The log size above which the log is compacted.
+    """
+    RecordCache.storage = LogStorage(threshold=threshold)
+    RecordCache.invalidate()
+    for number in range(count):
+        entry = RecordCache.open(path)
+        with entry.lock:
+            entry.insert({"ID": worker * count + number + 1, "Name": "Process Client"})
+            RecordCache.commit(entry)
+    RecordCache.storage.wait()
+
+
+class TestLogStorage(unittest.TestCase):
+    """Unit tests for the LogStorage class."""
+
+    def setUp(self):
+        """
+        Set up the test environment by creating a temporary snapshot file.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.test_file = os.path.join(self.temp_dir.name, "records.json")
+        self.test_data = [
+            {"ID": 1, "Name": "John Doe"},
+            {"ID": 2, "Name": "Jane Smith"}
+        ]
+        with open(self.test_file, "w") as f:
+            json.dump(self.test_data, f, indent=4)
+        self.storage = LogStorage(threshold=1024 * 1024)
+        self.lock = threading.RLock()
+
+    def tearDown(self):
+        """
+        Clean up the test environment by removing the temporary files.
+        """
+        self.storage.wait()
+        self.temp_dir.cleanup()
+
+    def make_changes(self):
+        """Apply a few changes through a cache entry and commit them to the log."""
+        entry = CachedFile(self.test_file, None, self.storage.read(self.test_file))
+        entry.insert({"ID": 3, "Name": "Alice Brown"})
+        entry.update(0, {"Name": "Johnathan Doe"})
+        entry.delete(1)
+        self.storage.commit(entry, self.lock)
+        return entry
+
+    def test_commit_appends_to_log(self):
+        """Test that changes are appended to the log and leave the snapshot untouched."""
+        with open(self.test_file, "r") as f:
+            snapshot = f.read()
+        self.make_changes()
+        with open(self.test_file, "r") as f:
+            self.assertEqual(f.read(), snapshot)
+        with open(LogStorage.log_path(self.test_file), "r") as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+    def test_read_replays_log(self):
+        """Test that reading replays the log over the snapshot."""
+        entry = self.make_changes()
+        self.assertEqual(self.storage.read(self.test_file), entry.records)
+
+    def test_replaced_snapshot_ignores_old_log(self):
+        """Test that a log written for an older snapshot is ignored."""
+        self.make_changes()
+        with open(self.test_file, "w") as f:
+            json.dump([{"ID": 9, "Name": "Bob Martin"}], f)
+        self.assertEqual(self.storage.read(self.test_file), [{"ID": 9, "Name": "Bob Martin"}])
+
+    def test_iter_records_replays_log(self):
+        """Test that streaming the records includes the logged changes."""
+        entry = self.make_changes()
+        self.assertEqual(list(self.storage.iter_records(self.test_file)), entry.records)
+
+    def test_compaction(self):
+        """Test that a large log is folded into the snapshot."""
+        self.storage.threshold = 0
+        entry = self.make_changes()
+        self.storage.wait()
+        with open(self.test_file, "r") as f:
+            self.assertEqual(json.load(f), entry.records)
+        with open(LogStorage.log_path(self.test_file), "r") as f:
+            self.assertEqual(len(f.read().splitlines()), 1)
+        self.assertEqual(self.storage.read(self.test_file), entry.records)
+
+    @unittest.skipIf(fcntl is None or "fork" not in multiprocessing.get_all_start_methods(), "fcntl or fork is not available")
+    def test_compaction_between_processes(self):
+        """Test that processes logging and compacting the same file at the same time keep every record once."""
+        with open(self.test_file, "w") as f:
+            json.dump([], f)
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=insert_records, args=(self.test_file, worker, 80, 4000)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+        ids = [record["ID"] for record in self.storage.read(self.test_file)]
+        self.assertEqual(sorted(ids), list(range(1, 321)))
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
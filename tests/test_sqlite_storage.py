@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+# Add the src directory to the system path dynamically
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from record.cache import CachedFile  # Import the cache entry that records changes
+from record.sqlite_storage import SqliteStorage  # Import the SQLite storage engine
+
+
+class TestSqliteStorage(unittest.TestCase):
+    """Unit tests for the SqliteStorage class."""
+
+    def setUp(self):
+        """
+        Set up the test environment with a temporary database holding two clients.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(os.path.join(self.temp_dir.name, "records.db"))
+        self.client_file = os.path.join(self.temp_dir.name, "clients.json")
+        self.test_data = [
+            {"ID": 1, "Name": "John Doe", "Phone Number": "1-773-5435432"},
+            {"ID": 2, "Name": "Jane Smith", "Phone Number": "1-312-6546543", "Nickname": "Janey"}
+        ]
+        self.storage.write(self.client_file, self.test_data)
+
+    def tearDown(self):
+        """
+        Clean up the test environment by closing and removing the database.
+        """
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_read_round_trip(self):
+        """Test that records, including fields without a column, are read back unchanged."""
+        self.assertEqual(self.storage.read(self.client_file), self.test_data)
+
+    def test_commit_changes(self):
+        """Test that changes recorded by a cache entry are applied to the table."""
+        entry = CachedFile(self.client_file, None, self.storage.read(self.client_file))
+        entry.insert({"ID": 3, "Name": "Alice Brown", "Phone Number": "1-773-1112222"})
+        entry.update(0, {"ID": 10, "Name": "Johnathan Doe"})
+        entry.delete(1)
+        self.storage.commit(entry, threading.RLock())
+        records = self.storage.read(self.client_file)
+        self.assertEqual([record["ID"] for record in records], [3, 10])
+        self.assertEqual(records[1]["Name"], "Johnathan Doe")
+
+    def test_unique_phone_number(self):
+        """Test that the phone number unique constraint is reported as a ValueError."""
+        with self.assertRaises(ValueError):
+            self.storage.write(self.client_file, self.test_data + [{"ID": 3, "Phone Number": "1-773-5435432"}])
+
+    def test_signature_changes_on_commit(self):
+        """Test that every commit changes the table signature."""
+        before = self.storage.signature(self.client_file)
+        self.storage.write(self.client_file, self.test_data)
+        self.assertNotEqual(self.storage.signature(self.client_file), before)
+
+
+if __name__ == "__main__":
+    unittest.main()